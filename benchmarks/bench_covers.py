@@ -0,0 +1,109 @@
+# 封面缩略图基准：python -m benchmarks.bench_covers [--albums 20] [--tracks 12] [--image-size 1200]
+# 生成若干“专辑”，每张专辑的曲目（MP3 + APIC / FLAC + PICTURE）内嵌同一张大尺寸 JPEG 封面，测量：
+#   整张解码再缩小 与 按缩略图尺寸缩放解码 的单张耗时；
+#   冷缓存下逐首 load_cover 的吞吐（每张专辑只解码缩放一次）与缓存文件数；
+#   已知封面哈希时（第二次运行）的吞吐；缓存上限很小时的淘汰。
+import argparse
+import os
+import time
+from benchmarks.common import temp_data_dir, time_calls, summarize
+from benchmarks.synth_audio import write_vbr_mp3, write_flac, embed_cover
+
+
+def make_jpeg(size, seed):
+    """生成一张渐变色 JPEG（每个 seed 颜色不同，内容互不相同）"""
+    from PyQt6.QtCore import QBuffer, QIODevice
+    from PyQt6.QtGui import QImage, QPainter, QLinearGradient, QColor
+
+    image = QImage(size, size, QImage.Format.Format_RGB32)
+    painter = QPainter(image)
+    gradient = QLinearGradient(0, 0, size, size)
+    gradient.setColorAt(0, QColor.fromHsv(seed * 37 % 360, 200, 230))
+    gradient.setColorAt(1, QColor.fromHsv(seed * 91 % 360, 255, 80))
+    painter.fillRect(image.rect(), gradient)
+    painter.drawText(image.rect(), 0, f"album {seed}")
+    painter.end()
+    buffer = QBuffer()
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, 'JPG', 90)
+    return bytes(buffer.data())
+
+
+def full_decode_thumbnails(data, sizes):
+    """对照：解码整张原图再逐个尺寸缩小"""
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtGui import QImage
+
+    image = QImage.fromData(data)
+    return [image.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+            for size in sizes]
+
+
+def run(albums, tracks, image_size):
+    from core.cover_art import CoverCache, load_cover, make_thumbnails, THUMB_SIZES, LIST_SIZE
+
+    results = {}
+    with temp_data_dir() as work_dir:
+        music_list = []
+        covers = []
+        for album in range(albums):
+            cover = make_jpeg(image_size, album)
+            covers.append(cover)
+            for track in range(tracks):
+                kind = 'flac' if track % 4 == 3 else 'mp3'
+                path = os.path.join(work_dir, f"{album}_{track}.{kind}")
+                if kind == 'mp3':
+                    write_vbr_mp3(path, 1, seed=track)
+                else:
+                    write_flac(path, 1)
+                embed_cover(path, kind, cover)
+                music_list.append({'id': len(music_list) + 1, 'file_path': path, 'managed': 1, 'cover_hash': None})
+
+        sample = [(cover,) for cover in covers[:10]]
+        results['full_decode_ms'] = summarize(
+            time_calls(lambda data: full_decode_thumbnails(data, THUMB_SIZES), sample, repeat=3))['median_ms']
+        results['scaled_decode_ms'] = summarize(time_calls(make_thumbnails, sample, repeat=3))['median_ms']
+
+        cache = CoverCache(os.path.join(work_dir, 'covers'))
+        start = time.perf_counter()
+        for music in music_list:
+            music['cover_hash'], _ = load_cover(music, LIST_SIZE, cache)
+        results['cold_tracks_per_sec'] = len(music_list) / (time.perf_counter() - start)
+        results['cache_files'] = len(os.listdir(cache.cache_dir))
+
+        start = time.perf_counter()
+        for music in music_list:
+            load_cover(music, LIST_SIZE, cache)
+        results['warm_tracks_per_sec'] = len(music_list) / (time.perf_counter() - start)
+
+        # 上限只够几张封面时，写入会触发淘汰，总大小保持在上限以内
+        small = CoverCache(os.path.join(work_dir, 'covers_small'), limit_bytes=cache.total_bytes() // 4)
+        for music in music_list:
+            load_cover(dict(music, cover_hash=None), LIST_SIZE, small)
+        results['bounded_cache_bytes'] = small.total_bytes()
+        results['bounded_limit_bytes'] = small.limit_bytes
+
+    print(f"{albums} 张专辑 × {tracks} 首，封面 {image_size}x{image_size} JPEG")
+    print(f"  整张解码后缩小      {results['full_decode_ms']:8.2f} ms/张")
+    print(f"  按尺寸缩放解码      {results['scaled_decode_ms']:8.2f} ms/张")
+    print(f"  冷缓存              {results['cold_tracks_per_sec']:8.0f} 首/秒（缓存文件 {results['cache_files']} 个）")
+    print(f"  已知封面哈希        {results['warm_tracks_per_sec']:8.0f} 首/秒")
+    print(f"  限额缓存            {results['bounded_cache_bytes']} / {results['bounded_limit_bytes']} 字节")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="封面缩略图基准")
+    parser.add_argument('--albums', type=int, default=20)
+    parser.add_argument('--tracks', type=int, default=12)
+    parser.add_argument('--image-size', type=int, default=1200)
+    args = parser.parse_args()
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtGui import QGuiApplication
+    _ = QGuiApplication.instance() or QGuiApplication([])  # QPainter 绘制文字需要；保持引用以免被回收
+    run(args.albums, args.tracks, args.image_size)
+
+
+if __name__ == '__main__':
+    main()
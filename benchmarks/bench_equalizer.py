@@ -0,0 +1,98 @@
+# 均衡器基准：python -m benchmarks.bench_equalizer [--seconds 30]
+# 对一段合成立体声信号按输出块（BLOCK_FRAMES 帧）逐块处理，测量每块耗时占块时长（实时）的比例：
+# 直通、常规设置、所有段 ±12dB 交替（冲激响应最长）以及每块都切换参数（每块都交叉淡化）的情况；
+# 另测重新设计滤波器（拖动滑块时每次变化）的耗时，以及切换参数前后相邻采样的最大跳变（检查爆音）。
+import argparse
+import time
+import numpy as np
+from core.audio_decoder import SAMPLE_RATE, BLOCK_FRAMES, FRAME_BYTES
+from core.equalizer import Equalizer, BANDS_HZ, BUDGET
+from benchmarks.common import time_calls, summarize
+
+SETTINGS = {
+    'bypass': None,
+    'typical': [4, 3, 1, 0, -1, -1, 0, 2, 3, 4],
+    'extreme': [12 if i % 2 else -12 for i in range(len(BANDS_HZ))],
+}
+
+
+def test_signal(seconds):
+    """两路不同频率的正弦加少量噪声，峰值约 -6dBFS"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    rng = np.random.default_rng(0)
+    left = 0.4 * np.sin(2 * np.pi * 220 * t) + 0.05 * rng.standard_normal(len(t))
+    right = 0.4 * np.sin(2 * np.pi * 3000 * t) + 0.05 * rng.standard_normal(len(t))
+    return (np.stack([left, right], axis=1) * 16384).astype('<i2').tobytes()
+
+
+def run_blocks(equalizer, data, change_every=None):
+    """逐块处理，返回每块耗时（毫秒）列表"""
+    block_bytes = BLOCK_FRAMES * FRAME_BYTES
+    timings = []
+    for i, offset in enumerate(range(0, len(data), block_bytes)):
+        if change_every and i % change_every == 0:
+            equalizer.set_band(i % len(BANDS_HZ), (i * 7) % 25 - 12)
+        start = time.perf_counter()
+        equalizer.process(data[offset:offset + block_bytes])
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def max_step(data):
+    """相邻采样的最大跳变（16 位采样单位）"""
+    samples = np.frombuffer(data, dtype='<i2').reshape(-1, 2).astype(np.int32)
+    return int(np.abs(np.diff(samples, axis=0)).max())
+
+
+def run(seconds):
+    data = test_signal(seconds)
+    block_ms = BLOCK_FRAMES / SAMPLE_RATE * 1000
+    print(f"{seconds}s 立体声，每块 {BLOCK_FRAMES} 帧（{block_ms:.1f} ms），预算 {BUDGET:.0%}")
+
+    results = {}
+    for name, gains in SETTINGS.items():
+        equalizer = Equalizer()
+        if gains is not None:
+            equalizer.set_gains(gains)
+            equalizer.set_enabled(True)
+        stats = summarize(run_blocks(equalizer, data))
+        results[name] = stats['p95_ms'] / block_ms
+        print(f"  {name:<10} 中位数 {stats['median_ms']:6.2f} ms  p95 {stats['p95_ms']:6.2f} ms  "
+              f"占实时 {results[name]:6.2%}  超出预算 {equalizer.over_budget} 块")
+
+    equalizer = Equalizer()
+    equalizer.set_enabled(True)
+    stats = summarize(run_blocks(equalizer, data, change_every=1))
+    results['changing'] = stats['p95_ms'] / block_ms
+    print(f"  {'每块切换':<8} 中位数 {stats['median_ms']:6.2f} ms  p95 {stats['p95_ms']:6.2f} ms  "
+          f"占实时 {results['changing']:6.2%}  超出预算 {equalizer.over_budget} 块")
+
+    design = summarize(time_calls(lambda g: equalizer.set_band(0, g), [(g,) for g in range(-12, 13)]))
+    print(f"  重新设计滤波器      中位数 {design['median_ms']:6.2f} ms  p95 {design['p95_ms']:6.2f} ms")
+
+    # 爆音检查：参数不变与每块切换参数时，输出相邻采样的最大跳变应同一量级
+    steady = Equalizer()
+    steady.set_gains(SETTINGS['typical'])
+    steady.set_enabled(True)
+    block_bytes = BLOCK_FRAMES * FRAME_BYTES
+    steady_out = b''.join(steady.process(data[i:i + block_bytes]) for i in range(0, len(data), block_bytes))
+    switching = Equalizer()
+    switching.set_enabled(True)
+    out = []
+    for i, offset in enumerate(range(0, len(data), block_bytes)):
+        switching.set_gains(SETTINGS['typical'] if i % 2 else SETTINGS['extreme'])
+        out.append(switching.process(data[offset:offset + block_bytes]))
+    print(f"  相邻采样最大跳变    固定参数 {max_step(steady_out)}  每块切换 {max_step(b''.join(out))}  "
+          f"输入 {max_step(data)}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="均衡器逐块处理耗时基准")
+    parser.add_argument('--seconds', type=float, default=30)
+    args = parser.parse_args()
+    run(args.seconds)
+
+
+if __name__ == '__main__':
+    main()
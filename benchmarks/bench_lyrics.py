@@ -0,0 +1,86 @@
+# 歌词定位基准：python -m benchmarks.bench_lyrics [--lines 1000 10000 100000] [--ticks 200000]
+# 生成超长的合成 LRC（每行两个时间标签、一半的行带逐字标签），测量解析耗时，
+# 以及每次位置更新定位当前行（和当前字）的耗时：二分查找 对比 逐行线性扫描。
+import argparse
+import random
+import time
+from core.lyrics import parse_lrc
+from benchmarks.common import synthetic_word
+
+
+def format_stamp(ms):
+    return f"{ms // 60000:02d}:{ms // 1000 % 60:02d}.{ms % 1000 // 10:02d}"
+
+
+def synthetic_lrc(lines, seed=0):
+    """合成 LRC 文本：按时间递增的歌词行，前一半时间再重复出现一次（多时间标签）"""
+    rng = random.Random(seed)
+    out = ['[ti:synthetic]', '[offset:+120]']
+    span = lines * 2000
+    for i in range(lines):
+        start = i * 2000
+        words = [synthetic_word(rng) for _ in range(rng.randint(3, 8))]
+        if i % 2:
+            step = 1800 // len(words)
+            body = ''.join(f"<{format_stamp(start + j * step)}>{word} " for j, word in enumerate(words))
+        else:
+            body = ' '.join(words)
+        out.append(f"[{format_stamp(start)}][{format_stamp(start + span)}]{body}")
+    return '\n'.join(out)
+
+
+def linear_index(times, position_ms):
+    """对照：从头扫描找到最后一个不晚于 position_ms 的行"""
+    index = -1
+    for i, stamp in enumerate(times):
+        if stamp > position_ms:
+            break
+        index = i
+    return index
+
+
+def run(lines, ticks):
+    text = synthetic_lrc(lines)
+    start = time.perf_counter()
+    lyrics = parse_lrc(text)
+    parse_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(1)
+    end = lyrics.times[-1] + 2000
+    # 模拟播放：每 100ms 一次位置更新，偶尔跳转
+    positions = []
+    position = 0
+    for _ in range(ticks):
+        position = rng.randrange(end) if rng.random() < 0.001 else (position + 100) % end
+        positions.append(position)
+
+    start = time.perf_counter()
+    for position in positions:
+        index = lyrics.index_at(position)
+        lyrics.word_index_at(index, position)
+    bisect_ns = (time.perf_counter() - start) / ticks * 1e9
+
+    # 线性扫描很慢，只在整段播放中均匀取样一部分位置
+    samples = max(1, min(ticks, 2_000_000 // len(lyrics)))
+    linear_ticks = sorted(positions)[::max(1, ticks // samples)]
+    start = time.perf_counter()
+    for position in linear_ticks:
+        linear_index(lyrics.times, position)
+    linear_ns = (time.perf_counter() - start) / len(linear_ticks) * 1e9
+
+    print(f"{lines:>8} 行（{len(lyrics)} 个时间点）  解析 {parse_ms:8.1f} ms  "
+          f"二分查找 {bisect_ns:7.0f} ns/次  线性扫描 {linear_ns:12.0f} ns/次")
+    return {'parse_ms': parse_ms, 'lookup_ns': bisect_ns, 'linear_ns': linear_ns}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="歌词定位基准")
+    parser.add_argument('--lines', type=int, nargs='+', default=[1000, 10_000, 100_000])
+    parser.add_argument('--ticks', type=int, default=200_000)
+    args = parser.parse_args()
+    for lines in args.lines:
+        run(lines, args.ticks)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# 搜索延迟基准：python -m benchmarks.bench_search [--sizes 10000 100000 1000000]
+import argparse
+import random
+import time
+from core.music_manager import MusicManager
+from benchmarks.common import WORDS, fill_library, temp_data_dir, time_calls, summarize
+
+
+def build_queries(seed=1, count=200):
+    """模拟逐键输入：同一个词的各个前缀，以及两个词的组合"""
+    rng = random.Random(seed)
+    queries = []
+    while len(queries) < count:
+        word = rng.choice(WORDS)
+        queries.extend(word[:n] for n in range(1, len(word) + 1))
+        queries.append(f"{word} {rng.choice(WORDS)[:2]}")
+    return [(query,) for query in queries[:count]]
+
+
+def build_cjk_queries():
+    """中文子串与罕见/不存在的词：词中间的字、跨词的组合，以及曲库中没有的词（最坏情况）"""
+    words = [word for word in WORDS if not word.isascii()]
+    queries = [word[1:] for word in words]  # 词中间/末尾的子串
+    queries += [f"{word}9{i}" for i, word in enumerate(words)]  # 罕见：词加指定后缀
+    queries += ['周杰', '周杰伦', '不存在的歌', '鸟', '晴天 不存在', 'love 周杰']  # 未命中
+    return [(query,) for query in queries]
+
+
+def run(sizes, limit=50):
+    results = []
+    for size in sizes:
+        with temp_data_dir() as data_dir:
+            manager = MusicManager(data_dir)
+            start = time.perf_counter()
+            fill_library(manager, size)
+            fill_seconds = time.perf_counter() - start
+
+            queries = build_queries()
+            manager.search(queries[0][0], limit)  # 预热页缓存
+            stats = summarize(time_calls(lambda q: manager.search(q, limit), queries))
+            cjk_stats = summarize(time_calls(lambda q: manager.search(q, limit), build_cjk_queries(), repeat=5))
+            manager.close()
+
+        stats.update({'rows': size, 'fill_s': fill_seconds,
+                      'cjk_median_ms': cjk_stats['median_ms'], 'cjk_p95_ms': cjk_stats['p95_ms']})
+        results.append(stats)
+        print(f"{size:>9} 行  填充 {fill_seconds:6.1f}s  "
+              f"中位数 {stats['median_ms']:.2f}ms  p95 {stats['p95_ms']:.2f}ms  最大 {stats['max_ms']:.2f}ms")
+        print(f"{'':>9}    中文子串/未命中  "
+              f"中位数 {cjk_stats['median_ms']:.2f}ms  p95 {cjk_stats['p95_ms']:.2f}ms  最大 {cjk_stats['max_ms']:.2f}ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FTS5 搜索延迟基准")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+    run(args.sizes, args.limit)
+
+
+if __name__ == '__main__':
+    main()
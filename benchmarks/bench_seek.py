@@ -0,0 +1,81 @@
+# 跳转延迟基准：python -m benchmarks.bench_seek [--durations 60 600 1800]
+# 按时长生成合成的 VBR MP3（只有合法帧头、静音帧体）和 WAV，测量：
+# 建索引耗时（等价于不用索引时从头扫描到末尾）、索引大小、索引查找延迟、
+# WAV 跳转并读出首块的延迟；装有 ffmpeg 时另外对比 MP3 有无索引的跳转延迟。
+import argparse
+import os
+import random
+from core.audio_decoder import WaveDecoder, FFmpegDecoder, BLOCK_FRAMES, find_ffmpeg
+from core.seek_index import build_seek_index
+from benchmarks.common import temp_data_dir, time_calls, summarize
+from benchmarks.synth_audio import write_vbr_mp3, write_wav
+
+
+def seek_targets(seconds, count=50, seed=1):
+    rng = random.Random(seed)
+    return [(rng.uniform(0, seconds * 0.95),) for _ in range(count)]
+
+
+def time_decoder_seek(decoder, targets):
+    def seek_and_read(target):
+        decoder.seek(target)
+        decoder.read(BLOCK_FRAMES)
+    return summarize(time_calls(seek_and_read, targets))
+
+
+def run(durations):
+    results = []
+    with_ffmpeg = bool(find_ffmpeg())
+    for seconds in durations:
+        with temp_data_dir() as data_dir:
+            mp3_path = os.path.join(data_dir, 'bench.mp3')
+            wav_path = os.path.join(data_dir, 'bench.wav')
+            write_vbr_mp3(mp3_path, seconds)
+            write_wav(wav_path, seconds)
+            targets = seek_targets(seconds)
+
+            build = summarize(time_calls(build_seek_index, [(mp3_path,)] * 3))
+            seek_index = build_seek_index(mp3_path)
+            lookup = summarize(time_calls(seek_index.lookup, targets * 20))
+
+            wav_decoder = WaveDecoder(wav_path)
+            wav_seek = time_decoder_seek(wav_decoder, targets)
+            wav_decoder.close()
+
+            result = {
+                'seconds': seconds,
+                'mp3_bytes': os.path.getsize(mp3_path),
+                'index_points': len(seek_index),
+                'index_bytes': len(seek_index.to_blob()),
+                'index_build_ms': build['median_ms'],
+                'lookup_us': lookup['median_ms'] * 1000,
+                'wav_seek_ms': wav_seek['median_ms'],
+            }
+
+            if with_ffmpeg:
+                for key, index in (('ffmpeg_seek_ms', None), ('ffmpeg_indexed_seek_ms', seek_index)):
+                    decoder = FFmpegDecoder(mp3_path, seek_index=index)
+                    result[key] = time_decoder_seek(decoder, targets[:10])['median_ms']
+                    decoder.close()
+
+        results.append(result)
+        line = (f"{seconds:>6}s  MP3 {result['mp3_bytes'] / 1e6:6.1f}MB  "
+                f"建索引 {result['index_build_ms']:7.1f}ms  "
+                f"索引 {result['index_points']} 点/{result['index_bytes'] / 1024:.1f}KB  "
+                f"查找 {result['lookup_us']:.2f}us  WAV 跳转 {result['wav_seek_ms']:.2f}ms")
+        if with_ffmpeg:
+            line += (f"  ffmpeg 跳转 {result['ffmpeg_seek_ms']:.1f}ms"
+                     f" / 带索引 {result['ffmpeg_indexed_seek_ms']:.1f}ms")
+        print(line)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="跳转延迟随文件时长的变化")
+    parser.add_argument('--durations', type=int, nargs='+', default=[60, 600, 1800])
+    args = parser.parse_args()
+    run(args.durations)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# 频谱分析基准：python -m benchmarks.bench_spectrum [--seconds 30]
+# 按输出块把合成信号送入分接缓冲，测量输出线程一侧每块多出的耗时（未启用 / 启用），
+# 以及分析线程每帧取窗口 + FFT + 频带合并的耗时，换算成按 FPS 帧率运行时占一个核心的比例。
+# 另用单音检查频带定位：能量最大的频带应包含该频率。
+import argparse
+import time
+import numpy as np
+from core.audio_decoder import SAMPLE_RATE, BLOCK_FRAMES, FRAME_BYTES
+from core.spectrum import SpectrumTap, SpectrumAnalyzer, FFT_SIZE, BANDS
+from core.spectrum_worker import SpectrumWorker
+from core.audio_output import AudioOutput
+from benchmarks.common import summarize
+from benchmarks.bench_equalizer import test_signal
+
+
+def tap_blocks(tap, data):
+    """模拟输出线程逐块分接，返回每块多出的耗时（毫秒）列表"""
+    output = AudioOutput()
+    output.tap = tap
+    block_bytes = BLOCK_FRAMES * FRAME_BYTES
+    timings = []
+    for offset in range(0, len(data), block_bytes):
+        block = data[offset:offset + block_bytes]
+        start = time.perf_counter()
+        if output.tap is not None and output.tap.enabled:
+            output._tap_segments(block, [(None, offset // FRAME_BYTES, len(block) // FRAME_BYTES)])
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def analyze_frames(tap, analyzer, end_frame, frames):
+    """模拟分析线程：在最近的块中按 30fps 的间隔取窗口并分析，返回每帧耗时（毫秒）列表"""
+    step = SAMPLE_RATE // SpectrumWorker.FPS
+    timings = []
+    for i in range(frames):
+        position = end_frame - (i * step) % (BLOCK_FRAMES * 4)
+        start = time.perf_counter()
+        samples = tap.window(None, position, analyzer.size)
+        if samples is not None:
+            analyzer.analyze(samples)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def tone_band(analyzer, freq):
+    """单音信号能量最大的频带序号"""
+    t = np.arange(analyzer.size) / SAMPLE_RATE
+    tone = 0.5 * np.sin(2 * np.pi * freq * t)
+    bands, _ = analyzer.analyze(np.stack([tone, tone], axis=1))
+    return int(np.argmax(bands))
+
+
+def run(seconds):
+    data = test_signal(seconds)
+    print(f"{seconds}s 立体声，每块 {BLOCK_FRAMES} 帧，FFT {FFT_SIZE} 点，{BANDS} 个频带，{SpectrumWorker.FPS}fps")
+    results = {}
+
+    tap = SpectrumTap()
+    stats = summarize(tap_blocks(tap, data))
+    print(f"  输出线程（未启用） 中位数 {stats['median_ms'] * 1000:7.2f} µs  p95 {stats['p95_ms'] * 1000:7.2f} µs")
+    tap.enabled = True
+    stats = summarize(tap_blocks(tap, data))
+    results['tap_ms'] = stats['p95_ms']
+    print(f"  输出线程（启用）   中位数 {stats['median_ms'] * 1000:7.2f} µs  p95 {stats['p95_ms'] * 1000:7.2f} µs")
+
+    analyzer = SpectrumAnalyzer()
+    end_frame = len(data) // FRAME_BYTES
+    stats = summarize(analyze_frames(tap, analyzer, end_frame, 2000))
+    results['frame_ms'] = stats['p95_ms']
+    load = stats['median_ms'] * SpectrumWorker.FPS / 1000
+    print(f"  分析一帧           中位数 {stats['median_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f} ms  "
+          f"单核占用 {load:.2%}")
+
+    edges = analyzer.edges
+    for freq in (100, 1000, 10000):
+        band = tone_band(analyzer, freq)
+        print(f"  {freq:>5} Hz 单音 -> 频带 {band:2d}（{edges[band]:7.0f} ~ {edges[band + 1]:7.0f} Hz）")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="频谱分析耗时基准")
+    parser.add_argument('--seconds', type=float, default=30)
+    args = parser.parse_args()
+    run(args.seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+# 启动时间基准：python -m benchmarks.bench_startup [--sizes 0 10000 100000] [--runs 5] [--drop-caches]
+# 每次启动都是一个新的解释器进程（offscreen 平台，无需显示器），从创建进程开始计时，报告：
+#   首帧绘制：主窗口第一次收到绘制事件
+#   可交互：所有启动阶段完成（MainWindow.startup_finished）
+# 冷启动使用空的字节码缓存目录（等价于安装后第一次运行），指定 --drop-caches 且有权限时
+# 还会先清空系统页缓存；热启动为同一曲库的后续启动，取中位数。
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.common import fill_library, temp_data_dir
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def child(data_dir, launch_time):
+    """子进程：启动主窗口，记录各阶段时间后退出，结果以 JSON 输出到标准输出"""
+    from PyQt6.QtCore import QObject, QEvent, QTimer
+    from PyQt6.QtWidgets import QApplication
+
+    times = {}
+
+    def mark(name):
+        times.setdefault(name, (time.time() - launch_time) * 1000)
+
+    app = QApplication(sys.argv)
+    mark('qt_ready_ms')
+
+    from ui.main_window import MainWindow
+    mark('imported_ms')
+
+    class PaintWatcher(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint:
+                mark('first_paint_ms')
+            return False
+
+    window = MainWindow(data_dir)
+    watcher = PaintWatcher()
+    window.installEventFilter(watcher)
+
+    def on_finished():
+        mark('interactive_ms')
+        QTimer.singleShot(0, window.close)
+        QTimer.singleShot(0, app.quit)
+
+    window.startup_finished.connect(on_finished)
+    window.show()
+    QTimer.singleShot(30_000, app.quit)  # 防止启动失败时挂起
+    app.exec()
+    print(json.dumps(times))
+
+
+def drop_page_cache():
+    """清空系统页缓存（需要 root），返回是否成功"""
+    try:
+        os.sync()
+        with open('/proc/sys/vm/drop_caches', 'w') as f:
+            f.write('3\n')
+        return True
+    except OSError:
+        return False
+
+
+def launch(data_dir, pycache_dir=None):
+    """启动一个子进程并返回其各阶段耗时"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', SDL_AUDIODRIVER='dummy')
+    if pycache_dir:
+        env['PYTHONPYCACHEPREFIX'] = pycache_dir
+    launch_time = time.time()
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_startup', '--child', data_dir, str(launch_time)],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(sizes, runs, drop_caches=False):
+    results = []
+    for size in sizes:
+        with temp_data_dir() as data_dir:
+            from core.music_manager import MusicManager
+            manager = MusicManager(data_dir)
+            fill_library(manager, size)
+            # 合成行不对应真实文件，标记为已分析，避免启动后触发响度分析
+            manager.db.execute('UPDATE music SET gain_db = 0')
+            manager.close()
+
+            dropped = drop_page_cache() if drop_caches else False
+            with tempfile.TemporaryDirectory(prefix='music_bench_pycache_') as pycache_dir:
+                cold = launch(data_dir, pycache_dir)
+            warm_runs = [launch(data_dir) for _ in range(runs)]
+
+        warm = {key: statistics.median(r[key] for r in warm_runs) for key in cold}
+        result = {'rows': size, 'page_cache_dropped': dropped, 'cold': cold, 'warm': warm}
+        results.append(result)
+        print(f"{size:>8} 行  冷启动 首帧 {cold['first_paint_ms']:7.1f}ms 可交互 {cold['interactive_ms']:7.1f}ms  "
+              f"热启动 首帧 {warm['first_paint_ms']:7.1f}ms 可交互 {warm['interactive_ms']:7.1f}ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷/热启动时间基准")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[0, 10_000, 100_000])
+    parser.add_argument('--runs', type=int, default=5, help="每个曲库大小的热启动次数")
+    parser.add_argument('--drop-caches', action='store_true', help="冷启动前清空系统页缓存（需要 root）")
+    parser.add_argument('--json', help="把结果写入 JSON 文件")
+    parser.add_argument('--child', nargs=2, metavar=('DATA_DIR', 'LAUNCH_TIME'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], float(args.child[1]))
+        return
+
+    results = run(args.sizes, args.runs, args.drop_caches)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+# 生成合成曲库用的词表
+WORDS = [
+    'love', 'night', 'rain', 'summer', 'dream', 'light', 'fire', 'heart', 'road', 'city',
+    'blue', 'gold', 'river', 'moon', 'star', 'wind', 'ocean', 'shadow', 'echo', 'home',
+    'silver', 'winter', 'garden', 'storm', 'mirror', 'paper', 'glass', 'velvet', 'neon', 'forest',
+    '晴天', '夜曲', '稻香', '告白', '气球', '青花', '烟花', '江南', '故乡', '星空',
+]
+
+
+def synthetic_word(rng):
+    """随机生成一个词：词表中的词加随机后缀，扩大词汇量"""
+    return f"{rng.choice(WORDS)}{rng.randint(0, 999)}"
+
+
+def synthetic_music_rows(count, seed=0, path_prefix='/synthetic'):
+    """生成合成的音乐行（不对应真实文件），用于数据库层基准测试"""
+    rng = random.Random(seed)
+    artists = [f"{synthetic_word(rng)} {synthetic_word(rng)}" for _ in range(max(1, count // 20))]
+    albums = [' '.join(synthetic_word(rng) for _ in range(rng.randint(1, 3))) for _ in range(max(1, count // 10))]
+    now = int(time.time())
+
+    for i in range(count):
+        duration = rng.uniform(90, 420)
+        yield {
+            'title': ' '.join(synthetic_word(rng) for _ in range(rng.randint(1, 4))),
+            'artist': rng.choice(artists),
+            'album': rng.choice(albums),
+            'filename': f"{i}.mp3",
+            'file_path': f"{path_prefix}/{i}.mp3",
+            'duration': duration,
+            'duration_str': f"{int(duration // 60):02d}:{int(duration % 60):02d}",
+            'file_size': rng.randint(2_000_000, 12_000_000),
+            'import_time': now - i,
+            'mtime_ns': None,
+            'managed': 1,
+            'folder_id': None,
+            'content_hash': None,
+        }
+
+
+def fill_library(music_manager, count, seed=0, batch_size=10000):
+    """向曲库批量写入合成数据"""
+    batch = []
+    for music in synthetic_music_rows(count, seed):
+        batch.append(music)
+        if len(batch) >= batch_size:
+            music_manager._insert_music_batch(batch)
+            batch = []
+    if batch:
+        music_manager._insert_music_batch(batch)
+
+
+@contextmanager
+def temp_data_dir():
+    """临时数据目录，退出时删除"""
+    path = tempfile.mkdtemp(prefix='music_bench_')
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def time_calls(func, args_list, repeat=1):
+    """依次以 args_list 中的参数调用 func，返回每次调用耗时（毫秒）"""
+    timings = []
+    for _ in range(repeat):
+        for args in args_list:
+            start = time.perf_counter()
+            func(*args)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings):
+    """汇总耗时（毫秒）：中位数、p95、最大值"""
+    ordered = sorted(timings)
+    return {
+        'count': len(ordered),
+        'median_ms': statistics.median(ordered),
+        'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max_ms': ordered[-1],
+    }
@@ -0,0 +1,203 @@
+# 性能基准套件：python -m benchmarks.suite [--sizes 1000 10000] [--output results.json]
+#                                        [--baseline benchmarks/baseline.json] [--save-baseline]
+# 按曲库大小生成合成的带标签短音频（WAV/FLAC/MP3），依次测量热点路径：
+#   元数据读取、MusicManager.add_music、get_all_music、MusicList.update_music_list、
+#   上一曲/下一曲查找、建跳转索引与 WAV 跳转。
+# 结果写入 JSON 文件，并与保存的基线比较：_per_sec 越大越好，_ms/_us 越小越好，
+# 变差超过阈值的指标会被列出且进程以 1 退出。基线与机器相关，换机器后用 --save-baseline 重新生成。
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from benchmarks.common import temp_data_dir, time_calls, summarize
+from benchmarks.synth_audio import generate_library
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def bench_metadata(paths):
+    from utils.audio_utils import get_audio_metadata_batch
+    start = time.perf_counter()
+    get_audio_metadata_batch(paths)
+    return {'metadata_files_per_sec': len(paths) / (time.perf_counter() - start)}
+
+
+def bench_import(manager, paths):
+    start = time.perf_counter()
+    manager.add_music(paths)
+    return {'import_files_per_sec': len(paths) / (time.perf_counter() - start)}
+
+
+def bench_queries(manager):
+    music_list = manager.get_all_music()
+    timings = time_calls(manager.get_all_music, [()] * 3)
+    return {'get_all_music_ms': summarize(timings)['median_ms']}, music_list
+
+
+def bench_music_list(music_list):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtWidgets import QApplication
+    from ui.components.music_list import MusicList
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    widget = MusicList()
+    widget.resize(800, 600)
+    timings = time_calls(widget.update_music_list, [(music_list,)] * 20)
+    app.processEvents()
+    widget.deleteLater()
+    return {'update_music_list_ms': summarize(timings)['median_ms']}
+
+
+def bench_queue(manager, steps=100_000):
+    from core.play_queue import PlayQueue
+
+    queue = PlayQueue(manager.get_play_order)
+
+    def load():
+        queue.invalidate()
+        queue.next_id()
+
+    rng = random.Random(0)
+    moves = [rng.random() < 0.7 for _ in range(steps)]
+
+    def walk():
+        # 单次调用远低于计时精度，整段计时后取平均
+        start = time.perf_counter()
+        for forward in moves:
+            queue.set_current(queue.next_id() if forward else queue.prev_id())
+        return (time.perf_counter() - start) / steps * 1e6
+
+    result = {'queue_load_ms': summarize(time_calls(load, [()] * 5))['median_ms']}
+    result['next_prev_us'] = walk()
+    queue.set_mode(PlayQueue.SHUFFLE)
+    result['shuffle_next_prev_us'] = walk()
+    return result
+
+
+def bench_seek(paths, count=50):
+    from core.audio_decoder import WaveDecoder, BLOCK_FRAMES
+    from core.seek_index import build_seek_index
+
+    mp3_paths = [(path,) for path in paths if path.endswith('.mp3')][:count]
+    wav_paths = [path for path in paths if path.endswith('.wav')][:count]
+    result = {}
+    if mp3_paths:
+        result['seek_index_build_ms'] = summarize(time_calls(build_seek_index, mp3_paths, repeat=5))['median_ms']
+    if wav_paths:
+        def seek_and_read(path):
+            decoder = WaveDecoder(path)
+            decoder.seek(decoder.duration / 2)
+            decoder.read(BLOCK_FRAMES)
+            decoder.close()
+        result['wav_open_seek_ms'] = summarize(time_calls(seek_and_read, [(path,) for path in wav_paths], repeat=5))['median_ms']
+    return result
+
+
+def run_size(size):
+    """生成一个曲库并测量全部热点路径"""
+    from core.music_manager import MusicManager
+
+    with temp_data_dir() as work_dir:
+        source_dir = os.path.join(work_dir, 'source')
+        start = time.perf_counter()
+        paths = generate_library(source_dir, size)
+        generate_s = time.perf_counter() - start
+
+        results = bench_metadata(paths)
+        manager = MusicManager(os.path.join(work_dir, 'data'))
+        try:
+            results.update(bench_import(manager, paths))
+            query_results, music_list = bench_queries(manager)
+            results.update(query_results)
+            results.update(bench_music_list(music_list))
+            results.update(bench_queue(manager))
+            results.update(bench_seek(paths))
+        finally:
+            manager.close()
+
+    print(f"{size:>8} 首（生成 {generate_s:.1f}s）")
+    for key, value in results.items():
+        print(f"    {key:<26} {value:12.3f}")
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(DEFAULT_BASELINE)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def higher_is_better(metric):
+    return metric.endswith('_per_sec')
+
+
+def compare(current, baseline, threshold):
+    """与基线比较，返回变差超过阈值的 (大小, 指标, 基线值, 当前值, 变化比例) 列表"""
+    regressions = []
+    for size, metrics in current['results'].items():
+        base_metrics = baseline.get('results', {}).get(size)
+        if not base_metrics:
+            continue
+        print(f"{size:>8} 首  对比基线 {baseline.get('meta', {}).get('commit') or ''}")
+        for metric, value in metrics.items():
+            base = base_metrics.get(metric)
+            if not base:
+                continue
+            change = value / base - 1
+            worse = -change if higher_is_better(metric) else change
+            flag = '  <-- 变差' if worse > threshold else ''
+            print(f"    {metric:<26} {base:12.3f} -> {value:12.3f}  {change:+7.1%}{flag}")
+            if worse > threshold:
+                regressions.append((size, metric, base, value, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="性能基准套件")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10_000])
+    parser.add_argument('--output', default='benchmark_results.json', help="结果 JSON 文件")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="基线 JSON 文件")
+    parser.add_argument('--save-baseline', action='store_true', help="把本次结果保存为基线")
+    parser.add_argument('--threshold', type=float, default=0.25, help="判定为变差的相对变化")
+    args = parser.parse_args()
+
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'time': int(time.time()),
+        },
+        'results': {str(size): run_size(size) for size in args.sizes},
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"结果已写入 {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"基线已保存到 {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("没有基线文件，跳过比较（使用 --save-baseline 生成）")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} 项指标变差超过 {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+# 合成音频文件生成：只写出合法的文件头/帧头，内容为静音，足够测试导入、元数据和跳转路径。
+# marker 参数把一个整数写进文件内容，使同样时长、无标签的文件内容也互不相同（避免被导入去重跳过）。
+import os
+import random
+import struct
+import wave
+from core.audio_decoder import SAMPLE_RATE
+from benchmarks.common import synthetic_word
+
+MP3_BITRATE_INDEXES = [(9, 128), (11, 192), (14, 320), (5, 64)]  # (bitrate index, kbps)
+
+
+def write_vbr_mp3(path, seconds, seed=0, marker=None):
+    """写入 MPEG1 Layer III 44.1kHz 的随机码率帧序列"""
+    rng = random.Random(seed)
+    frames = int(seconds * SAMPLE_RATE / 1152)
+    with open(path, 'wb') as f:
+        for i in range(frames):
+            index, kbps = rng.choice(MP3_BITRATE_INDEXES)
+            length = 144 * kbps * 1000 // SAMPLE_RATE
+            body = bytearray(length - 4)
+            if i == 0 and marker is not None:
+                body[-4:] = struct.pack('<I', marker & 0xFFFFFFFF)
+            f.write(bytes([0xFF, 0xFB, index << 4, 0xC4]) + body)
+
+
+def write_wav(path, seconds, marker=None):
+    """写入 16 位 44.1kHz 单声道静音 WAV"""
+    chunk = bytes(SAMPLE_RATE * 2)
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        if marker is not None:
+            wav.writeframes(struct.pack('<I', marker & 0xFFFFFFFF))
+        for _ in range(int(seconds)):
+            wav.writeframes(chunk)
+
+
+def write_flac(path, seconds, marker=None):
+    """写入只有 STREAMINFO 的 FLAC 文件头（无音频帧，标签与流信息足以被解析）"""
+    sample_rate, channels, bits = 44100, 2, 16
+    total = int(seconds * sample_rate)
+    packed = (sample_rate << 44) | ((channels - 1) << 41) | ((bits - 1) << 36) | total
+    md5 = (marker or 0).to_bytes(16, 'big')  # 音频 MD5 字段，这里只用来区分文件
+    streaminfo = struct.pack('>HH', 4096, 4096) + bytes(6) + packed.to_bytes(8, 'big') + md5
+    with open(path, 'wb') as f:
+        f.write(b'fLaC' + bytes([0x80]) + len(streaminfo).to_bytes(3, 'big') + streaminfo)
+
+
+def write_tags(path, kind, tags):
+    """写入标签：MP3 用 ID3，FLAC 用 Vorbis 注释，WAV 用 id3 块"""
+    if not tags:
+        return
+    if kind == 'mp3':
+        from mutagen.easyid3 import EasyID3
+        audio = EasyID3()
+        for key, value in tags.items():
+            audio[key] = value
+        audio.save(path)
+    elif kind == 'flac':
+        from mutagen.flac import FLAC
+        audio = FLAC(path)
+        for key, value in tags.items():
+            audio[key] = value
+        audio.save()
+    else:
+        from mutagen.id3 import TIT2, TPE1, TALB
+        from mutagen.wave import WAVE
+        frames = {'title': TIT2, 'artist': TPE1, 'album': TALB}
+        audio = WAVE(path)
+        audio.add_tags()
+        for key, value in tags.items():
+            audio.tags.add(frames[key](encoding=3, text=value))
+        audio.save()
+
+
+def embed_cover(path, kind, image_data, mime='image/jpeg'):
+    """写入内嵌封面：MP3 用 ID3 APIC，FLAC 用 PICTURE 块"""
+    if kind == 'mp3':
+        from mutagen.id3 import ID3, APIC, ID3NoHeaderError
+        try:
+            tags = ID3(path)
+        except ID3NoHeaderError:
+            tags = ID3()
+        tags.add(APIC(encoding=3, mime=mime, type=3, desc='Cover', data=image_data))
+        tags.save(path)
+    elif kind == 'flac':
+        from mutagen.flac import FLAC, Picture
+        audio = FLAC(path)
+        picture = Picture()
+        picture.type = 3
+        picture.mime = mime
+        picture.data = image_data
+        audio.add_picture(picture)
+        audio.save()
+    else:
+        raise ValueError(f"不支持写入封面的格式: {kind}")
+
+
+def synthetic_tags(rng, artists, albums):
+    """随机标签：大部分完整，少数缺失某些字段或完全没有标签"""
+    roll = rng.random()
+    if roll < 0.05:
+        return {}
+    tags = {'title': ' '.join(synthetic_word(rng) for _ in range(rng.randint(1, 6)))}
+    if roll > 0.1:
+        tags['artist'] = rng.choice(artists)
+    if roll > 0.15:
+        tags['album'] = rng.choice(albums)
+    return tags
+
+
+def generate_library(directory, count, formats=('wav', 'flac', 'mp3'), seconds=(1, 3), seed=0):
+    """在 directory 下生成 count 个带标签的短音频文件（每 500 个一个子目录），返回路径列表"""
+    rng = random.Random(seed)
+    artists = [f"{synthetic_word(rng)} {synthetic_word(rng)}" for _ in range(max(1, count // 20))]
+    albums = [' '.join(synthetic_word(rng) for _ in range(rng.randint(1, 3))) for _ in range(max(1, count // 10))]
+    writers = {'wav': write_wav, 'flac': write_flac}
+
+    paths = []
+    for i in range(count):
+        kind = formats[i % len(formats)]
+        subdir = os.path.join(directory, f"{i // 500:04d}")
+        os.makedirs(subdir, exist_ok=True)
+        path = os.path.join(subdir, f"{i}.{kind}")
+        length = rng.uniform(*seconds)
+        if kind == 'mp3':
+            write_vbr_mp3(path, length, seed=i, marker=i)
+        else:
+            writers[kind](path, length, marker=i)
+        write_tags(path, kind, synthetic_tags(rng, artists, albums))
+        paths.append(path)
+    return paths
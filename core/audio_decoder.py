@@ -0,0 +1,414 @@
+import os
+import shutil
+import subprocess
+import threading
+import time
+import wave
+from array import array
+from pathlib import Path
+from utils import metrics
+
+# 输出 PCM 格式：与 pygame 混音器一致的 44.1kHz / 16 位 / 立体声
+SAMPLE_RATE = 44100
+CHANNELS = 2
+SAMPLE_WIDTH = 2
+FRAME_BYTES = CHANNELS * SAMPLE_WIDTH
+BLOCK_FRAMES = 4096  # 每块约 93ms
+
+_ffmpeg_path = None
+
+
+class DecoderError(Exception):
+    """音频解码失败"""
+
+
+def find_ffmpeg():
+    """查找 ffmpeg 可执行文件（pydub 依赖的同一个 ffmpeg）"""
+    global _ffmpeg_path
+    if _ffmpeg_path is None:
+        _ffmpeg_path = shutil.which('ffmpeg') or shutil.which('avconv') or ''
+    return _ffmpeg_path or None
+
+
+class WaveDecoder:
+    """WAV 解码器：16 位 44.1kHz 的 PCM 直接读取，单声道复制为立体声"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.wav = wave.open(file_path, 'rb')
+        self.channels = self.wav.getnchannels()
+        if (self.wav.getsampwidth() != SAMPLE_WIDTH or self.wav.getframerate() != SAMPLE_RATE
+                or self.channels not in (1, 2)):
+            self.wav.close()
+            raise DecoderError("WAV 格式与输出格式不一致")
+        self.total_frames = self.wav.getnframes()
+
+    @staticmethod
+    def supports(file_path):
+        """判断文件是否可以直接读取"""
+        try:
+            with wave.open(file_path, 'rb') as wav:
+                return (wav.getsampwidth() == SAMPLE_WIDTH and wav.getframerate() == SAMPLE_RATE
+                        and wav.getnchannels() in (1, 2))
+        except (wave.Error, EOFError, OSError):
+            return False
+
+    @property
+    def duration(self):
+        return self.total_frames / SAMPLE_RATE
+
+    def read(self, frames):
+        """读取最多 frames 帧，文件结束时返回空字节串"""
+        data = self.wav.readframes(frames)
+        if self.channels == 1 and data:
+            mono = array('h', data)
+            stereo = array('h', bytes(len(data) * 2))
+            stereo[0::2] = mono
+            stereo[1::2] = mono
+            data = stereo.tobytes()
+        return data
+
+    def seek(self, seconds):
+        """跳转到指定时间"""
+        frame = min(max(0, int(seconds * SAMPLE_RATE)), self.total_frames)
+        self.wav.setpos(frame)
+
+    def close(self):
+        self.wav.close()
+
+
+class FFmpegDecoder:
+    """通过 ffmpeg 子进程把任意格式解码成 PCM 流
+
+    提供了跳转索引时，MP3 直接从索引点所在帧的字节偏移开始解复用，
+    FLAC 把文件头和索引点之后的数据拼接后经管道送入 ffmpeg，
+    再丢弃索引点到目标时间之间的少量 PCM，不依赖 ffmpeg 从头扫描或按码率估算位置。
+    """
+
+    # 可以从任意帧边界开始解复用的格式
+    INDEXED_FORMATS = {'.mp3': 'mp3', '.flac': 'flac'}
+
+    def __init__(self, file_path, start=0.0, seek_index=None):
+        self.file_path = file_path
+        self.seek_index = seek_index
+        self.format = self.INDEXED_FORMATS.get(Path(file_path).suffix.lower())
+        self.process = None
+        self._skip_bytes = 0  # 跳转后需要丢弃的 PCM 字节数
+        self._feeder = None
+        self.seek(start)
+
+    def read(self, frames):
+        """读取最多 frames 帧，流结束时返回空字节串"""
+        while self._skip_bytes > 0:
+            skipped = self.process.stdout.read(min(self._skip_bytes, BLOCK_FRAMES * FRAME_BYTES))
+            if not skipped:
+                return b''
+            self._skip_bytes -= len(skipped)
+
+        wanted = frames * FRAME_BYTES
+        chunks = []
+        while wanted > 0:
+            chunk = self.process.stdout.read(wanted)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            wanted -= len(chunk)
+        data = b''.join(chunks)
+        return data[:len(data) - len(data) % FRAME_BYTES]
+
+    def seek(self, seconds):
+        """重启 ffmpeg 并从指定时间开始解码"""
+        self.close()
+        seconds = max(0.0, seconds)
+        output = [
+            '-f', 's16le', '-acodec', 'pcm_s16le',
+            '-ac', str(CHANNELS), '-ar', str(SAMPLE_RATE), '-'
+        ]
+
+        index = self.seek_index
+        if seconds > 0 and index and self.format and not index.estimated:
+            point_time, offset = index.lookup(seconds)
+            self._skip_bytes = int((seconds - point_time) * SAMPLE_RATE) * FRAME_BYTES
+            if self.format == 'mp3':
+                # MP3 帧自带同步头，直接跳过前面的字节
+                command = ['-skip_initial_bytes', str(offset), '-f', 'mp3', '-i', self.file_path]
+                self._start(command + output)
+            else:
+                # FLAC 需要文件头中的 STREAMINFO，经管道送入 文件头 + 索引点之后的数据
+                self._start(['-f', 'flac', '-i', 'pipe:0'] + output, stdin=subprocess.PIPE)
+                self._feeder = threading.Thread(
+                    target=self._feed, args=(self.process, index.data_offset, offset), daemon=True
+                )
+                self._feeder.start()
+            return
+
+        self._skip_bytes = 0
+        self._start(['-ss', f'{seconds:.3f}', '-i', self.file_path] + output)
+
+    def _start(self, args, stdin=subprocess.DEVNULL):
+        self.process = subprocess.Popen(
+            [find_ffmpeg(), '-v', 'error', '-nostdin'] + args,
+            stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            bufsize=BLOCK_FRAMES * FRAME_BYTES
+        )
+
+    def _feed(self, process, header_size, offset):
+        """把文件头和 offset 之后的数据写入 ffmpeg 的标准输入"""
+        try:
+            with open(self.file_path, 'rb') as f:
+                process.stdin.write(f.read(header_size))
+                f.seek(offset)
+                for chunk in iter(lambda: f.read(1 << 16), b''):
+                    process.stdin.write(chunk)
+        except (BrokenPipeError, ValueError, OSError):
+            pass  # ffmpeg 已被关闭
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    def close(self):
+        if self.process:
+            self.process.kill()
+            self.process.stdout.close()
+            self.process.wait()
+            self.process = None
+        if self._feeder:
+            self._feeder.join(timeout=1)
+            self._feeder = None
+
+
+class MemoryDecoder:
+    """从内存中已解码的整首 PCM 读取，跳转为常数时间"""
+
+    def __init__(self, data, file_path=None):
+        self.file_path = file_path
+        self.data = data
+        self.offset = 0
+
+    def read(self, frames):
+        data = self.data[self.offset:self.offset + frames * FRAME_BYTES]
+        self.offset += len(data)
+        return data
+
+    def seek(self, seconds):
+        self.offset = min(max(0, int(seconds * SAMPLE_RATE)) * FRAME_BYTES, len(self.data))
+
+    def close(self):
+        self.data = b''
+
+
+class PygameDecoder(MemoryDecoder):
+    """后备解码器：没有 ffmpeg 时由 pygame 一次性解码整首（内存占用随时长增长）"""
+
+    def __init__(self, file_path):
+        import pygame
+        if not pygame.mixer.get_init():
+            # 在没有初始化混音器的进程中（如响度分析子进程）使用
+            pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=CHANNELS)
+        super().__init__(pygame.mixer.Sound(file_path).get_raw(), file_path)
+
+
+def open_decoder(file_path, start=0.0, seek_index=None):
+    """根据文件格式选择解码器，seek_index 为可选的跳转索引"""
+    if not os.path.exists(file_path):
+        raise DecoderError(f"文件不存在: {file_path}")
+
+    if Path(file_path).suffix.lower() == '.wav' and WaveDecoder.supports(file_path):
+        decoder = WaveDecoder(file_path)
+    elif find_ffmpeg():
+        return FFmpegDecoder(file_path, start, seek_index)
+    else:
+        decoder = PygameDecoder(file_path)
+
+    if start > 0:
+        decoder.seek(start)
+    return decoder
+
+
+def iter_blocks(decoder, block_frames=BLOCK_FRAMES):
+    """惰性地逐块产出固定大小的 PCM 数据（最后一块可能不足）"""
+    while True:
+        block = decoder.read(block_frames)
+        if not block:
+            return
+        yield block
+
+
+class RingBuffer:
+    """有界字节环形缓冲区：解码线程写入，输出线程读取"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._read_pos = 0
+        self._size = 0
+        self._eof = False
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def write(self, data):
+        """写入数据，缓冲区满时阻塞；缓冲区被关闭时返回 False"""
+        view = memoryview(data)
+        with self._cond:
+            while view:
+                while self._size == self.capacity and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return False
+
+                write_pos = (self._read_pos + self._size) % self.capacity
+                count = min(len(view), self.capacity - self._size, self.capacity - write_pos)
+                self._buffer[write_pos:write_pos + count] = view[:count]
+                self._size += count
+                view = view[count:]
+                self._cond.notify_all()
+        return True
+
+    def read(self, size):
+        """读取最多 size 字节（不阻塞），数据不足时返回现有数据"""
+        with self._cond:
+            count = min(size, self._size)
+            first = min(count, self.capacity - self._read_pos)
+            data = bytes(self._buffer[self._read_pos:self._read_pos + first])
+            if count > first:
+                data += bytes(self._buffer[:count - first])
+            self._read_pos = (self._read_pos + count) % self.capacity
+            self._size -= count
+            self._cond.notify_all()
+            return data
+
+    def available(self):
+        with self._cond:
+            return self._size
+
+    def mark_eof(self):
+        """标记生产者已写完"""
+        with self._cond:
+            self._eof = True
+            self._cond.notify_all()
+
+    @property
+    def eof(self):
+        """生产者已写完（缓冲区中可能还有数据）"""
+        with self._cond:
+            return self._eof
+
+    @property
+    def finished(self):
+        """生产者已结束且数据已读完"""
+        with self._cond:
+            return self._eof and self._size == 0
+
+    def close(self):
+        """关闭缓冲区，唤醒阻塞的写入者"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reset(self):
+        """清空数据并恢复可写状态"""
+        with self._cond:
+            self._read_pos = 0
+            self._size = 0
+            self._eof = False
+            self._closed = False
+            self._cond.notify_all()
+
+
+class AudioStream:
+    """单个音轨的流式解码：后台线程逐块解码写入有界环形缓冲区
+
+    内存占用只取决于缓冲区大小，与音轨时长无关（调用 record 留存整首时除外）。
+    decoder 可传入现成的解码器（如缓存命中时的 MemoryDecoder）。
+    """
+
+    def __init__(self, file_path, start=0.0, buffer_seconds=2.0, block_frames=BLOCK_FRAMES, seek_index=None,
+                 decoder=None):
+        self.file_path = file_path
+        self.block_frames = block_frames
+        self.buffer = RingBuffer(int(buffer_seconds * SAMPLE_RATE) * FRAME_BYTES)
+        self.decoder = decoder or open_decoder(file_path, start, seek_index)
+        if decoder is not None and start > 0:
+            decoder.seek(start)
+        self.start_frame = int(start * SAMPLE_RATE)  # 缓冲区开头对应的帧位置
+        self.gain = 1.0  # 回放增益（线性），由输出端逐块施加
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._recording = None  # 留存整首：[已解码的块, 已留存字节数, 字节上限, 完成回调]
+
+    def record(self, limit_bytes, on_complete):
+        """播放解码的同时留存各块，从头到尾解码完成时回调 on_complete(pcm)（在解码线程中调用）
+
+        须在 start 之前、从开头解码时调用；超过 limit_bytes 或中途跳转时放弃留存。
+        """
+        if self.start_frame == 0 and self._thread is None:
+            self._recording = [[], 0, limit_bytes, on_complete]
+
+    def start(self):
+        """启动解码线程"""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+        return self
+
+    def _produce(self):
+        started = time.perf_counter()
+        first = True
+        try:
+            for block in iter_blocks(self.decoder, self.block_frames):
+                if first:
+                    # 打开/跳转后到第一块解码完成的延迟
+                    metrics.observe('decoder.first_block', (time.perf_counter() - started) * 1000)
+                    first = False
+                metrics.count('decoder.blocks')
+                if self._stop_event.is_set() or not self.buffer.write(block):
+                    return
+                if self._recording is not None:
+                    self._keep(block)
+        except Exception as e:
+            print(f"解码失败: {e}")
+            self._recording = None
+        self.buffer.mark_eof()
+        recording, self._recording = self._recording, None
+        if recording is not None:
+            recording[3](b''.join(recording[0]))
+
+    def _keep(self, block):
+        recording = self._recording
+        recording[1] += len(block)
+        if recording[1] > recording[2]:
+            self._recording = None
+        else:
+            recording[0].append(block)
+
+    def read(self, size):
+        """读取最多 size 字节 PCM"""
+        return self.buffer.read(size)
+
+    @property
+    def finished(self):
+        """整首已解码并读完"""
+        return self.buffer.finished
+
+    def seek(self, seconds):
+        """跳转：停止解码线程、清空缓冲区后从新位置继续解码"""
+        self._stop()
+        self._recording = None
+        self.buffer.reset()
+        self.decoder.seek(seconds)
+        self.start_frame = int(seconds * SAMPLE_RATE)
+        self.start()
+
+    def _stop(self):
+        self._stop_event.set()
+        self.buffer.close()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2)
+
+    def close(self):
+        """停止解码并释放资源"""
+        self._stop()
+        self._recording = None
+        self.decoder.close()
@@ -0,0 +1,236 @@
+import threading
+import time
+import numpy as np
+import pygame
+from core.audio_decoder import SAMPLE_RATE, FRAME_BYTES, BLOCK_FRAMES
+from core.playback_clock import PlaybackClock
+from utils import metrics
+
+
+class AudioOutput:
+    """音频输出：后台线程从 AudioStream 的环形缓冲区取块，排队送入 pygame 声道
+
+    pygame 声道最多排队一个 Sound，输出线程在队列空出时补上下一块，
+    缓冲区来不及供数导致声道空转时记为一次欠载（underrun）。
+    设置了 next_stream 时，当前流的最后一块会用下一首的开头补齐，在同一块内无缝衔接。
+    每个流的回放增益（stream.gain）在送入声道前逐块施加，设置了均衡器时由均衡器一并处理。
+    设置了分接缓冲（SpectrumTap）且已启用时，送入声道的每块都复制一份给频谱分析。
+    """
+
+    GAP_WINDOW = 5.0  # 上一首结束后这么久内开始的播放才计为切歌间隙
+
+    def __init__(self, block_frames=BLOCK_FRAMES):
+        self.block_frames = block_frames
+        self.block_bytes = block_frames * FRAME_BYTES
+        self.block_seconds = block_frames / SAMPLE_RATE
+        self.underruns = 0  # 缓冲区欠载次数
+        self.frames_written = 0  # 当前流已送入声道的帧数
+        self.clock = PlaybackClock()  # 按实际送出的帧计时
+        self.on_finished = None  # 当前流播放完毕时回调（在输出线程中调用）
+        self.on_track_changed = None  # 无缝切换到下一首时回调 on_track_changed(stream)
+        self.on_gap = None  # 测得切歌间隙时回调 on_gap(seconds)
+        self.last_gap = None  # 最近一次测得的切歌间隙（秒）
+        self.equalizer = None  # 均衡器（Equalizer），在输出线程中逐块处理
+        self.tap = None  # 频谱分析的分接缓冲（SpectrumTap）
+
+        self.stream = None
+        self.next_stream = None  # 预解码的下一首
+        self.channel = None
+        self.paused = False
+        self._ended_at = None  # 上一首播放完毕的时间
+        self._idle_since = None  # 声道开始空转的时间
+        self._running = False
+        self._thread = None
+        self._cond = threading.Condition()
+
+    def start(self, stream):
+        """开始播放指定流"""
+        self.stop()
+        if self.channel is None:
+            pygame.mixer.set_reserved(1)
+            self.channel = pygame.mixer.Channel(0)
+
+        with self._cond:
+            self.stream = stream
+            self.frames_written = 0
+            self.paused = False
+            self._running = True
+            self.clock.resume()
+            self.clock.reset(stream.start_frame, stream)
+            if self.equalizer:
+                self.equalizer.reset()
+            if self.tap:
+                self.tap.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def set_next(self, stream):
+        """设置无缝衔接的下一首（None 表示取消）"""
+        with self._cond:
+            self.next_stream = stream
+
+    def pause(self):
+        with self._cond:
+            self.paused = True
+            if self.channel:
+                self.channel.pause()
+            self.clock.pause()
+
+    def resume(self):
+        with self._cond:
+            self.paused = False
+            if self.channel:
+                self.channel.unpause()
+            self.clock.resume()
+            self._cond.notify_all()
+
+    def flush(self):
+        """丢弃已排队的音频（跳转后调用）"""
+        with self._cond:
+            if self.channel:
+                self.channel.stop()
+            self.frames_written = 0
+            if self.stream:
+                self.clock.reset(self.stream.start_frame, self.stream)
+            if self.equalizer:
+                self.equalizer.reset()
+            if self.tap:
+                self.tap.clear()
+
+    def stop(self):
+        """停止输出线程"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self._thread = None
+        if self.channel:
+            self.channel.stop()
+        self.stream = None
+        self.next_stream = None
+
+    def position(self):
+        """正在发声的位置，返回 (所属的流, 帧)"""
+        return self.clock.position()
+
+    @property
+    def is_active(self):
+        """是否正在输出（未暂停）"""
+        return self._running and not self.paused
+
+    def _run(self):
+        starving = True  # 开始播放前的预缓冲不计为欠载
+        while True:
+            callbacks = []
+            with self._cond:
+                while self._running and self.paused:
+                    self._cond.wait()
+                if not self._running:
+                    return
+
+                stream = self.stream
+                segments = []  # 本块包含的各段 (所属流, 起始帧, 帧数)
+                if self.channel.get_queue() is not None:
+                    block = None  # 声道队列已满，稍后再补
+                elif stream.buffer.available() >= self.block_bytes or stream.buffer.eof:
+                    block = self._process(stream.read(self.block_bytes), stream.gain)
+                    frames = len(block) // FRAME_BYTES
+                    segments.append((stream, stream.start_frame + self.frames_written, frames))
+                    self.frames_written += frames
+
+                    if len(block) < self.block_bytes and stream.buffer.finished and self.next_stream:
+                        # 用下一首的开头补齐最后一块，在采样边界上切换
+                        next_stream = self.next_stream
+                        head = self._process(next_stream.read(self.block_bytes - len(block)), next_stream.gain)
+                        block += head
+                        segments.append((next_stream, next_stream.start_frame, len(head) // FRAME_BYTES))
+                        self.stream = next_stream
+                        self.next_stream = None
+                        self.frames_written = len(head) // FRAME_BYTES
+                        callbacks.append((self.on_track_changed, (next_stream,)))
+                        callbacks.append((self._report_gap, (self._gap_seconds(),)))
+                else:
+                    block = b''
+
+                if block:
+                    sound = pygame.mixer.Sound(buffer=block)
+                    queued = self.channel.get_busy()
+                    if queued:
+                        self.channel.queue(sound)
+                    else:
+                        self.channel.play(sound)
+                        if self._ended_at is not None:
+                            # 非无缝切歌：从上一首结束到本首开始出声的间隙
+                            gap = time.monotonic() - self._ended_at
+                            if gap < self.GAP_WINDOW:
+                                callbacks.append((self._report_gap, (gap,)))
+                            self._ended_at = None
+
+                    # 登记到播放时钟（块内的各段依次播放）
+                    for tag, start_frame, frames in segments:
+                        if frames:
+                            self.clock.schedule(start_frame, frames, tag, queued)
+                            queued = True
+                    if self.tap is not None and self.tap.enabled:
+                        self._tap_segments(block, segments)
+                    self._idle_since = None
+                    starving = False
+                elif block is not None and stream.finished:
+                    if not self.channel.get_busy():
+                        # 最后一块也已播完
+                        self._running = False
+                        self._ended_at = time.monotonic()
+                        callbacks.append((self.on_finished, ()))
+                elif block is not None and not self.channel.get_busy():
+                    if self._idle_since is None:
+                        self._idle_since = time.monotonic()
+                    if not starving:
+                        # 声道已空转但解码还没跟上
+                        self.underruns += 1
+                        metrics.count('output.underruns')
+                        starving = True
+                running = self._running
+
+            for callback, args in callbacks:
+                if callback:
+                    callback(*args)
+            if not running:
+                return
+            if not block:
+                time.sleep(self.block_seconds / 4)
+
+    def _process(self, data, gain):
+        """施加回放增益；均衡器启用（或正在切换）时交给均衡器一并处理"""
+        equalizer = self.equalizer
+        if equalizer is not None and equalizer.active:
+            return equalizer.process(data, gain)
+        return self._apply_gain(data, gain)
+
+    def _tap_segments(self, block, segments):
+        """把块中各段分别交给分接缓冲（切片即为副本）"""
+        offset = 0
+        for tag, start_frame, frames in segments:
+            end = offset + frames * FRAME_BYTES
+            if frames:
+                self.tap.push(tag, start_frame, block[offset:end])
+            offset = end
+
+    @staticmethod
+    def _apply_gain(data, gain):
+        """对 16 位 PCM 施加线性增益（超出范围的采样削波）"""
+        if gain == 1.0 or not data:
+            return data
+        samples = np.frombuffer(data, dtype='<i2') * gain
+        return np.clip(samples, -32768, 32767).astype('<i2').tobytes()
+
+    def _gap_seconds(self):
+        """无缝切换时的间隙：声道一直有数据则为 0，否则为已空转的时长"""
+        if self._idle_since is None or self.channel.get_busy():
+            return 0.0
+        return time.monotonic() - self._idle_since
+
+    def _report_gap(self, seconds):
+        self.last_gap = seconds
+        if self.on_gap:
+            self.on_gap(seconds)
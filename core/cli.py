@@ -0,0 +1,169 @@
+# 无界面命令行入口：python -m core.cli <命令> ...
+# 只依赖 MusicManager（不导入 Qt、pygame），结果按 JSON Lines 逐行输出到标准输出，
+# 日志与进度输出到标准错误，便于在服务器或 CI 中管道处理大型曲库。
+import argparse
+import contextlib
+import json
+import os
+import sys
+from core.music_manager import MusicManager
+from utils.file_utils import get_supported_files
+from utils import metrics
+
+# 输出时省略的列（二进制或内部字段）
+HIDDEN_COLUMNS = ('mtime_ns',)
+
+
+def emit(out, record):
+    """输出一行 JSON"""
+    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+    out.flush()
+
+
+def music_record(music):
+    return {key: value for key, value in music.items() if key not in HIDDEN_COLUMNS}
+
+
+def expand_paths(paths):
+    """展开目录（递归），只保留支持的音乐文件"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                files.extend(get_supported_files(os.path.join(directory, name) for name in sorted(names)))
+        else:
+            files.extend(get_supported_files([path]))
+    return files
+
+
+def progress_printer(label):
+    """在标准错误上原地刷新进度"""
+    def report(done, total, per_sec):
+        sys.stderr.write(f"\r{label} {done}/{total} ({per_sec:.1f}/s)")
+        if done == total:
+            sys.stderr.write('\n')
+        sys.stderr.flush()
+    return report
+
+
+def cmd_import(manager, args, out):
+    files = expand_paths(args.paths)
+
+    # 每批写库后立即输出这一批，不等整个导入结束
+    def on_changes(changes):
+        for music in manager.get_music_by_ids(changes['inserted']):
+            emit(out, {'event': 'imported', **music_record(music)})
+
+    manager.add_change_listener(on_changes)
+    try:
+        manager.add_music(files, progress_callback=progress_printer("导入") if args.progress else None,
+                          max_workers=args.workers)
+    finally:
+        manager.remove_change_listener(on_changes)
+    emit(out, {'event': 'summary', **manager.last_import_stats})
+
+
+def cmd_scan(manager, args, out):
+    folder_ids = [manager.add_library_folder(path) for path in args.folders] or None
+    stats = manager.rescan_library(folder_ids, progress_callback=progress_printer("扫描") if args.progress else None,
+                                   max_workers=args.workers)
+    emit(out, {'event': 'summary', **stats})
+
+
+def cmd_analyze(manager, args, out):
+    manager.analyze_loudness(progress_callback=progress_printer("分析") if args.progress else None,
+                             max_workers=args.workers)
+    emit(out, {'event': 'summary', **manager.last_loudness_stats})
+
+
+def cmd_list(manager, args, out):
+    for count, music in enumerate(manager.iter_music(args.sort, not args.asc)):
+        if args.limit is not None and count >= args.limit:
+            break
+        emit(out, music_record(music))
+
+
+def cmd_search(manager, args, out):
+    for music in manager.search(' '.join(args.query), args.limit):
+        emit(out, music_record(music))
+
+
+def cmd_stats(manager, args, out):
+    emit(out, manager.get_stats())
+
+
+def cmd_verify(manager, args, out):
+    checked = manager.count_music()
+    problems = pruned = 0
+    for music, problem in manager.verify_music(check_hash=args.hash):
+        problems += 1
+        emit(out, {'event': problem, 'id': music['id'], 'file_path': music['file_path']})
+        if args.prune and problem == 'missing' and manager.delete_music(music['id']):
+            pruned += 1
+    emit(out, {'event': 'summary', 'checked': checked, 'problems': problems, 'pruned': pruned})
+    return 1 if problems - pruned else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m core.cli', description="音乐库命令行工具（JSON Lines 输出）")
+    parser.add_argument('--data-dir', help="数据目录，默认为项目下的 data 目录")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('import', help="导入文件或目录（复制到应用存储目录）")
+    p.add_argument('paths', nargs='+')
+    p.add_argument('--workers', type=int, help="并行线程数")
+    p.add_argument('--progress', action='store_true', help="在标准错误上显示进度")
+    p.set_defaults(func=cmd_import)
+
+    p = commands.add_parser('scan', help="增量扫描音乐库文件夹（可同时添加新文件夹）")
+    p.add_argument('folders', nargs='*')
+    p.add_argument('--workers', type=int)
+    p.add_argument('--progress', action='store_true')
+    p.set_defaults(func=cmd_scan)
+
+    p = commands.add_parser('analyze', help="分析尚未分析过响度的曲目")
+    p.add_argument('--workers', type=int, help="并行进程数")
+    p.add_argument('--progress', action='store_true')
+    p.set_defaults(func=cmd_analyze)
+
+    p = commands.add_parser('list', help="列出曲库（按页流式读取）")
+    p.add_argument('--sort', choices=MusicManager.SORT_KEYS, default='import_time')
+    p.add_argument('--asc', action='store_true', help="升序")
+    p.add_argument('--limit', type=int)
+    p.set_defaults(func=cmd_list)
+
+    p = commands.add_parser('search', help="全文搜索标题/艺术家/专辑")
+    p.add_argument('query', nargs='+')
+    p.add_argument('--limit', type=int, default=50)
+    p.set_defaults(func=cmd_search)
+
+    p = commands.add_parser('stats', help="曲库统计")
+    p.set_defaults(func=cmd_stats)
+
+    p = commands.add_parser('verify', help="检查曲目文件是否存在、是否被修改")
+    p.add_argument('--hash', action='store_true', help="同时比对内容哈希")
+    p.add_argument('--prune', action='store_true', help="删除文件已不存在的记录")
+    p.set_defaults(func=cmd_verify)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    out = sys.stdout
+    metrics.start_profiling()
+    metrics.start_dump()
+    # 核心模块的日志改写到标准错误，标准输出只保留 JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        manager = MusicManager(args.data_dir)
+        try:
+            return args.func(manager, args, out) or 0
+        except BrokenPipeError:
+            # 输出被管道截断（如 | head），正常结束；把标准输出指向空设备以免退出时再报错
+            os.dup2(os.open(os.devnull, os.O_WRONLY), out.fileno())
+            return 0
+        finally:
+            manager.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,275 @@
+# 封面图片：从标签（ID3 APIC、FLAC/Vorbis PICTURE、MP4 covr、ASF WM/Picture）或同目录的 cover.jpg 等文件中提取，
+# 一次缩放为固定尺寸的缩略图，按原图内容哈希存入磁盘缓存（同一专辑共用的封面只存一份）。
+# 这里的函数都可以在工作线程中调用：只使用 QImage/QImageReader，不创建 QPixmap。
+import base64
+import hashlib
+import os
+import struct
+import threading
+from utils import metrics
+
+# 缩略图边长（像素）：列表行 / 播放控制栏
+LIST_SIZE = 32
+PLAYER_SIZE = 64
+THUMB_SIZES = (LIST_SIZE, PLAYER_SIZE)
+
+DEFAULT_LIMIT_BYTES = 64 * 1024 * 1024
+EVICT_TO = 0.8  # 超过上限后淘汰到上限的这个比例，避免每次写入都触发淘汰
+JPEG_QUALITY = 85
+
+FRONT_COVER = 3  # ID3/FLAC 图片类型：封面（正面）
+# 同目录封面文件（只检查这些名字，不列目录）
+SIDECAR_NAMES = ('cover', 'Cover', 'COVER', 'folder', 'Folder', 'front', 'Front', 'AlbumArt')
+SIDECAR_EXTS = ('.jpg', '.jpeg', '.png', '.JPG', '.PNG')
+
+_SUFFIX = '.thumb'
+
+
+def _pick(pictures):
+    """从 (图片类型, 数据) 列表中优先选正面封面"""
+    pictures = [(kind, data) for kind, data in pictures if data]
+    if not pictures:
+        return None
+    for kind, data in pictures:
+        if kind == FRONT_COVER:
+            return bytes(data)
+    return bytes(pictures[0][1])
+
+
+def _id3_pictures(tags):
+    return [(frame.type, frame.data) for frame in tags.getall('APIC')] if tags else []
+
+
+def _asf_picture(value):
+    """解析 WM/Picture：类型(1) + 长度(4) + MIME(UTF-16 以 0 结尾) + 描述(同上) + 数据"""
+    kind, length = struct.unpack_from('<BI', value)
+    offset = 5
+    for _ in range(2):
+        while value[offset:offset + 2] != b'\x00\x00':
+            offset += 2
+        offset += 2
+    return kind, value[offset:offset + length]
+
+
+def extract_embedded(file_path):
+    """读取标签中的封面图片原始数据，没有时返回 None"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in ('.mp3', '.aac'):
+        from mutagen.id3 import ID3, ID3NoHeaderError
+        try:
+            return _pick(_id3_pictures(ID3(file_path)))
+        except ID3NoHeaderError:
+            return None
+    if ext == '.wav':
+        from mutagen.wave import WAVE
+        return _pick(_id3_pictures(WAVE(file_path).tags))
+    if ext == '.flac':
+        from mutagen.flac import FLAC
+        return _pick([(picture.type, picture.data) for picture in FLAC(file_path).pictures])
+    if ext == '.ogg':
+        from mutagen.flac import Picture
+        from mutagen.oggvorbis import OggVorbis
+        tags = OggVorbis(file_path).tags or {}
+        pictures = [Picture(base64.b64decode(value)) for value in tags.get('metadata_block_picture', [])]
+        pictures = [(picture.type, picture.data) for picture in pictures]
+        pictures += [(0, base64.b64decode(value)) for value in tags.get('coverart', [])]
+        return _pick(pictures)
+    if ext == '.m4a':
+        from mutagen.mp4 import MP4
+        tags = MP4(file_path).tags or {}
+        return _pick([(0, cover) for cover in tags.get('covr', [])])
+    if ext == '.wma':
+        from mutagen.asf import ASF
+        tags = ASF(file_path).tags or {}
+        return _pick([_asf_picture(attr.value) for attr in tags.get('WM/Picture', [])])
+    return None
+
+
+def find_sidecar(directory):
+    """同目录下的封面文件路径，没有时返回 None"""
+    for name in SIDECAR_NAMES:
+        for ext in SIDECAR_EXTS:
+            path = os.path.join(directory, name + ext)
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+@metrics.timed('cover.extract')
+def find_cover(file_path, sidecar=True):
+    """封面原图数据：优先内嵌图片，其次同目录封面文件（sidecar 为真时）"""
+    try:
+        data = extract_embedded(file_path)
+    except Exception as e:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(file_path) from e  # 文件不存在不算“没有封面”，不应记录下来
+        print(f"读取内嵌封面失败: {file_path} ({e})")
+        data = None
+    if data is None and sidecar:
+        path = find_sidecar(os.path.dirname(file_path))
+        if path:
+            with open(path, 'rb') as f:
+                data = f.read()
+    return data
+
+
+def cover_hash_of(data):
+    """封面原图内容哈希（与 hash_file 相同的 BLAKE2b-128）"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+@metrics.timed('cover.thumbnail')
+def make_thumbnails(data, sizes=THUMB_SIZES):
+    """把原图缩放为各尺寸的缩略图，返回 {边长: 编码后的数据}；无法解码时返回 None
+
+    解码时直接按最大的缩略图尺寸缩小（JPEG 可按 DCT 缩放解码，比解码整张大图再缩小快得多），
+    较小的尺寸从这张图继续缩小。有透明通道的图存为 PNG，其余存为 JPEG。
+    """
+    from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, QSize, Qt
+    from PyQt6.QtGui import QImageReader
+
+    source = QBuffer()
+    source.setData(QByteArray(data))
+    source.open(QIODevice.OpenModeFlag.ReadOnly)
+    reader = QImageReader(source)
+    reader.setAutoTransform(True)
+    largest = max(sizes)
+    original = reader.size()
+    if original.isValid() and max(original.width(), original.height()) > largest:
+        reader.setScaledSize(original.scaled(QSize(largest, largest), Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return None
+
+    fmt = 'PNG' if image.hasAlphaChannel() else 'JPG'
+    thumbnails = {}
+    for size in sorted(sizes, reverse=True):
+        if max(image.width(), image.height()) > size:
+            image = image.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
+        output = QBuffer()
+        output.open(QIODevice.OpenModeFlag.WriteOnly)
+        image.save(output, fmt, JPEG_QUALITY)
+        thumbnails[size] = bytes(output.data())
+    return thumbnails
+
+
+class CoverCache:
+    """封面缩略图磁盘缓存
+
+    文件名为原图内容哈希加尺寸，多首曲目共用同一张封面时只存一份；
+    总大小超过上限时按最近使用时间淘汰最旧的缩略图（读取时刷新修改时间，atime 常因 noatime 不可靠）。
+    """
+
+    def __init__(self, cache_dir, limit_bytes=DEFAULT_LIMIT_BYTES):
+        self.cache_dir = cache_dir
+        self.limit_bytes = limit_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._total = None  # 缓存总大小，首次写入时统计
+
+    def path_for(self, cover_hash, size):
+        return os.path.join(self.cache_dir, f"{cover_hash}_{size}{_SUFFIX}")
+
+    def load(self, cover_hash, size):
+        """读取缩略图数据并标记为最近使用，不存在时返回 None"""
+        path = self.path_for(cover_hash, size)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def store(self, cover_hash, thumbnails):
+        """写入一张封面的各尺寸缩略图（先写临时文件再原子替换），必要时淘汰旧缩略图"""
+        added = 0
+        for size, data in thumbnails.items():
+            path = self.path_for(cover_hash, size)
+            # 多个线程可能同时写同一张封面，临时文件名按线程区分
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            added += len(data)
+
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._entries())
+            else:
+                self._total += added
+            if self._total > self.limit_bytes:
+                self._evict()
+
+    def _entries(self):
+        """[(修改时间, 大小, 路径)]"""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        """按最近使用时间从旧到新删除，直到总大小降到上限的 EVICT_TO"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.limit_bytes * EVICT_TO
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        self._total = total
+        metrics.count('cover.evicted', evicted)
+
+    def total_bytes(self):
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._entries())
+            return self._total
+
+
+def load_cover(music, size, cache):
+    """取一首曲目指定尺寸的缩略图，返回 (封面哈希, 缩略图数据)；没有封面时返回 ('', None)
+
+    music['cover_hash'] 已知且缩略图仍在缓存中时只读一个小文件；否则提取原图，
+    原图哈希已在缓存中（同专辑的其他曲目已生成过）时不再解码缩放。
+    """
+    if size not in THUMB_SIZES:
+        raise ValueError(f"不支持的缩略图尺寸: {size}")
+    cover_hash = music.get('cover_hash')
+    if cover_hash == '':
+        return '', None
+    if cover_hash:
+        data = cache.load(cover_hash, size)
+        if data is not None:
+            metrics.count('cover.cache_hit')
+            return cover_hash, data
+
+    # 应用存储目录中的文件都在同一个目录下，同目录封面文件只对原地索引的曲目有意义
+    source = find_cover(music['file_path'], sidecar=not music.get('managed', 1))
+    if source is None:
+        return '', None
+    cover_hash = cover_hash_of(source)
+    data = cache.load(cover_hash, size)
+    if data is not None:
+        metrics.count('cover.cache_hit')
+        return cover_hash, data
+
+    thumbnails = make_thumbnails(source)
+    if not thumbnails:
+        return '', None
+    cache.store(cover_hash, thumbnails)
+    metrics.count('cover.generated')
+    return cover_hash, thumbnails[size]
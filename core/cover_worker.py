@@ -0,0 +1,104 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtGui import QImage
+from core.cover_art import load_cover
+
+
+class CoverWorker(QThread):
+    """后台封面加载线程
+
+    请求按后进先出分派到线程池（滚动列表时优先加载当前可见的行），待处理请求过多时丢弃最早的；
+    Qt 的图片解码与缩放会释放 GIL，提取与缩放可以并行。新得到的封面哈希分批写回数据库。
+    """
+    cover_ready = pyqtSignal(int, str, int, object)  # 音乐 id、封面哈希（'' 表示没有封面）、边长、QImage 或 None
+
+    MAX_PENDING = 256
+    SAVE_BATCH = 50
+
+    def __init__(self, cover_cache, music_manager=None, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.cover_cache = cover_cache
+        self.music_manager = music_manager
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._pending = OrderedDict()  # (音乐 id, 边长) -> 音乐
+        self._in_flight = set()
+        self._found = []  # 待写库的 (封面哈希, 音乐 id)
+        self._cond = threading.Condition()
+        self._running = True
+
+    def request(self, music, size):
+        """请求某首曲目的缩略图（重复请求只会把它移到队首）"""
+        key = (music['id'], size)
+        with self._cond:
+            if key in self._in_flight:
+                return
+            self._pending[key] = music
+            self._pending.move_to_end(key)
+            while len(self._pending) > self.MAX_PENDING:
+                self._pending.popitem(last=False)
+            self._cond.notify_all()
+
+    def run(self):
+        try:
+            with ThreadPoolExecutor(self.max_workers, thread_name_prefix='cover') as pool:
+                while True:
+                    with self._cond:
+                        while self._running and not (self._can_dispatch() or self._should_save()):
+                            self._cond.wait()
+                        if not self._running:
+                            break
+                        found = []
+                        if self._should_save():
+                            found, self._found = self._found, []
+                        task = self._pending.popitem(last=True) if self._can_dispatch() else None
+                        if task:
+                            self._in_flight.add(task[0])
+                    self._save(found)
+                    if task:
+                        pool.submit(self._load, *task)
+            self._save(self._found)
+        finally:
+            if self.music_manager:
+                # 释放本线程持有的数据库连接
+                self.music_manager.db.close_thread_connection()
+
+    def _can_dispatch(self):
+        return self._pending and len(self._in_flight) < self.max_workers
+
+    def _should_save(self):
+        """积累到一批，或者暂时没有待处理的请求"""
+        return self._found and (len(self._found) >= self.SAVE_BATCH or not self._pending)
+
+    def _load(self, key, music):
+        """线程池中执行：取缩略图并转成 QImage"""
+        music_id, size = key
+        cover_hash, image = None, None
+        try:
+            cover_hash, data = load_cover(music, size, self.cover_cache)
+            if data is not None:
+                image = QImage.fromData(data)
+        except Exception as e:
+            print(f"加载封面失败: {music.get('file_path')} ({e})")
+        finally:
+            with self._cond:
+                self._in_flight.discard(key)
+                # 出错时不写库，下次仍会重试
+                if cover_hash is not None and cover_hash != music.get('cover_hash'):
+                    self._found.append((cover_hash, music_id))
+                self._cond.notify_all()
+        self.cover_ready.emit(music_id, cover_hash or '', size, image)
+
+    def _save(self, found):
+        if found and self.music_manager:
+            self.music_manager.set_cover_hashes(found)
+
+    def stop(self):
+        """停止线程（正在处理的请求会完成，未处理的丢弃）"""
+        with self._cond:
+            self._running = False
+            self._pending.clear()
+            self._cond.notify_all()
+        self.wait()
@@ -0,0 +1,108 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from utils import metrics
+from core.search_text import register_functions
+
+
+class Database:
+    """SQLite 连接管理
+
+    每个线程持有一个长连接（避免反复打开关闭），启用 WAL 日志和调优的 pragma，
+    依靠 sqlite3 自带的语句缓存复用预编译语句，并提供事务上下文管理器。
+    """
+
+    PRAGMAS = (
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',  # WAL 模式下 NORMAL 仅在检查点时 fsync
+        'PRAGMA temp_store=MEMORY',
+        'PRAGMA cache_size=-16000',  # 约 16MB 页缓存
+        'PRAGMA mmap_size=268435456',
+        'PRAGMA busy_timeout=5000',
+        'PRAGMA foreign_keys=ON',
+    )
+
+    def __init__(self, db_path, cached_statements=256):
+        self.db_path = db_path
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def connection(self):
+        """获取当前线程的连接（首次调用时创建）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                isolation_level=None,  # 自动提交，事务由 transaction() 显式控制
+                check_same_thread=False,
+                cached_statements=self.cached_statements
+            )
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+            register_functions(conn)  # 全文索引触发器使用
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """事务上下文：正常退出时提交，异常时回滚；嵌套调用并入外层事务"""
+        conn = self.connection()
+        if conn.in_transaction:
+            yield conn
+            return
+
+        conn.execute('BEGIN')
+        try:
+            with metrics.span('db.transaction'):
+                yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        else:
+            conn.execute('COMMIT')
+
+    @metrics.timed('db.query')
+    def execute(self, sql, params=()):
+        """执行单条语句"""
+        return self.connection().execute(sql, params)
+
+    @metrics.timed('db.query')
+    def query_all(self, sql, params=()):
+        """查询多行，返回字典列表"""
+        cursor = self.connection().execute(sql, params)
+        columns = [desc[0] for desc in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    @metrics.timed('db.query')
+    def query_one(self, sql, params=()):
+        """查询单行，返回字典或 None"""
+        cursor = self.connection().execute(sql, params)
+        columns = [desc[0] for desc in cursor.description]
+        row = cursor.fetchone()
+        return dict(zip(columns, row)) if row else None
+
+    def close_thread_connection(self):
+        """关闭当前线程的连接（工作线程退出前调用）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.conn = None
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+            conn.close()
+
+    def close(self):
+        """关闭所有连接"""
+        with self._lock:
+            connections = self._connections
+            self._connections = []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"关闭数据库连接失败: {e}")
+        self._local = threading.local()
@@ -0,0 +1,115 @@
+import threading
+import time
+import numpy as np
+from core.audio_decoder import SAMPLE_RATE, CHANNELS
+from core.dsp import BlockFilter, peaking, impulse_response_fft
+from utils import metrics
+
+# 10 段倍频程中心频率（Hz）
+BANDS_HZ = (31, 62, 125, 250, 500, 1000, 2000, 4000, 8000, 16000)
+BAND_Q = 1.41  # 约一个倍频程带宽
+MAX_GAIN_DB = 12.0
+BUDGET = 0.1  # 每块处理耗时超过该块时长的这个比例即计为超出预算
+
+_BYPASS = object()  # 待切换到直通（不处理）
+
+
+class Equalizer:
+    """10 段均衡器 + 前级增益，在输出线程中逐块处理 16 位 PCM
+
+    各段为串联的峰值 biquad，串联后的冲激响应由频响逆变换得到（前级增益并入其中），
+    逐块用 FFT 重叠相加卷积，块间携带卷积尾巴，相当于 IIR 滤波器的状态。
+    参数变化时在界面线程中重新设计滤波器，输出线程在下一块内把旧、新滤波器的输出线性交叉淡化，
+    避免切换处的爆音。所有段和前级增益都为 0 或关闭时直通，不做任何计算。
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, channels=CHANNELS):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.gains = [0.0] * len(BANDS_HZ)  # 各段增益（dB）
+        self.preamp_db = 0.0
+        self.enabled = False
+
+        self._filter = None  # 当前滤波器，None 表示直通（只由输出线程访问）
+        self._next = None  # 界面线程设计好、等待切换的滤波器或 _BYPASS
+        self._lock = threading.Lock()
+
+        # 处理耗时统计
+        self.load = 0.0  # 最近各块处理耗时占块时长比例的指数平均
+        self.blocks = 0
+        self.over_budget = 0
+
+    @property
+    def active(self):
+        """是否需要逐块处理（直通且没有待切换的滤波器时为 False）"""
+        return self._filter is not None or self._next is not None
+
+    def set_enabled(self, enabled):
+        self.enabled = bool(enabled)
+        self._update()
+
+    def set_band(self, index, gain_db):
+        self.gains[index] = max(-MAX_GAIN_DB, min(MAX_GAIN_DB, float(gain_db)))
+        self._update()
+
+    def set_gains(self, gains):
+        self.gains = [max(-MAX_GAIN_DB, min(MAX_GAIN_DB, float(g))) for g in gains]
+        self._update()
+
+    def set_preamp(self, gain_db):
+        self.preamp_db = max(-MAX_GAIN_DB, min(MAX_GAIN_DB, float(gain_db)))
+        self._update()
+
+    def design(self):
+        """按当前参数设计滤波器，直通时返回 None"""
+        if not self.enabled or (not any(self.gains) and not self.preamp_db):
+            return None
+        sections = [peaking(self.sample_rate, freq, gain, BAND_Q)
+                    for freq, gain in zip(BANDS_HZ, self.gains) if gain]
+        h = impulse_response_fft(sections) if sections else np.ones(1)
+        return BlockFilter(sections, self.channels, h=h * 10 ** (self.preamp_db / 20))
+
+    def _update(self):
+        block_filter = self.design()
+        with self._lock:
+            self._next = _BYPASS if block_filter is None else block_filter
+
+    def reset(self):
+        """清除块间状态（跳转、换歌后调用）"""
+        if self._filter is not None:
+            self._filter.reset()
+
+    def process(self, data, gain=1.0):
+        """处理一块 16 位交错 PCM，同时施加线性增益 gain，超出范围的采样削波"""
+        if not data:
+            return data
+        start = time.perf_counter()
+        with self._lock:
+            next_filter, self._next = self._next, None
+
+        x = np.frombuffer(data, dtype='<i2').reshape(-1, self.channels).astype(np.float64)
+        y = self._filter.process(x) if self._filter is not None else x
+        if next_filter is not None:
+            next_filter = None if next_filter is _BYPASS else next_filter
+            y_next = next_filter.process(x) if next_filter is not None else x
+            # 在这一块内从旧滤波器的输出线性过渡到新滤波器的输出
+            ramp = np.linspace(0.0, 1.0, len(x), endpoint=False)[:, None]
+            y = y + (y_next - y) * ramp
+            self._filter = next_filter
+        if gain != 1.0:
+            y = y * gain
+        out = np.clip(y, -32768, 32767).astype('<i2').tobytes()
+
+        elapsed = time.perf_counter() - start
+        self._account(elapsed, len(x) / self.sample_rate)
+        return out
+
+    def _account(self, elapsed, block_seconds):
+        """记录本块处理耗时相对实时的比例，超出预算时计数"""
+        ratio = elapsed / block_seconds
+        self.load = ratio if not self.blocks else self.load * 0.9 + ratio * 0.1
+        self.blocks += 1
+        metrics.observe('dsp.equalizer', elapsed * 1000)
+        if ratio > BUDGET:
+            self.over_budget += 1
+            metrics.count('dsp.over_budget')
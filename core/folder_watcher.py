@@ -0,0 +1,159 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+# inotify 事件掩码（见 <sys/inotify.h>）
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class FolderWatcher:
+    """基于 inotify（ctypes 调用，仅 Linux）的音乐库文件夹监视器
+
+    递归监视各文件夹，把一段时间内变化的路径合并后回调 on_changes(paths)
+    （在监视线程中调用），由调用方只同步这些路径，不需要完整重扫。
+    队列溢出时回调整个根目录。
+    """
+
+    def __init__(self, on_changes, debounce=1.0):
+        self.on_changes = on_changes
+        self.debounce = debounce
+        self._libc = None
+        self._fd = None
+        self._dirs = {}  # wd -> 目录路径
+        self._roots = set()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    @staticmethod
+    def available():
+        """当前平台是否支持"""
+        return sys.platform.startswith('linux') and ctypes.util.find_library('c') is not None
+
+    def start(self):
+        """初始化 inotify 并启动监视线程"""
+        if self._running or not self.available():
+            return False
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            print(f"初始化文件监视失败: {os.strerror(ctypes.get_errno())}")
+            return False
+        self._fd = fd
+        self._running = True
+        for root in list(self._roots):
+            self._watch_tree(root)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return True
+
+    def add_folder(self, path):
+        """开始监视一个音乐库文件夹（含子目录）"""
+        with self._lock:
+            self._roots.add(path)
+        if self._running:
+            self._watch_tree(path)
+
+    def stop(self):
+        """停止监视"""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._dirs.clear()
+
+    def _watch_tree(self, root):
+        """为目录及其所有子目录添加监视"""
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                print(f"无法监视目录: {directory} ({os.strerror(ctypes.get_errno())})")
+                continue
+            with self._lock:
+                self._dirs[wd] = directory
+            try:
+                with os.scandir(directory) as entries:
+                    stack.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+            except OSError:
+                pass
+
+    def _run(self):
+        last_event = 0.0
+        while self._running:
+            timeout = 0.5
+            if self._pending:
+                timeout = max(0.0, min(timeout, last_event + self.debounce - time.monotonic()))
+            readable, _, _ = select.select([self._fd], [], [], timeout)
+            if readable:
+                try:
+                    data = os.read(self._fd, 64 * 1024)
+                except BlockingIOError:
+                    data = b''
+                if data:
+                    self._handle(data)
+                    last_event = time.monotonic()
+
+            if self._pending and time.monotonic() - last_event >= self.debounce:
+                with self._lock:
+                    paths, self._pending = self._pending, set()
+                try:
+                    self.on_changes(sorted(paths))
+                except Exception as e:
+                    print(f"同步文件变化失败: {e}")
+
+    def _handle(self, data):
+        """解析一批 inotify 事件"""
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+            offset += _EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                # 事件丢失，退化为重扫所有根目录
+                with self._lock:
+                    self._pending.update(self._roots)
+                continue
+
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                with self._lock:
+                    self._dirs.pop(wd, None)
+                continue
+
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._watch_tree(path)  # 新目录（及移入的目录树）需要加入监视
+            if mask & IN_CREATE and not mask & IN_ISDIR:
+                continue  # 新文件等写完（IN_CLOSE_WRITE）再处理
+            with self._lock:
+                self._pending.add(path)
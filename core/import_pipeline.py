@@ -0,0 +1,229 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from utils.file_utils import copy_music_file, get_file_info, hash_file
+from utils.audio_utils import get_audio_metadata
+from core.seek_index import build_seek_index
+from core.lyrics import copy_sidecar_lyrics, remove_sidecar_lyrics
+from utils import metrics
+
+
+def describe_music(file_path, managed=True, folder_id=None, content_hash=None):
+    """读取文件信息、音频元数据并建立跳转索引，返回待写库的音乐字典"""
+    file_info = get_file_info(file_path)
+    audio_metadata = get_audio_metadata(file_path)
+    with metrics.span('import.seek_index'):
+        seek_index = build_seek_index(file_path)
+
+    return {
+        'title': audio_metadata['title'],
+        'artist': audio_metadata['artist'],
+        'album': audio_metadata['album'],
+        'filename': file_info['filename'],
+        'file_path': file_path,
+        'duration': audio_metadata['duration'],
+        'duration_str': audio_metadata['duration_str'],
+        'file_size': file_info['size'],
+        'mtime_ns': os.stat(file_path).st_mtime_ns,
+        'import_time': int(time.time()),
+        'managed': 1 if managed else 0,  # 文件是否由应用存储目录管理（删除音乐时一并删除文件）
+        'folder_id': folder_id,
+        'content_hash': content_hash,
+        'seek_index': seek_index.to_blob() if seek_index else None
+    }
+
+
+def hash_source(source_path, cancel_event=None):
+    """导入第一阶段：计算源文件内容哈希，失败时返回 None（在工作线程中执行）"""
+    if cancel_event is not None and cancel_event.is_set():
+        return None
+    try:
+        with metrics.span('import.hash'):
+            return hash_file(source_path)
+    except OSError as e:
+        print(f"读取文件失败: {source_path} ({e})")
+        return None
+
+
+def prepare_music(source_path, music_dir, cancel_event=None, content_hash=None):
+    """导入第二阶段：复制文件（连同同名 .lrc 歌词）并解析元数据（在工作线程中执行）"""
+    if cancel_event is not None and cancel_event.is_set():
+        return None
+
+    try:
+        # 复制文件到应用存储目录
+        with metrics.span('import.copy'):
+            target_path = copy_music_file(source_path, music_dir)
+        if not target_path:
+            return None
+        copy_sidecar_lyrics(source_path, target_path)
+
+        # 获取文件信息和音频元数据
+        return describe_music(target_path, content_hash=content_hash)
+    except Exception as e:
+        print(f"准备导入失败: {source_path} ({e})")
+        return None
+
+
+class ImportPipeline:
+    """分阶段批量导入流水线
+
+    第一阶段在线程池中并行计算源文件内容哈希，重复的文件（曲库中已有或本次导入中出现过）
+    在复制前就被跳过；第二阶段并行复制文件、解析标签；
+    最后按批次把结果交给 insert_batch，在单个事务中批量写库。
+    本次导入中内容相同的文件只复制第一个，它复制失败时再换下一个；写库失败的文件从存储目录中删除。
+    """
+
+    def __init__(self, music_dir, max_workers=None, batch_size=500):
+        self.music_dir = music_dir
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.stats = {}
+
+    def run(self, source_paths, insert_batch, progress_callback=None, cancel_event=None, is_duplicate=None):
+        """执行导入，返回成功写入数据库的音乐列表
+
+        insert_batch(music_batch) 负责写库并返回带 id 的音乐列表；
+        is_duplicate(content_hash, file_size) 判断曲库中是否已有相同内容（在调用 run 的线程中执行）；
+        progress_callback(done, total, files_per_sec) 在每个文件处理完后调用；
+        cancel_event 被置位后不再处理新文件，已复制但未写库的文件会被清理。
+        """
+        if cancel_event is None:
+            cancel_event = threading.Event()
+
+        total = len(source_paths)
+        added_music = []
+        pending = []
+        done = 0
+        duplicates = 0
+        failed = 0
+        seen_hashes = set()  # 本次已成功准备的内容哈希
+        waiting = {}  # 正在复制的内容哈希 -> 内容相同、等它结果的其他源文件
+        start_time = time.perf_counter()
+
+        def files_per_sec():
+            elapsed = time.perf_counter() - start_time
+            return done / elapsed if elapsed > 0 else 0.0
+
+        def flush():
+            nonlocal failed
+            if not pending:
+                return
+            batch = list(pending)
+            pending.clear()
+            try:
+                with metrics.span('import.insert_batch'):
+                    inserted = insert_batch(batch)
+            except Exception as e:
+                print(f"写入数据库失败: {e}")
+                inserted = []
+            added_music.extend(inserted)
+            # 没有写入的记录：删除已复制的文件，内容哈希也不再算作已导入
+            inserted_paths = {music['file_path'] for music in inserted}
+            for music_data in batch:
+                if music_data['file_path'] not in inserted_paths:
+                    self._discard(music_data)
+                    seen_hashes.discard(music_data['content_hash'])
+                    failed += 1
+
+        def submit_prepare(path, content_hash):
+            waiting.setdefault(content_hash, [])
+            futures[executor.submit(
+                prepare_music, path, self.music_dir, cancel_event, content_hash
+            )] = ('prepare', path, content_hash)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # future -> (阶段, 源文件路径, 内容哈希)
+            futures = {
+                executor.submit(hash_source, path, cancel_event): ('hash', path, None)
+                for path in source_paths
+            }
+
+            while futures:
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage, path, content_hash = futures.pop(future)
+                    if future.cancelled():
+                        done += 1
+                        continue
+
+                    if stage == 'hash':
+                        content_hash = future.result()
+                        if content_hash is None or cancel_event.is_set():
+                            failed += content_hash is None
+                        elif content_hash in waiting:
+                            # 内容相同的文件正在复制，等它的结果
+                            waiting[content_hash].append(path)
+                            continue
+                        else:
+                            try:
+                                duplicate = content_hash in seen_hashes or (
+                                    is_duplicate is not None and is_duplicate(content_hash, os.path.getsize(path)))
+                            except OSError as e:
+                                # 源文件在计算哈希之后被删除或移走
+                                print(f"读取文件失败: {path} ({e})")
+                                failed += 1
+                            else:
+                                if not duplicate:
+                                    submit_prepare(path, content_hash)
+                                    continue
+                                duplicates += 1
+                                metrics.count('import.duplicates')
+                        done += 1
+                    else:
+                        music_data = future.result()
+                        others = waiting.pop(content_hash, [])
+                        if music_data:
+                            seen_hashes.add(content_hash)
+                            if cancel_event.is_set():
+                                self._discard(music_data)
+                            else:
+                                pending.append(music_data)
+                                metrics.count('import.files')
+                        else:
+                            failed += not cancel_event.is_set()
+                            if others and not cancel_event.is_set():
+                                # 复制失败，换内容相同的下一个文件
+                                submit_prepare(others.pop(0), content_hash)
+                                waiting[content_hash].extend(others)
+                                others = []
+                        if music_data and others:
+                            duplicates += len(others)
+                            metrics.count('import.duplicates', len(others))
+                        done += 1 + len(others)
+
+                    if len(pending) >= self.batch_size:
+                        flush()
+                    if progress_callback:
+                        progress_callback(done, total, files_per_sec())
+
+        if cancel_event.is_set():
+            for music_data in pending:
+                self._discard(music_data)
+            pending.clear()
+        else:
+            flush()
+
+        elapsed = time.perf_counter() - start_time
+        self.stats = {
+            'total': total,
+            'processed': done,
+            'added': len(added_music),
+            'duplicates': duplicates,
+            'failed': failed,
+            'cancelled': cancel_event.is_set(),
+            'elapsed': elapsed,
+            'files_per_sec': done / elapsed if elapsed > 0 else 0.0
+        }
+        return added_music
+
+    @staticmethod
+    def _discard(music_data):
+        """删除已复制但未写入数据库的文件"""
+        try:
+            if os.path.exists(music_data['file_path']):
+                os.remove(music_data['file_path'])
+            remove_sidecar_lyrics(music_data['file_path'])
+        except OSError as e:
+            print(f"清理文件失败: {e}")
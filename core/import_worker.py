@@ -0,0 +1,36 @@
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+class ImportWorker(QThread):
+    """后台导入线程，避免导入大量文件时阻塞界面"""
+    # 信号
+    progress = pyqtSignal(int, int, float)  # 已处理数、总数、每秒文件数
+    import_finished = pyqtSignal(list, dict)  # 导入成功的音乐、统计信息
+    cancelled = pyqtSignal()  # 导入被取消
+
+    def __init__(self, music_manager, file_paths, parent=None):
+        super().__init__(parent)
+        self.music_manager = music_manager
+        self.file_paths = file_paths
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        """在工作线程中执行导入"""
+        try:
+            added_music = self.music_manager.add_music(
+                self.file_paths,
+                progress_callback=self.progress.emit,
+                cancel_event=self.cancel_event
+            )
+        finally:
+            # 释放本线程持有的数据库连接
+            self.music_manager.db.close_thread_connection()
+
+        if self.cancel_event.is_set():
+            self.cancelled.emit()
+        self.import_finished.emit(added_music, dict(self.music_manager.last_import_stats))
+
+    def cancel(self):
+        """请求取消导入"""
+        self.cancel_event.set()
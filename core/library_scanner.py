@@ -0,0 +1,239 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from utils.file_utils import SUPPORTED_FORMATS
+from core.import_pipeline import describe_music
+
+
+def scan_directory(root):
+    """递归列出目录下支持的音乐文件，返回 {路径: (大小, 修改时间 ns)}（只 stat 不读内容）"""
+    files = {}
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif (entry.is_file()
+                              and os.path.splitext(entry.name)[1].lower() in SUPPORTED_FORMATS):
+                            stat = entry.stat()
+                            files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"扫描目录失败: {directory} ({e})")
+    return files
+
+
+class LibraryScanner:
+    """把音乐库文件夹的磁盘状态同步到 music 表
+
+    只对新增或大小/修改时间变化的文件重新读取标签；消失的文件若能按 (大小, 修改时间)
+    唯一匹配到新出现的文件则视为移动，只更新路径（保留 id 及分析结果），否则删除记录。
+    所有修改按批次在事务中写入，文件本身不会被复制或删除。
+    """
+
+    def __init__(self, music_manager, max_workers=None, batch_size=500):
+        self.music_manager = music_manager
+        self.db = music_manager.db
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.stats = {}
+
+    def rescan(self, folders, progress_callback=None, cancel_event=None):
+        """完整扫描若干文件夹（folders 为 library_folders 行），返回统计信息"""
+        disk = {}
+        folder_of = {}
+        for folder in folders:
+            files = scan_directory(folder['path'])
+            disk.update(files)
+            folder_of.update(dict.fromkeys(files, folder['id']))
+
+        rows = {}
+        folder_ids = [folder['id'] for folder in folders]
+        for i in range(0, len(folder_ids), 500):
+            chunk = folder_ids[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for row in self.db.query_all(
+                f'SELECT id, file_path, file_size, mtime_ns FROM music WHERE folder_id IN ({placeholders})', chunk
+            ):
+                rows[row['file_path']] = row
+
+        stats = self.reconcile(disk, rows, folder_of, progress_callback, cancel_event)
+        if not stats['cancelled']:
+            with self.db.transaction() as conn:
+                conn.executemany('UPDATE library_folders SET last_scan = ? WHERE id = ?',
+                                 [(int(time.time()), folder_id) for folder_id in folder_ids])
+        return stats
+
+    def apply_paths(self, paths, folders):
+        """只同步发生变化的路径（文件或目录），供文件系统监视器使用"""
+        roots = sorted((os.path.join(folder['path'], ''), folder['id']) for folder in folders)
+        disk = {}
+        folder_of = {}
+        rows = {}
+        for path in paths:
+            folder_id = self._folder_for(path, roots)
+            if folder_id is None:
+                continue
+
+            if os.path.isdir(path):
+                files = scan_directory(path)
+            elif os.path.isfile(path) and Path(path).suffix.lower() in SUPPORTED_FORMATS:
+                stat = os.stat(path)
+                files = {path: (stat.st_size, stat.st_mtime_ns)}
+            else:
+                files = {}
+            disk.update(files)
+            folder_of.update(dict.fromkeys(files, folder_id))
+
+            # 该路径本身或其下的记录（前缀范围查询走 file_path 唯一索引）
+            prefix = os.path.join(path, '')
+            for row in self.db.query_all(
+                'SELECT id, file_path, file_size, mtime_ns FROM music '
+                'WHERE folder_id IS NOT NULL AND (file_path = ? OR (file_path >= ? AND file_path < ?))',
+                (path, prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+            ):
+                rows[row['file_path']] = row
+
+        return self.reconcile(disk, rows, folder_of)
+
+    @staticmethod
+    def _folder_for(path, roots):
+        """路径所属的音乐库文件夹 id（取最长的匹配前缀）"""
+        match = None
+        for root, folder_id in roots:
+            if path.startswith(root) or path == root[:-1]:
+                match = folder_id
+        return match
+
+    def reconcile(self, disk, rows, folder_of, progress_callback=None, cancel_event=None):
+        """对比磁盘状态 disk 与数据库记录 rows，把差异写入数据库"""
+        if cancel_event is None:
+            cancel_event = threading.Event()
+        start_time = time.perf_counter()
+
+        changed = []
+        for path, (size, mtime_ns) in disk.items():
+            row = rows.get(path)
+            if row is not None and (row['file_size'] != size or row['mtime_ns'] != mtime_ns):
+                changed.append(row)
+        new_paths = [path for path in disk if path not in rows]
+        missing = [row for path, row in rows.items() if path not in disk]
+
+        # 移动检测：(大小, 修改时间) 在消失和新出现的文件中都唯一时配对
+        moved = []
+        if missing and new_paths:
+            by_identity = {}
+            for row in missing:
+                by_identity.setdefault((row['file_size'], row['mtime_ns']), []).append(row)
+            new_by_identity = {}
+            for path in new_paths:
+                new_by_identity.setdefault(disk[path], []).append(path)
+            for identity, candidates in by_identity.items():
+                targets = new_by_identity.get(identity)
+                if len(candidates) == 1 and targets and len(targets) == 1:
+                    moved.append((candidates[0], targets[0]))
+            moved_ids = {row['id'] for row, _ in moved}
+            moved_paths = {path for _, path in moved}
+            missing = [row for row in missing if row['id'] not in moved_ids]
+            new_paths = [path for path in new_paths if path not in moved_paths]
+
+        for i in range(0, len(moved), self.batch_size):
+            with self.db.transaction() as conn:
+                conn.executemany(
+                    'UPDATE music SET file_path = ?, filename = ?, folder_id = ? WHERE id = ?',
+                    [(path, os.path.basename(path), folder_of[path], row['id']) for row, path in moved[i:i + self.batch_size]]
+                )
+        for i in range(0, len(missing), self.batch_size):
+            with self.db.transaction() as conn:
+                conn.executemany('DELETE FROM music WHERE id = ?',
+                                 [(row['id'],) for row in missing[i:i + self.batch_size]])
+        self.music_manager._notify_changes(updated=[row['id'] for row, _ in moved],
+                                           deleted=[row['id'] for row in missing])
+
+        # 新增和变化的文件并行读取标签，按批写库
+        tasks = [(path, None) for path in new_paths] + [(row['file_path'], row['id']) for row in changed]
+        added = updated = done = 0
+        pending_new, pending_changed = [], []
+
+        def flush():
+            nonlocal added, updated
+            if pending_new:
+                added += len(self.music_manager._insert_music_batch(list(pending_new)))
+                pending_new.clear()
+            if pending_changed:
+                self._update_changed(list(pending_changed))
+                updated += len(pending_changed)
+                pending_changed.clear()
+
+        if tasks:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(self._describe, path, folder_of[path]): music_id
+                    for path, music_id in tasks
+                }
+                for future in as_completed(futures):
+                    if cancel_event.is_set():
+                        for f in futures:
+                            f.cancel()
+                        break
+                    music = future.result()
+                    done += 1
+                    if music is not None:
+                        music_id = futures[future]
+                        if music_id is None:
+                            pending_new.append(music)
+                        else:
+                            music['id'] = music_id
+                            pending_changed.append(music)
+                    if len(pending_new) + len(pending_changed) >= self.batch_size:
+                        flush()
+                    if progress_callback:
+                        elapsed = time.perf_counter() - start_time
+                        progress_callback(done, len(tasks), done / elapsed if elapsed > 0 else 0.0)
+            flush()
+
+        self.stats = {
+            'files': len(disk),
+            'added': added,
+            'updated': updated,
+            'moved': len(moved),
+            'deleted': len(missing),
+            'unchanged': len(disk) - len(new_paths) - len(changed) - len(moved),
+            'cancelled': cancel_event.is_set(),
+            'elapsed': time.perf_counter() - start_time,
+        }
+        return self.stats
+
+    @staticmethod
+    def _describe(path, folder_id):
+        try:
+            return describe_music(path, managed=False, folder_id=folder_id)
+        except Exception as e:
+            print(f"读取音乐信息失败: {path} ({e})")
+            return None
+
+    def _update_changed(self, music_batch):
+        """写入内容已变化的文件的新信息（响度需重新分析，内容哈希与封面按需重算，跳转索引重建）"""
+        with self.db.transaction() as conn:
+            conn.executemany('''
+                UPDATE music SET title = :title, artist = :artist, album = :album, duration = :duration,
+                    duration_str = :duration_str, file_size = :file_size, mtime_ns = :mtime_ns,
+                    loudness_lufs = NULL, loudness_peak = NULL, gain_db = NULL, loudness_error = NULL,
+                    content_hash = NULL, cover_hash = NULL
+                WHERE id = :id
+            ''', music_batch)
+            conn.executemany('DELETE FROM music_seek_index WHERE music_id = ?',
+                             [(music['id'],) for music in music_batch])
+            conn.executemany(
+                'INSERT INTO music_seek_index (music_id, file_size, data) VALUES (?, ?, ?)',
+                [(music['id'], music['file_size'], music['seek_index'])
+                 for music in music_batch if music.get('seek_index')]
+            )
+        self.music_manager._notify_changes(updated=[music['id'] for music in music_batch])
@@ -0,0 +1,32 @@
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+class LibraryScanWorker(QThread):
+    """后台音乐库扫描线程"""
+    # 信号
+    progress = pyqtSignal(int, int, float)  # 已读取标签数、需读取总数、每秒文件数
+    scan_finished = pyqtSignal(dict)  # 统计信息
+
+    def __init__(self, music_manager, folder_ids=None, parent=None):
+        super().__init__(parent)
+        self.music_manager = music_manager
+        self.folder_ids = folder_ids
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        """在工作线程中执行扫描"""
+        try:
+            stats = self.music_manager.rescan_library(
+                self.folder_ids,
+                progress_callback=self.progress.emit,
+                cancel_event=self.cancel_event
+            )
+        finally:
+            # 释放本线程持有的数据库连接
+            self.music_manager.db.close_thread_connection()
+        self.scan_finished.emit(dict(stats))
+
+    def cancel(self):
+        """请求取消扫描"""
+        self.cancel_event.set()
@@ -0,0 +1,181 @@
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from core.audio_decoder import open_decoder, iter_blocks, SAMPLE_RATE, CHANNELS
+from core.dsp import BlockFilter, k_weighting
+
+TARGET_LUFS = -18.0  # 回放增益的目标响度（ReplayGain 2.0 参考电平）
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE = -10.0
+HOP_SECONDS = 0.1  # 门限块 400ms，75% 重叠即每 100ms 一块
+
+
+class LoudnessMeter:
+    """EBU R128 / BS.1770 积分响度与采样峰值
+
+    K 加权用分块 FFT 卷积，每 100ms 一段的能量用向量化归约累计，内存占用与时长无关
+    （每段只保留每个声道一个能量值）。
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, channels=CHANNELS):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.hop = int(sample_rate * HOP_SECONDS)
+        self.filter = BlockFilter(k_weighting(sample_rate), channels)
+        self.peak = 0.0
+        self._energies = []  # 每 100ms 各声道的平方和
+        self._rest = np.zeros((0, channels))
+
+    def add(self, pcm):
+        """加入一段 16 位交错 PCM"""
+        samples = np.frombuffer(pcm, dtype='<i2').reshape(-1, self.channels) / 32768.0
+        if len(samples) == 0:
+            return
+        self.peak = max(self.peak, float(np.abs(samples).max()))
+
+        weighted = np.concatenate([self._rest, self.filter.process(samples)])
+        usable = len(weighted) - len(weighted) % self.hop
+        hops = weighted[:usable].reshape(-1, self.hop, self.channels)
+        self._energies.append(np.einsum('hfc,hfc->hc', hops, hops))
+        self._rest = weighted[usable:]
+
+    def integrated(self):
+        """积分响度（LUFS），全部低于绝对门限时返回 None"""
+        if not self._energies:
+            return None
+        energies = np.concatenate(self._energies)
+        if len(energies) < 4:
+            return None
+
+        # 400ms 门限块 = 相邻 4 段之和；左右声道权重均为 1
+        per_hop = energies.sum(axis=1)
+        blocks = (per_hop[:-3] + per_hop[1:-2] + per_hop[2:-1] + per_hop[3:]) / (4 * self.hop)
+        with np.errstate(divide='ignore'):
+            loudness = -0.691 + 10 * np.log10(blocks)
+
+        gated = blocks[loudness > ABSOLUTE_GATE]
+        if len(gated) == 0:
+            return None
+        relative = -0.691 + 10 * np.log10(gated.mean()) + RELATIVE_GATE
+        gated = blocks[(loudness > ABSOLUTE_GATE) & (loudness > relative)]
+        return float(-0.691 + 10 * np.log10(gated.mean()))
+
+
+def replay_gain(loudness, peak, target=TARGET_LUFS):
+    """回放增益（dB）：把响度拉到目标电平，但不让峰值超过满刻度"""
+    if loudness is None:
+        return 0.0
+    gain = target - loudness
+    if peak > 0:
+        gain = min(gain, -20 * np.log10(peak))
+    return float(gain)
+
+
+def analyze_file(file_path, chunk_blocks=16):
+    """分析单个文件（在子进程中执行），返回 {'loudness_lufs', 'loudness_peak', 'gain_db'}"""
+    meter = LoudnessMeter()
+    decoder = open_decoder(file_path)
+    pending = []
+    try:
+        for block in iter_blocks(decoder):
+            pending.append(block)
+            if len(pending) >= chunk_blocks:
+                meter.add(b''.join(pending))
+                pending.clear()
+        if pending:
+            meter.add(b''.join(pending))
+    finally:
+        decoder.close()
+
+    loudness = meter.integrated()
+    return {
+        'loudness_lufs': loudness,
+        'loudness_peak': meter.peak,
+        'gain_db': replay_gain(loudness, meter.peak),
+    }
+
+
+def _analyze_task(music_id, file_path):
+    try:
+        return music_id, analyze_file(file_path), None
+    except Exception as e:
+        return music_id, None, str(e)
+
+
+def _init_process():
+    # 子进程没有声卡输出，pygame 后备解码器只需要混音器格式
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+
+class LoudnessJob:
+    """全曲库响度分析：子进程并行解码与滤波，结果分批写库
+
+    每批在单个事务中提交，中断后重新运行只处理尚未分析的曲目。
+    """
+
+    def __init__(self, max_workers=None, batch_size=20):
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.stats = {}
+
+    def run(self, pending, save_batch, progress_callback=None, cancel_event=None):
+        """分析 pending 中的 (id, 文件路径)，返回成功分析的数量
+
+        save_batch(results, failures) 负责写库，results 为 [(id, 结果字典), ...]，failures 为 [(id, 错误信息), ...]；
+        progress_callback(done, total, tracks_per_sec) 在每首分析完后调用。
+        """
+        if cancel_event is None:
+            cancel_event = threading.Event()
+
+        total = len(pending)
+        done = analyzed = failed = 0
+        results = []
+        failures = []
+        start_time = time.perf_counter()
+
+        def flush():
+            if results or failures:
+                save_batch(list(results), list(failures))
+                results.clear()
+                failures.clear()
+
+        if pending:
+            # 界面进程有 Qt/SDL 等多个线程，fork 出的子进程可能继承被持有的锁，改用 spawn 启动
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_process,
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                futures = [executor.submit(_analyze_task, music_id, path) for music_id, path in pending]
+                for future in as_completed(futures):
+                    music_id, result, error = future.result()
+                    done += 1
+                    if error:
+                        failed += 1
+                        failures.append((music_id, error))
+                        print(f"响度分析失败: {music_id} ({error})")
+                    else:
+                        results.append((music_id, result))
+                        analyzed += 1
+
+                    if len(results) + len(failures) >= self.batch_size:
+                        flush()
+                    if progress_callback:
+                        elapsed = time.perf_counter() - start_time
+                        progress_callback(done, total, done / elapsed if elapsed > 0 else 0.0)
+                    if cancel_event.is_set():
+                        for f in futures:
+                            f.cancel()
+                        break
+            flush()
+
+        elapsed = time.perf_counter() - start_time
+        self.stats = {
+            'total': total,
+            'analyzed': analyzed,
+            'failed': failed,
+            'cancelled': cancel_event.is_set(),
+            'elapsed': elapsed,
+            'tracks_per_sec': done / elapsed if elapsed > 0 else 0.0
+        }
+        return analyzed
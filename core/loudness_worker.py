@@ -0,0 +1,30 @@
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+class LoudnessWorker(QThread):
+    """后台响度分析线程（实际计算在进程池中进行）"""
+    # 信号
+    progress = pyqtSignal(int, int, float)  # 已分析数、总数、每秒曲目数
+    analysis_finished = pyqtSignal(dict)  # 统计信息
+
+    def __init__(self, music_manager, parent=None):
+        super().__init__(parent)
+        self.music_manager = music_manager
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        """在工作线程中执行分析"""
+        try:
+            self.music_manager.analyze_loudness(
+                progress_callback=self.progress.emit,
+                cancel_event=self.cancel_event
+            )
+        finally:
+            # 释放本线程持有的数据库连接
+            self.music_manager.db.close_thread_connection()
+        self.analysis_finished.emit(dict(self.music_manager.last_loudness_stats))
+
+    def cancel(self):
+        """请求停止分析（已提交写库的结果保留，下次继续）"""
+        self.cancel_event.set()
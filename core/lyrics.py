@@ -0,0 +1,208 @@
+# LRC 歌词：解析、按时间定位当前行、按曲目缓存，以及与音乐文件同名的 .lrc 文件的查找与随导入复制。
+# 支持一行多个时间标签（[00:12.00][01:30.50]副歌）、[offset:毫秒] 偏移、
+# 以及逐字时间标签的增强格式（[00:12.00]<00:12.00>逐<00:12.40>字）。
+import bisect
+import os
+import re
+from collections import OrderedDict
+from utils.file_utils import link_or_copy
+
+LRC_EXTS = ('.lrc', '.LRC', '.Lrc')
+ENCODINGS = ('utf-8-sig', 'gb18030')  # 依次尝试，都失败时按 latin-1 读取
+
+_TIME_TAG = re.compile(r'\[(\d+):(\d{1,2})(?:[.:](\d{1,3}))?\]')
+_WORD_TAG = re.compile(r'<(\d+):(\d{1,2})(?:[.:](\d{1,3}))?>')
+_META_TAG = re.compile(r'^\[([A-Za-z#]+):([^\]]*)\]\s*$')
+
+
+def _to_ms(minutes, seconds, fraction):
+    # 小数部分按十进制小数处理：.5 / .50 / .500 都是 500 毫秒
+    return (int(minutes) * 60 + int(seconds)) * 1000 + (int(fraction.ljust(3, '0')[:3]) if fraction else 0)
+
+
+class Lyrics:
+    """解析后的歌词
+
+    times 为按时间排序的行时间戳（毫秒），lines 为对应文本，只在解析时建立一次；
+    播放中每次位置更新用二分查找定位当前行，与歌词行数无关。
+    words[i] 为第 i 行的逐字时间 (时间戳列表, 文字列表)，没有逐字标签时为 None。
+    """
+
+    __slots__ = ('times', 'lines', 'words', 'tags')
+
+    def __init__(self, times, lines, words, tags):
+        self.times = times
+        self.lines = lines
+        self.words = words
+        self.tags = tags
+
+    def __len__(self):
+        return len(self.times)
+
+    def index_at(self, position_ms):
+        """position_ms 时刻的当前行号，第一行之前返回 -1"""
+        return bisect.bisect_right(self.times, position_ms) - 1
+
+    def line_at(self, position_ms):
+        index = self.index_at(position_ms)
+        return self.lines[index] if index >= 0 else None
+
+    def word_index_at(self, index, position_ms):
+        """第 index 行中 position_ms 时刻正在唱的字的序号，没有逐字标签或尚未开始时返回 -1"""
+        words = self.words[index] if index >= 0 else None
+        if not words:
+            return -1
+        return bisect.bisect_right(words[0], position_ms) - 1
+
+
+def parse_lrc(text):
+    """解析 LRC 文本，返回 Lyrics（没有任何带时间的行时 len 为 0）"""
+    tags = {}
+    entries = []  # (时间戳, 出现顺序, 文本, 逐字, 该行第一个时间戳)
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        meta = _META_TAG.match(line)
+        if meta:
+            tags[meta.group(1).lower()] = meta.group(2).strip()
+            continue
+
+        # 行首可以有多个时间标签，同一句歌词在这些时间各出现一次
+        stamps = []
+        pos = 0
+        while True:
+            match = _TIME_TAG.match(line, pos)
+            if not match:
+                break
+            stamps.append(_to_ms(*match.groups()))
+            pos = match.end()
+        if not stamps:
+            continue
+
+        body = line[pos:]
+        words = None
+        if '<' in body:
+            parts = _WORD_TAG.split(body)
+            # split 结果：[标签前文字, 分, 秒, 小数, 文字, 分, 秒, 小数, 文字, ...]
+            if len(parts) > 1:
+                word_times = [_to_ms(*parts[i:i + 3]) for i in range(1, len(parts), 4)]
+                word_texts = [parts[i + 3] for i in range(1, len(parts), 4)]
+                if parts[0].strip():
+                    word_times.insert(0, stamps[0])
+                    word_texts.insert(0, parts[0])
+                words = (word_times, word_texts)
+                body = ''.join(word_texts)
+        body = body.strip()
+        for stamp in stamps:
+            entries.append((stamp, len(entries), body, words, stamps[0]))
+
+    offset = 0
+    try:
+        offset = int(tags.get('offset', 0))
+    except ValueError:
+        pass
+
+    # 同一时间戳保持文件中的顺序
+    entries.sort(key=lambda entry: (entry[0], entry[1]))
+    times = [max(0, entry[0] - offset) for entry in entries]
+    lines = [entry[2] for entry in entries]
+    words = []
+    for stamp, _, _, line_words, base in entries:
+        if line_words:
+            # 同一句出现在多个时间时，逐字时间随该行的时间一起平移
+            shift = stamp - base - offset
+            words.append(([max(0, t + shift) for t in line_words[0]], line_words[1]))
+        else:
+            words.append(None)
+    return Lyrics(times, lines, words, tags)
+
+
+def read_lrc(path):
+    """读取 .lrc 文件文本（UTF-8 或 GB18030 编码）"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    for encoding in ENCODINGS:
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode('latin-1')
+
+
+def load_lrc(path):
+    return parse_lrc(read_lrc(path))
+
+
+def find_lrc(file_path):
+    """与音乐文件同名的 .lrc 文件路径，没有时返回 None"""
+    stem = os.path.splitext(file_path)[0]
+    for ext in LRC_EXTS:
+        path = stem + ext
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def copy_sidecar_lyrics(source_path, target_path):
+    """导入时把源文件旁的 .lrc 一起复制到目标音乐文件旁（同名），返回目标歌词路径或 None"""
+    lyrics_path = find_lrc(source_path)
+    if lyrics_path is None:
+        return None
+    target_lyrics = os.path.splitext(target_path)[0] + '.lrc'
+    try:
+        link_or_copy(lyrics_path, target_lyrics)
+    except OSError as e:
+        print(f"复制歌词失败: {lyrics_path} ({e})")
+        return None
+    return target_lyrics
+
+
+def remove_sidecar_lyrics(file_path):
+    """删除应用存储目录中音乐文件旁的 .lrc"""
+    path = find_lrc(file_path)
+    if path:
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"删除歌词失败: {e}")
+
+
+class LyricsCache:
+    """按音乐 id 缓存解析后的歌词（保留最近使用的 max_entries 首），.lrc 文件变化后重新解析"""
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # 音乐 id -> (歌词路径, 修改时间, Lyrics)
+
+    def get(self, music):
+        """获取歌词，没有 .lrc 文件或无法解析时返回 None"""
+        music_id = music['id']
+        path = find_lrc(music['file_path'])
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns if path else None
+        except OSError:
+            mtime_ns = None
+        if mtime_ns is None:
+            self._entries.pop(music_id, None)
+            return None
+
+        entry = self._entries.get(music_id)
+        if entry and entry[0] == path and entry[1] == mtime_ns:
+            self._entries.move_to_end(music_id)
+            return entry[2]
+
+        try:
+            lyrics = load_lrc(path)
+        except OSError as e:
+            print(f"读取歌词失败: {path} ({e})")
+            return None
+        if not len(lyrics):
+            lyrics = None
+        self._entries[music_id] = (path, mtime_ns, lyrics)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return lyrics
+
+    def invalidate(self, music_id):
+        self._entries.pop(music_id, None)
@@ -1,153 +1,432 @@
-import sqlite3
 import os
 import time
 from pathlib import Path
-from utils.file_utils import init_data_dirs, copy_music_file, get_file_info
-from utils.audio_utils import get_audio_metadata
+from utils.file_utils import init_data_dirs, hash_file
+from core.database import Database
+from core.schema import migrate
+from core.seek_index import SeekIndex, build_seek_index
+from core.lyrics import remove_sidecar_lyrics
+from core.search_text import match_expression
 
 
 class MusicManager:
-    def __init__(self):
+    """曲库管理
+
+    导入、扫描和响度分析所需的模块（标签库、NumPy 等）在首次使用时才导入，不拖慢启动。
+    """
+    # 可排序字段（均有 (字段, id) 复合索引）
+    SORT_KEYS = ('import_time', 'title', 'artist', 'album')
+    # 搜索命中数不超过该值时按相关度排序
+    SEARCH_RANK_LIMIT = 5000
+
+    def __init__(self, data_dir=None):
         # 初始化数据目录
-        self.data_dirs = init_data_dirs()
+        self.data_dirs = init_data_dirs(data_dir)
         self.db_path = self.data_dirs['db_path']
         self.music_dir = self.data_dirs['music_dir']
+        self.last_import_stats = {}
+        self.last_loudness_stats = {}
+        self.last_scan_stats = {}
+        self._change_listeners = []
 
-        # 初始化数据库
+        # 初始化数据库（每线程长连接）
+        self.db = Database(self.db_path)
         self.init_database()
 
     def init_database(self):
-        """初始化音乐数据库"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # 创建音乐表
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS music (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                artist TEXT NOT NULL,
-                album TEXT NOT NULL,
-                filename TEXT NOT NULL,
-                file_path TEXT NOT NULL UNIQUE,
-                duration REAL NOT NULL,
-                duration_str TEXT NOT NULL,
-                file_size INTEGER NOT NULL,
-                import_time INTEGER NOT NULL,
-                is_favorite INTEGER DEFAULT 0
-            )
-        ''')
+        """初始化音乐数据库（执行结构迁移）"""
+        migrate(self.db)
 
-        conn.commit()
-        conn.close()
+    def add_change_listener(self, callback):
+        """注册曲库变更监听器
 
-    def add_music(self, source_paths):
-        """添加音乐到数据库"""
-        added_music = []
+        callback(changes) 中 changes 为 {'inserted': [...], 'updated': [...], 'deleted': [...]}，
+        值均为音乐 id。回调在执行修改的线程中调用（导入时为后台线程）。
+        """
+        if callback not in self._change_listeners:
+            self._change_listeners.append(callback)
+
+    def remove_change_listener(self, callback):
+        """移除曲库变更监听器"""
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+
+    def _notify_changes(self, inserted=(), updated=(), deleted=()):
+        """通知监听器曲库发生变化"""
+        if not (inserted or updated or deleted):
+            return
+
+        changes = {'inserted': list(inserted), 'updated': list(updated), 'deleted': list(deleted)}
+        for callback in list(self._change_listeners):
+            try:
+                callback(changes)
+            except Exception as e:
+                print(f"曲库变更通知失败: {e}")
+
+    def add_music(self, source_paths, progress_callback=None, cancel_event=None, max_workers=None):
+        """添加音乐到数据库
+
+        复制和元数据解析在线程池中并行执行，写库按批次在单个事务中完成。
+        progress_callback(done, total, files_per_sec) 用于汇报进度，
+        cancel_event 置位后停止导入。
+        """
+        from core.import_pipeline import ImportPipeline
+
+        pipeline = ImportPipeline(self.music_dir, max_workers=max_workers)
+        added_music = pipeline.run(
+            source_paths,
+            self._insert_music_batch,
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+            is_duplicate=self.has_content
+        )
+        self.last_import_stats = pipeline.stats
+        print(f"导入完成: {len(added_music)}/{len(source_paths)} 首, "
+              f"跳过重复 {pipeline.stats['duplicates']} 首, "
+              f"{pipeline.stats['files_per_sec']:.1f} 首/秒")
+        return added_music
 
-        for source_path in source_paths:
+    def has_content(self, content_hash, file_size):
+        """曲库中是否已有相同内容的文件
+
+        旧记录没有哈希时，只对大小相同的文件按需补算哈希并写回。
+        """
+        if self.db.query_one('SELECT 1 FROM music WHERE content_hash = ? LIMIT 1', (content_hash,)):
+            return True
+
+        found = False
+        for row in self.db.query_all(
+            'SELECT id, file_path FROM music WHERE content_hash IS NULL AND file_size = ?', (file_size,)
+        ):
             try:
-                # 复制文件到应用存储目录
-                target_path = copy_music_file(source_path, self.music_dir)
-                if not target_path:
-                    continue
-
-                # 获取文件信息和音频元数据
-                file_info = get_file_info(target_path)
-                audio_metadata = get_audio_metadata(target_path)
-
-                # 准备插入数据
-                music_data = {
-                    'title': audio_metadata['title'],
-                    'artist': audio_metadata['artist'],
-                    'album': audio_metadata['album'],
-                    'filename': file_info['filename'],
-                    'file_path': target_path,
-                    'duration': audio_metadata['duration'],
-                    'duration_str': audio_metadata['duration_str'],
-                    'file_size': file_info['size'],
-                    'import_time': int(time.time())
-                }
-
-                # 插入数据库
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-
-                cursor.execute('''
+                row_hash = hash_file(row['file_path'])
+            except OSError:
+                continue
+            self.db.execute('UPDATE music SET content_hash = ? WHERE id = ?', (row_hash, row['id']))
+            found = found or row_hash == content_hash
+        return found
+
+    def _insert_music_batch(self, music_batch):
+        """在单个事务中批量插入音乐，返回带 id 的音乐列表"""
+        try:
+            with self.db.transaction() as conn:
+                conn.executemany('''
                     INSERT OR IGNORE INTO music 
-                    (title, artist, album, filename, file_path, duration, duration_str, file_size, import_time)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    music_data['title'],
-                    music_data['artist'],
-                    music_data['album'],
-                    music_data['filename'],
-                    music_data['file_path'],
-                    music_data['duration'],
-                    music_data['duration_str'],
-                    music_data['file_size'],
-                    music_data['import_time']
-                ))
-
-                if cursor.rowcount > 0:
-                    music_id = cursor.lastrowid
-                    music_data['id'] = music_id
-                    added_music.append(music_data)
-                    print(f"添加音乐成功: {music_data['title']}")
-
-                conn.commit()
-                conn.close()
+                    (title, artist, album, filename, file_path, duration, duration_str, file_size, import_time,
+                     mtime_ns, managed, folder_id, content_hash)
+                    VALUES (:title, :artist, :album, :filename, :file_path, :duration, :duration_str, :file_size,
+                            :import_time, :mtime_ns, :managed, :folder_id, :content_hash)
+                ''', music_batch)
 
-            except Exception as e:
-                print(f"添加音乐失败: {e}")
+                # 回查新插入记录的 id
+                ids_by_path = {}
+                paths = [music['file_path'] for music in music_batch]
+                for i in range(0, len(paths), 500):
+                    chunk = paths[i:i + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    cursor = conn.execute(f'SELECT id, file_path FROM music WHERE file_path IN ({placeholders})', chunk)
+                    ids_by_path.update({path: music_id for music_id, path in cursor.fetchall()})
 
+                # 导入时建好的跳转索引与音乐记录写在同一事务中
+                conn.executemany(
+                    'INSERT OR REPLACE INTO music_seek_index (music_id, file_size, data) VALUES (?, ?, ?)',
+                    [(ids_by_path[music['file_path']], music['file_size'], music['seek_index'])
+                     for music in music_batch
+                     if music.get('seek_index') and music['file_path'] in ids_by_path]
+                )
+        except Exception as e:
+            print(f"添加音乐失败: {e}")
+            return []
+
+        added_music = []
+        for music in music_batch:
+            music.pop('seek_index', None)
+            music_id = ids_by_path.get(music['file_path'])
+            if music_id is not None:
+                music['id'] = music_id
+                added_music.append(music)
+
+        self._notify_changes(inserted=[music['id'] for music in added_music])
         return added_music
 
+    def add_library_folder(self, folder_path):
+        """注册音乐库文件夹（文件原地索引，不复制），返回文件夹 id"""
+        folder_path = os.path.abspath(folder_path)
+        with self.db.transaction() as conn:
+            conn.execute('INSERT OR IGNORE INTO library_folders (path, added_time) VALUES (?, ?)',
+                         (folder_path, int(time.time())))
+            return conn.execute('SELECT id FROM library_folders WHERE path = ?', (folder_path,)).fetchone()[0]
+
+    def remove_library_folder(self, folder_id):
+        """移除音乐库文件夹及其下的音乐记录（不删除文件）"""
+        with self.db.transaction() as conn:
+            music_ids = [row[0] for row in conn.execute('SELECT id FROM music WHERE folder_id = ?', (folder_id,))]
+            conn.execute('DELETE FROM library_folders WHERE id = ?', (folder_id,))
+        self._notify_changes(deleted=music_ids)
+
+    def get_library_folders(self):
+        """获取所有音乐库文件夹"""
+        return self.db.query_all('SELECT * FROM library_folders ORDER BY path')
+
+    def rescan_library(self, folder_ids=None, progress_callback=None, cancel_event=None, max_workers=None):
+        """增量重扫音乐库文件夹（默认全部），只重新读取新增或变化的文件"""
+        from core.library_scanner import LibraryScanner
+
+        folders = self.get_library_folders()
+        if folder_ids is not None:
+            folders = [folder for folder in folders if folder['id'] in folder_ids]
+        scanner = LibraryScanner(self, max_workers=max_workers)
+        stats = scanner.rescan(folders, progress_callback, cancel_event)
+        self.last_scan_stats = stats
+        print(f"音乐库扫描完成: 新增 {stats['added']}, 更新 {stats['updated']}, 移动 {stats['moved']}, "
+              f"删除 {stats['deleted']}, 未变 {stats['unchanged']} ({stats['elapsed']:.1f}s)")
+        return stats
+
+    def apply_file_events(self, paths):
+        """同步文件系统监视器报告的变化路径"""
+        from core.library_scanner import LibraryScanner
+
+        return LibraryScanner(self).apply_paths(paths, self.get_library_folders())
+
+    def analyze_loudness(self, progress_callback=None, cancel_event=None, max_workers=None):
+        """分析尚未分析过响度的曲目，返回本次分析成功的数量
+
+        解码和滤波在进程池中并行执行，结果分批写库；已分析或分析失败过的曲目会被跳过，中断后可继续。
+        """
+        pending = [(row['id'], row['file_path']) for row in self.db.query_all(
+            'SELECT id, file_path FROM music WHERE gain_db IS NULL AND loudness_error IS NULL ORDER BY id'
+        )]
+        from core.loudness import LoudnessJob
+
+        job = LoudnessJob(max_workers=max_workers)
+        analyzed = job.run(pending, self._save_loudness_batch, progress_callback, cancel_event)
+        self.last_loudness_stats = job.stats
+        if pending:
+            print(f"响度分析完成: {analyzed}/{len(pending)} 首, {job.stats['tracks_per_sec']:.1f} 首/秒")
+        return analyzed
+
+    def _save_loudness_batch(self, results, failures=()):
+        """在单个事务中写入一批响度分析结果，以及分析失败的曲目 [(id, 错误信息)]（之后不再重试）"""
+        try:
+            with self.db.transaction() as conn:
+                conn.executemany(
+                    'UPDATE music SET loudness_lufs = ?, loudness_peak = ?, gain_db = ? WHERE id = ?',
+                    [(r['loudness_lufs'], r['loudness_peak'], r['gain_db'], music_id) for music_id, r in results]
+                )
+                conn.executemany('UPDATE music SET loudness_error = ? WHERE id = ?',
+                                 [(error, music_id) for music_id, error in failures])
+        except Exception as e:
+            print(f"保存响度分析结果失败: {e}")
+            return
+        self._notify_changes(updated=[music_id for music_id, _ in results])
+
+    def set_cover_hashes(self, pairs):
+        """批量写入封面哈希 [(封面哈希, 音乐 id)]
+
+        不通知变更监听器：封面只影响显示，由封面加载线程的信号单独刷新。
+        """
+        try:
+            with self.db.transaction() as conn:
+                conn.executemany('UPDATE music SET cover_hash = ? WHERE id = ?', pairs)
+        except Exception as e:
+            print(f"保存封面信息失败: {e}")
+
     def get_all_music(self):
         """获取所有音乐"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return self.db.query_all('SELECT * FROM music ORDER BY import_time DESC, id DESC')
 
-        cursor.execute('SELECT * FROM music ORDER BY import_time DESC')
-        columns = [desc[0] for desc in cursor.description]
-        music_list = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    def query_music(self, sort_key='import_time', descending=True, limit=200, after=None):
+        """按键集分页查询音乐
 
-        conn.close()
-        return music_list
+        after 为上一页最后一行的游标 (排序值, id)，None 表示从第一页开始；
+        查询只走 (排序字段, id) 索引，不随页码变深而变慢。
+        """
+        if sort_key not in self.SORT_KEYS:
+            raise ValueError(f"不支持的排序字段: {sort_key}")
+
+        order = 'DESC' if descending else 'ASC'
+        sql = 'SELECT * FROM music'
+        params = []
+        if after is not None:
+            sql += f" WHERE ({sort_key}, id) {'<' if descending else '>'} (?, ?)"
+            params.extend(after)
+        sql += f' ORDER BY {sort_key} {order}, id {order} LIMIT ?'
+        params.append(limit)
+        return self.db.query_all(sql, params)
+
+    def get_music_ids(self, sort_key='import_time', descending=True):
+        """按排序获取所有音乐 id（只读索引，不加载整行）"""
+        if sort_key not in self.SORT_KEYS:
+            raise ValueError(f"不支持的排序字段: {sort_key}")
+
+        order = 'DESC' if descending else 'ASC'
+        cursor = self.db.execute(f'SELECT id FROM music ORDER BY {sort_key} {order}, id {order}')
+        return [row[0] for row in cursor.fetchall()]
+
+    def get_play_order(self, music_ids=None, sort_key='import_time', descending=True):
+        """获取 (排序值, id) 列表：不给 music_ids 时为全部曲目并按排序排列，否则只取这些曲目（顺序不保证）"""
+        if sort_key not in self.SORT_KEYS:
+            raise ValueError(f"不支持的排序字段: {sort_key}")
+
+        if music_ids is None:
+            order = 'DESC' if descending else 'ASC'
+            cursor = self.db.execute(f'SELECT {sort_key}, id FROM music ORDER BY {sort_key} {order}, id {order}')
+            return [tuple(row) for row in cursor.fetchall()]
+        entries = []
+        music_ids = list(music_ids)
+        for i in range(0, len(music_ids), 500):
+            chunk = music_ids[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor = self.db.execute(f'SELECT {sort_key}, id FROM music WHERE id IN ({placeholders})', chunk)
+            entries.extend(tuple(row) for row in cursor.fetchall())
+        return entries
+
+    @staticmethod
+    def page_cursor(music, sort_key='import_time'):
+        """获取某一行对应的分页游标"""
+        return (music[sort_key], music['id'])
+
+    def iter_music(self, sort_key='import_time', descending=True, page_size=500):
+        """按页遍历整个曲库，内存中只保留一页"""
+        after = None
+        while True:
+            page = self.query_music(sort_key, descending, page_size, after)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = self.page_cursor(page[-1], sort_key)
+
+    def get_stats(self):
+        """曲库统计：曲目数、总时长、总大小、响度分析进度等"""
+        stats = self.db.query_one('''
+            SELECT COUNT(*) AS tracks,
+                   COALESCE(SUM(duration), 0) AS total_duration,
+                   COALESCE(SUM(file_size), 0) AS total_size,
+                   COUNT(gain_db) AS loudness_analyzed,
+                   COUNT(loudness_error) AS loudness_failed,
+                   COALESCE(SUM(managed), 0) AS managed,
+                   COUNT(DISTINCT artist) AS artists,
+                   COUNT(DISTINCT album) AS albums
+            FROM music
+        ''')
+        stats['library_folders'] = self.db.execute('SELECT COUNT(*) FROM library_folders').fetchone()[0]
+        stats['db_size'] = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
+        return stats
+
+    def verify_music(self, check_hash=False):
+        """逐条检查曲目文件，产出 (音乐, 问题) ，问题为 'missing'、'size_changed' 或 'hash_mismatch'
+
+        check_hash 为真时重新计算有内容哈希的文件并比对（读取全部文件内容，较慢）。
+        """
+        for music in self.iter_music('import_time', descending=False):
+            try:
+                size = os.path.getsize(music['file_path'])
+            except OSError:
+                yield music, 'missing'
+                continue
+            if size != music['file_size']:
+                yield music, 'size_changed'
+            elif check_hash and music['content_hash']:
+                try:
+                    if hash_file(music['file_path']) != music['content_hash']:
+                        yield music, 'hash_mismatch'
+                except OSError:
+                    yield music, 'missing'
+
+    def search(self, query, limit=50):
+        """全文搜索标题/艺术家/专辑，支持前缀匹配，按相关度排序
+
+        命中数超过 SEARCH_RANK_LIMIT 的宽泛查询（如只输入一个字母）不做相关度排序，
+        直接按导入时间从新到旧返回，避免为数万条候选逐条计算 bm25。
+        中日韩文字按相邻两字拆词索引（见 core.search_text），词中间的子串（如 “杰伦”）同样走索引匹配。
+        """
+        terms = query.split()
+        if not terms:
+            return []
+
+        match = match_expression(terms)
+        candidates = self.db.execute(
+            'SELECT COUNT(*) FROM (SELECT rowid FROM music_fts WHERE music_fts MATCH ? LIMIT ?)',
+            (match, self.SEARCH_RANK_LIMIT + 1)
+        ).fetchone()[0]
+        order = 'rowid DESC' if candidates > self.SEARCH_RANK_LIMIT else 'rank'
+
+        return self.db.query_all(f'''
+            SELECT music.* FROM (
+                SELECT rowid, rank FROM music_fts WHERE music_fts MATCH ? ORDER BY {order} LIMIT ?
+            ) AS hits
+            JOIN music ON music.id = hits.rowid
+            ORDER BY {'hits.rowid DESC' if order == 'rowid DESC' else 'hits.rank'}
+        ''', (match, limit))
+
+    def count_music(self):
+        """获取音乐总数"""
+        return self.db.execute('SELECT COUNT(*) FROM music').fetchone()[0]
 
     def get_music_by_id(self, music_id):
         """通过ID获取音乐"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return self.db.query_one('SELECT * FROM music WHERE id = ?', (music_id,))
 
-        cursor.execute('SELECT * FROM music WHERE id = ?', (music_id,))
-        columns = [desc[0] for desc in cursor.description]
-        result = cursor.fetchone()
+    def get_music_by_ids(self, music_ids):
+        """批量通过ID获取音乐（顺序不保证）"""
+        music_list = []
+        music_ids = list(music_ids)
+        for i in range(0, len(music_ids), 500):
+            chunk = music_ids[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            music_list.extend(self.db.query_all(f'SELECT * FROM music WHERE id IN ({placeholders})', chunk))
+        return music_list
 
-        conn.close()
-        return dict(zip(columns, result)) if result else None
+    def get_seek_index(self, music):
+        """获取音乐的跳转索引，没有或文件已变化时现场建立并保存（首次播放时）"""
+        row = self.db.query_one('SELECT file_size, data FROM music_seek_index WHERE music_id = ?', (music['id'],))
+        try:
+            file_size = os.path.getsize(music['file_path'])
+        except OSError:
+            return None
+        if row and row['file_size'] == file_size:
+            return SeekIndex.from_blob(row['data'])
+
+        seek_index = build_seek_index(music['file_path'])
+        if seek_index:
+            self.save_seek_index(music['id'], file_size, seek_index)
+        return seek_index
+
+    def save_seek_index(self, music_id, file_size, seek_index):
+        """保存跳转索引"""
+        try:
+            self.db.execute(
+                'INSERT OR REPLACE INTO music_seek_index (music_id, file_size, data) VALUES (?, ?, ?)',
+                (music_id, file_size, seek_index.to_blob())
+            )
+        except Exception as e:
+            print(f"保存跳转索引失败: {e}")
 
     def delete_music(self, music_id):
         """删除音乐（数据库+文件）"""
         try:
-            # 获取音乐信息
-            music = self.get_music_by_id(music_id)
-            if not music:
-                return False
-
-            # 删除数据库记录
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM music WHERE id = ?', (music_id,))
-            conn.commit()
-            conn.close()
-
-            # 删除文件
-            if os.path.exists(music['file_path']):
-                os.remove(music['file_path'])
+            with self.db.transaction() as conn:
+                # 获取音乐信息
+                music = self.get_music_by_id(music_id)
+                if not music:
+                    return False
+
+                # 删除数据库记录
+                conn.execute('DELETE FROM music WHERE id = ?', (music_id,))
+
+            # 删除文件及同名歌词（音乐库文件夹中原地索引的文件只删除记录）
+            if music['managed']:
+                if os.path.exists(music['file_path']):
+                    os.remove(music['file_path'])
+                remove_sidecar_lyrics(music['file_path'])
 
             print(f"删除音乐成功: {music['title']}")
+            self._notify_changes(deleted=[music_id])
             return True
         except Exception as e:
             print(f"删除音乐失败: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def close(self):
+        """关闭数据库连接"""
+        self.db.close()
\ No newline at end of file
@@ -0,0 +1,88 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+class PCMCache:
+    """最近播放曲目的解码 PCM 缓存
+
+    按字节预算做 LRU 淘汰；键为 (音乐 id, 文件大小, 修改时间)，文件变化后旧条目自然失效。
+    可在多个线程中使用（解码线程写入，界面线程读取）。
+    """
+
+    def __init__(self, budget_mb=256):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(music):
+        """缓存键，文件不可访问时返回 None"""
+        try:
+            stat = os.stat(music['file_path'])
+        except OSError:
+            return None
+        return music['id'], stat.st_size, stat.st_mtime_ns
+
+    def get(self, key):
+        """查找缓存，命中时标记为最近使用"""
+        with self._lock:
+            data = self._entries.get(key) if key is not None else None
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        """加入缓存，超出预算时淘汰最久未使用的条目；单条超过预算时不缓存"""
+        if key is None or len(data) > self.budget_bytes:
+            return False
+        with self._lock:
+            # 同一首的旧版本（文件已变化）一并移除
+            for old_key in [k for k in self._entries if k[0] == key[0]]:
+                self.size_bytes -= len(self._entries.pop(old_key))
+            self._entries[key] = data
+            self.size_bytes += len(data)
+            self._evict()
+        return True
+
+    def invalidate(self, music_id):
+        """移除某首音乐的缓存"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == music_id]:
+                self.size_bytes -= len(self._entries.pop(key))
+
+    def set_budget(self, budget_mb):
+        """调整内存预算（MB）"""
+        with self._lock:
+            self.budget_bytes = int(budget_mb * 1024 * 1024)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self):
+        """命中/未命中/淘汰次数及占用情况"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'size_bytes': self.size_bytes,
+                'budget_bytes': self.budget_bytes,
+            }
+
+    def _evict(self):
+        while self.size_bytes > self.budget_bytes and self._entries:
+            _, data = self._entries.popitem(last=False)
+            self.size_bytes -= len(data)
+            self.evictions += 1
@@ -0,0 +1,48 @@
+import queue
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+class PeaksWorker(QThread):
+    """后台峰值生成线程
+
+    只处理最新的请求：快速切歌时旧请求被丢弃，正在解码的旧曲目也会中途取消。
+    """
+    peaks_ready = pyqtSignal(int)  # 已生成峰值缓存的音乐 id
+
+    def __init__(self, peaks_cache, parent=None):
+        super().__init__(parent)
+        self.peaks_cache = peaks_cache
+        self._requests = queue.Queue()
+        self._running = True
+
+    def request(self, music):
+        """请求生成峰值（会取代尚未完成的请求）"""
+        self._requests.put(music)
+
+    def run(self):
+        while self._running:
+            music = self._requests.get()
+            # 只保留最新的请求
+            while not self._requests.empty():
+                music = self._requests.get_nowait()
+            if music is None:
+                break
+
+            try:
+                peaks = self.peaks_cache.generate(music, cancel_check=self._superseded)
+            except Exception as e:
+                print(f"生成波形失败: {e}")
+                continue
+            if peaks is not None:
+                peaks.close()
+                self.peaks_ready.emit(music['id'])
+
+    def _superseded(self):
+        """有新的请求或正在退出"""
+        return not self._running or not self._requests.empty()
+
+    def stop(self):
+        """停止线程"""
+        self._running = False
+        self._requests.put(None)
+        self.wait()
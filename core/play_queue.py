@@ -0,0 +1,166 @@
+import heapq
+import random
+
+
+class PlayQueue:
+    """播放队列
+
+    保存一份按列表顺序排列的 (排序值, id) 快照，并维护 id -> 位置索引，
+    上一曲/下一曲只需常数时间查找；随机模式使用预先生成的排列。
+    曲库增删时按排序值把变化合并进快照（apply_changes），不重新加载，随机排列和已播放的顺序保持不变。
+    """
+    SEQUENTIAL = 'sequential'  # 顺序播放
+    REPEAT_ONE = 'repeat_one'  # 单曲循环
+    REPEAT_ALL = 'repeat_all'  # 列表循环
+    SHUFFLE = 'shuffle'  # 随机播放
+    MODES = (SEQUENTIAL, REPEAT_ONE, REPEAT_ALL, SHUFFLE)
+
+    def __init__(self, load_order=None, mode=SEQUENTIAL, descending=True):
+        # load_order() -> 按列表顺序排列的全部 (排序值, id)；load_order(ids) -> 这些曲目的 (排序值, id)
+        self.load_order = load_order
+        self.descending = descending  # 快照按排序值降序排列
+        self.mode = mode
+        self.current_id = None
+        self.entries = []
+        self.order = []
+        self._position = {}
+        self._shuffled = []
+        self._shuffle_position = {}
+        self._dirty = True
+
+    def invalidate(self):
+        """标记快照过期，下次切歌时重新加载（曲库变化后调用）"""
+        self._dirty = True
+
+    def set_order(self, entries):
+        """设置播放顺序快照（按列表顺序排列的 (排序值, id)）"""
+        self._set_entries(list(entries))
+        self._dirty = False
+        self._shuffled = []
+        if self.mode == self.SHUFFLE:
+            self._reshuffle()
+
+    def apply_changes(self, inserted=(), deleted=()):
+        """把曲库中新增、删除的曲目合并进快照（快照尚未加载或已过期时留到下次加载）
+
+        只查询新增曲目的排序值，与现有快照归并，开销与变化量和快照长度成线性，不重新加载整个曲库；
+        随机模式下新曲目插到尚未播放的部分的随机位置。
+        """
+        if self._dirty:
+            return
+        entries = self.entries
+        if deleted:
+            gone = set(deleted)
+            entries = [entry for entry in entries if entry[1] not in gone]
+            if self._shuffled:
+                self._shuffled = [music_id for music_id in self._shuffled if music_id not in gone]
+        new_entries = []
+        if inserted and self.load_order is not None:
+            new_ids = [music_id for music_id in inserted if music_id not in self._position]
+            new_entries = sorted(self.load_order(new_ids), reverse=self.descending) if new_ids else []
+            entries = list(heapq.merge(entries, new_entries, reverse=self.descending))
+        if entries is self.entries:
+            return
+        self._set_entries(entries)
+        if self._shuffled:
+            self._shuffle_in([entry[1] for entry in new_entries])
+        self._shuffle_position = {music_id: i for i, music_id in enumerate(self._shuffled)}
+
+    def set_mode(self, mode):
+        """切换播放模式"""
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的播放模式: {mode}")
+        self.mode = mode
+        if mode == self.SHUFFLE:
+            self._ensure_loaded()
+            self._reshuffle()
+
+    def set_current(self, music_id):
+        """设置当前播放的音乐"""
+        self.current_id = music_id
+
+    def next_id(self, auto=False):
+        """获取下一首的 id；auto 表示因播放结束而自动切歌，没有下一首时返回 None"""
+        self._ensure_loaded()
+        if not self.order:
+            return None
+        if auto and self.mode == self.REPEAT_ONE and self.current_id in self._position:
+            return self.current_id
+        if self.mode == self.SHUFFLE:
+            return self._step_shuffle(1)
+
+        index = self._position.get(self.current_id)
+        if index is None:
+            return self.order[0]
+        if index + 1 < len(self.order):
+            return self.order[index + 1]
+        return self.order[0] if self._wraps() else None
+
+    def prev_id(self):
+        """获取上一首的 id，没有上一首时返回 None"""
+        self._ensure_loaded()
+        if not self.order:
+            return None
+        if self.mode == self.SHUFFLE:
+            return self._step_shuffle(-1)
+
+        index = self._position.get(self.current_id)
+        if index is None:
+            return self.order[0]
+        if index > 0:
+            return self.order[index - 1]
+        return self.order[-1] if self._wraps() else None
+
+    def _wraps(self):
+        """到达列表两端时是否回绕"""
+        return self.mode in (self.REPEAT_ALL, self.REPEAT_ONE)
+
+    def _ensure_loaded(self):
+        if self._dirty and self.load_order is not None:
+            self.set_order(self.load_order())
+
+    def _set_entries(self, entries):
+        self.entries = entries
+        self.order = [entry[1] for entry in entries]
+        self._position = {music_id: i for i, music_id in enumerate(self.order)}
+
+    def _shuffle_in(self, music_ids):
+        """把新曲目随机插入随机排列中当前曲目之后的部分"""
+        if not music_ids:
+            return
+        try:
+            start = self._shuffled.index(self.current_id) + 1
+        except ValueError:
+            start = 0
+        played, upcoming = self._shuffled[:start], self._shuffled[start:]
+        new_ids = list(music_ids)
+        random.shuffle(new_ids)
+        total = len(upcoming) + len(new_ids)
+        slots = set(random.sample(range(total), len(new_ids)))
+        old_iter, new_iter = iter(upcoming), iter(new_ids)
+        self._shuffled = played + [next(new_iter) if i in slots else next(old_iter) for i in range(total)]
+
+    def _reshuffle(self):
+        """生成新的随机排列，当前音乐排在最前"""
+        self._shuffled = list(self.order)
+        random.shuffle(self._shuffled)
+        index = self._position.get(self.current_id)
+        if index is not None:
+            first = self._shuffled.index(self.current_id)
+            self._shuffled[0], self._shuffled[first] = self._shuffled[first], self._shuffled[0]
+        self._shuffle_position = {music_id: i for i, music_id in enumerate(self._shuffled)}
+
+    def _step_shuffle(self, step):
+        """在随机排列中前进/后退一步，走完一轮后重新洗牌"""
+        if not self._shuffled:
+            self._reshuffle()
+
+        index = self._shuffle_position.get(self.current_id)
+        if index is None:
+            return self._shuffled[0]
+
+        index += step
+        if index >= len(self._shuffled):
+            self._reshuffle()
+            return self._shuffled[1] if len(self._shuffled) > 1 else self._shuffled[0]
+        return self._shuffled[index % len(self._shuffled)]
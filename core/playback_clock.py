@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import deque
+from core.audio_decoder import SAMPLE_RATE
+
+
+class PlaybackClock:
+    """播放时钟
+
+    以实际送入输出的 PCM 块为准：每块送出时登记其起始帧、帧数和开始发声的时间
+    （排队的块紧接上一块结束时开始），查询时在当前块内按单调时钟插值，精度为毫秒级。
+    每块带一个标记（所属的流），用于区分无缝切歌时前后两首的帧位置。
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._segments = deque()  # [开始时间, 起始帧, 帧数, 标记]
+        self._base = (None, 0)  # 没有待播块时的位置 (标记, 帧)
+        self._paused_at = None
+
+    def reset(self, frame=0, tag=None):
+        """清空排程，把位置设为指定帧（跳转、切换流时调用）"""
+        with self._lock:
+            self._segments.clear()
+            self._base = (tag, frame)
+            if self._paused_at is not None:
+                self._paused_at = time.monotonic()
+
+    def schedule(self, start_frame, frames, tag=None, queued=False):
+        """登记一块已送入输出的音频；queued 表示它排在上一块之后播放"""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            if queued and self._segments:
+                last = self._segments[-1]
+                start_time = max(now, last[0] + last[2] / self.sample_rate)
+            else:
+                start_time = now
+            self._segments.append([start_time, start_frame, frames, tag])
+
+    def pause(self):
+        with self._lock:
+            if self._paused_at is None:
+                self._paused_at = time.monotonic()
+
+    def resume(self):
+        """恢复计时，暂停期间待播的块整体顺延"""
+        with self._lock:
+            if self._paused_at is None:
+                return
+            delay = time.monotonic() - self._paused_at
+            for segment in self._segments:
+                segment[0] += delay
+            self._paused_at = None
+
+    def position(self):
+        """当前播放位置，返回 (标记, 帧)"""
+        with self._lock:
+            now = self._paused_at if self._paused_at is not None else time.monotonic()
+            for start_time, start_frame, frames, tag in reversed(self._segments):
+                if start_time <= now:
+                    elapsed = int((now - start_time) * self.sample_rate)
+                    return tag, start_frame + min(frames, elapsed)
+            if self._segments:
+                first = self._segments[0]
+                return first[3], first[1]
+            return self._base
+
+    def position_ms(self):
+        """当前播放位置（毫秒）"""
+        return self.position()[1] * 1000 // self.sample_rate
+
+    def _trim(self, now):
+        """丢弃已播完的块（保留最后一块用于插值）"""
+        while len(self._segments) > 1:
+            start_time, start_frame, frames, tag = self._segments[0]
+            if start_time + frames / self.sample_rate > now:
+                break
+            self._segments.popleft()
+            self._base = (tag, start_frame + frames)
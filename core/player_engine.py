@@ -1,8 +1,13 @@
 import pygame
 import threading
-import time
 import os
-from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from core.audio_decoder import AudioStream, MemoryDecoder, SAMPLE_RATE, CHANNELS, FRAME_BYTES
+from core.audio_output import AudioOutput
+from core.pcm_cache import PCMCache
+from core.equalizer import Equalizer
+from core.spectrum import SpectrumTap
+from utils import metrics
 
 
 class PlayerEngine(QObject):
@@ -10,33 +15,77 @@ class PlayerEngine(QObject):
     # 信号
     play_status_changed = pyqtSignal(bool)  # 播放状态改变（是否播放中）
     position_updated = pyqtSignal(int)  # 播放位置更新（秒）
+    position_ms_updated = pyqtSignal(int)  # 播放位置更新（毫秒，节流后发布）
     music_ended = pyqtSignal()  # 音乐播放结束
+    track_changed = pyqtSignal(dict)  # 无缝切换到预加载的下一首
+    gap_measured = pyqtSignal(float)  # 测得的切歌间隙（毫秒）
+    _stream_switched = pyqtSignal(object)  # 输出线程已切换到预加载的流，转到界面线程处理
 
-    def __init__(self):
+    POSITION_INTERVAL = 0.1  # 播放中位置发布的最小间隔（秒）
+    PCM_CACHE_MB = 256  # 解码缓存的默认内存预算
+
+    def __init__(self, pcm_cache_mb=None):
         super().__init__()
-        # 初始化pygame混音器
-        pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+        # 初始化pygame混音器（启动时可能已在后台线程中完成）
+        self.init_mixer()
 
         self.is_playing = False
         self.current_music = None
         self.play_position = 0
         self.total_duration = 0
-        self.position_thread = None
         self.lock = threading.Lock()
 
+        # 流式解码 + 环形缓冲输出
+        self.stream = None
+        self.output = AudioOutput()
+        self.output.on_finished = self._on_stream_finished
+        self.output.on_track_changed = self._stream_switched.emit
+        self._stream_switched.connect(self._on_track_changed, Qt.ConnectionType.QueuedConnection)
+        self.output.on_gap = lambda seconds: self.gap_measured.emit(seconds * 1000)
+        self.equalizer = Equalizer()
+        self.output.equalizer = self.equalizer
+        self.output.tap = SpectrumTap()  # 频谱分析启用后才接收数据
+        self._needs_rewind = False  # 流已被消费，重新播放前需要回到起点
+        self.seek_index_provider = None  # seek_index_provider(music) -> SeekIndex 或 None
+        self.replay_gain = True  # 按响度分析结果施加回放增益
+
+        # 最近播放曲目的整首 PCM，重播/回到上一首时不再解码
+        self.pcm_cache = PCMCache(self.PCM_CACHE_MB if pcm_cache_mb is None else pcm_cache_mb)
+
+        # 无缝播放：预解码下一首的开头，当前曲目结束时在采样边界上切换
+        self.gapless = True
+        self.next_music = None
+        self.next_stream = None
+
+        # 位置发布线程：播放中按节流间隔发布，暂停/停止时等待状态变化事件
+        self._clock_event = threading.Event()
+        self._publisher_running = True
+        self.position_thread = threading.Thread(target=self._publish_position, daemon=True)
+        self.position_thread.start()
+
+    @staticmethod
+    def init_mixer():
+        """初始化 pygame 混音器，已初始化时直接返回"""
+        if not pygame.mixer.get_init():
+            pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=CHANNELS, buffer=512)
+
+    @metrics.timed('player.load')
     def load_music(self, music):
         """加载音乐"""
         try:
             self.stop()  # 停止当前播放
 
             with self.lock:
+                self._close_stream()
+                self._discard_next()
                 self.current_music = music
                 self.total_duration = int(music['duration'])
                 self.play_position = 0
 
-                # 加载音频文件
+                # 打开解码流并开始预缓冲
                 if os.path.exists(music['file_path']):
-                    pygame.mixer.music.load(music['file_path'])
+                    self.stream = self._open_stream(music)
+                    self._needs_rewind = False
                     return True
                 return False
         except Exception as e:
@@ -46,19 +95,18 @@ class PlayerEngine(QObject):
     def play(self):
         """播放音乐"""
         try:
-            if not self.current_music:
+            if not self.current_music or not self.stream:
                 return False
 
             with self.lock:
-                if self.play_position > 0:
-                    pygame.mixer.music.set_pos(self.play_position)
+                if self.play_position > 0 or self._needs_rewind:
+                    self.stream.seek(self.play_position)
+                self._needs_rewind = True
 
-                pygame.mixer.music.play()
+                self.output.start(self.stream)
                 self.is_playing = True
                 self.play_status_changed.emit(True)
-
-                # 启动位置更新线程
-                self._start_position_thread()
+                self._clock_event.set()
 
             return True
         except Exception as e:
@@ -68,65 +116,180 @@ class PlayerEngine(QObject):
     def pause(self):
         """暂停播放"""
         with self.lock:
-            pygame.mixer.music.pause()
+            self.output.pause()
             self.is_playing = False
+            self.play_position = self._clock_seconds()
             self.play_status_changed.emit(False)
+            self._clock_event.set()
 
     def resume(self):
         """恢复播放"""
         with self.lock:
-            pygame.mixer.music.unpause()
+            self.output.resume()
             self.is_playing = True
             self.play_status_changed.emit(True)
-            self._start_position_thread()
+            self._clock_event.set()
 
     def stop(self):
         """停止播放"""
         with self.lock:
-            pygame.mixer.music.stop()
+            self.output.stop()
+            self.output.clock.reset(0, self.stream)
             self.is_playing = False
             self.play_position = 0
             self.play_status_changed.emit(False)
+            self._clock_event.set()
 
-            # 停止位置更新线程
-            if self.position_thread and self.position_thread.is_alive():
-                self.position_thread.join(timeout=0.5)
-
+    @metrics.timed('player.seek')
     def seek(self, position):
-        """跳转到指定位置（秒）"""
+        """跳转到指定位置（秒，可带小数）"""
         try:
             with self.lock:
-                if 0 <= position <= self.total_duration:
+                if 0 <= position <= self.total_duration and self.stream:
                     self.play_position = position
-                    pygame.mixer.music.set_pos(position)
-                    self.position_updated.emit(position)
+                    self.stream.seek(position)
+                    self.output.flush()
+                    self.output.clock.reset(self.stream.start_frame, self.stream)
+                    self._clock_event.set()
                 return True
         except Exception as e:
             print(f"跳转失败: {e}")
             return False
 
-    def _start_position_thread(self):
-        """启动播放位置更新线程"""
-        if self.position_thread and self.position_thread.is_alive():
+    def preload_next(self, music):
+        """预加载下一首：打开解码流并预先解码开头几秒，供无缝切换使用"""
+        with self.lock:
+            adopted = self._discard_next()
+            if adopted is None:
+                if not self.gapless or not music or not os.path.exists(music['file_path']):
+                    return False
+                try:
+                    self.next_stream = self._open_stream(music)
+                except Exception as e:
+                    print(f"预加载下一首失败: {e}")
+                    return False
+                self.next_music = music
+                self.output.set_next(self.next_stream)
+                return True
+
+        # 传入的 music 是按切换前的曲目选出的，由 track_changed 的处理函数重新预加载
+        self.track_changed.emit(adopted)
+        return False
+
+    def _open_stream(self, music):
+        """打开解码流并开始预缓冲：先查解码缓存，未命中时解码（有跳转索引时交给解码器）"""
+        cache_key = self.pcm_cache.key_for(music)
+        pcm = self.pcm_cache.get(cache_key)
+        if pcm is not None:
+            stream = AudioStream(music['file_path'], decoder=MemoryDecoder(pcm, music['file_path']))
+        else:
+            seek_index = None
+            if self.seek_index_provider:
+                try:
+                    seek_index = self.seek_index_provider(music)
+                except Exception as e:
+                    print(f"读取跳转索引失败: {e}")
+            stream = AudioStream(music['file_path'], seek_index=seek_index)
+            self._fill_cache(stream, cache_key, music)
+        if self.replay_gain and music.get('gain_db') is not None:
+            stream.gain = 10 ** (music['gain_db'] / 20)
+        return stream.start()
+
+    def _fill_cache(self, stream, key, music):
+        """播放用的流式解码顺带留存整首，从头解码到结尾后放入缓存（中途跳转或超出预算时放弃）"""
+        if key is None or isinstance(stream.decoder, MemoryDecoder):
+            return
+        if music.get('duration', 0) * SAMPLE_RATE * FRAME_BYTES > self.pcm_cache.budget_bytes:
             return
+        stream.record(self.pcm_cache.budget_bytes, lambda pcm: self.pcm_cache.put(key, pcm))
 
-        def update_position():
-            while self.is_playing:
-                time.sleep(0.5)
-                with self.lock:
-                    if pygame.mixer.music.get_busy():
-                        self.play_position = pygame.mixer.music.get_pos() / 1000
-                        self.position_updated.emit(int(self.play_position))
-                    else:
-                        # 播放结束
-                        self.is_playing = False
-                        self.play_position = 0
-                        self.play_status_changed.emit(False)
-                        self.music_ended.emit()
-                        break
-
-        self.position_thread = threading.Thread(target=update_position, daemon=True)
-        self.position_thread.start()
+    def _discard_next(self):
+        """丢弃预加载的下一首（调用者持有 self.lock）
+
+        输出已切换到这个流、切换通知还在排队时不能关闭正在播放的流，改为先完成切换，返回切换到的曲目。
+        """
+        self.output.set_next(None)
+        if self.next_stream is not None and self.output.stream is self.next_stream:
+            return self._adopt_next()
+        if self.next_stream:
+            self.next_stream.close()
+        self.next_stream = None
+        self.next_music = None
+        return None
+
+    def _on_track_changed(self, stream):
+        """输出已无缝切换到预加载的流（由输出线程的通知排队到界面线程）"""
+        with self.lock:
+            # 通知排队期间已重新加载或已在 _discard_next 中完成切换时忽略
+            if stream is not self.next_stream:
+                return
+            music = self._adopt_next()
+        self.track_changed.emit(music)  # 释放锁后再通知，处理函数会再次预加载
+
+    def _adopt_next(self):
+        """把预加载的流和曲目设为当前的，返回该曲目（调用者持有 self.lock）"""
+        old_stream = self.stream
+        music = self.next_music
+        self.stream = self.next_stream
+        self.current_music = music
+        self.total_duration = int(music['duration'])
+        self.play_position = 0
+        self.next_stream = None
+        self.next_music = None
+        if old_stream:
+            old_stream.close()
+        self._clock_event.set()
+        return music
+
+    @property
+    def underruns(self):
+        """输出缓冲欠载次数"""
+        return self.output.underruns
+
+    def _on_stream_finished(self):
+        """当前流播放完毕（在输出线程中调用）"""
+        self.is_playing = False
+        self.play_position = 0
+        self.play_status_changed.emit(False)
+        self._clock_event.set()
+        self.music_ended.emit()
+
+    def _clock_seconds(self):
+        """播放时钟给出的当前曲目位置（秒）"""
+        stream, frames = self.output.position()
+        if stream is not None and stream is not self.stream:
+            return self.play_position  # 仍在播放上一首的尾部
+        return frames / SAMPLE_RATE
+
+    def _publish_position(self):
+        """位置发布线程：毫秒位置按节流间隔发布，秒位置只在整秒变化时发布"""
+        last_ms = None
+        last_second = None
+        while True:
+            # 播放中定时唤醒；暂停/停止时只在状态变化时唤醒
+            self._clock_event.wait(self.POSITION_INTERVAL if self.is_playing else None)
+            self._clock_event.clear()
+            if not self._publisher_running:
+                return
+
+            stream, frames = self.output.position()
+            if stream is not None and stream is not self.stream:
+                continue  # 无缝切歌时上一首的尾部还在播放
+            if self.is_playing:
+                self.play_position = frames / SAMPLE_RATE
+
+            position_ms = int(frames * 1000 // SAMPLE_RATE)
+            if position_ms != last_ms:
+                last_ms = position_ms
+                self.position_ms_updated.emit(position_ms)
+            if position_ms // 1000 != last_second:
+                last_second = position_ms // 1000
+                self.position_updated.emit(last_second)
+
+    def _close_stream(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
 
     def toggle_play_pause(self):
         """切换播放/暂停"""
@@ -141,4 +304,10 @@ class PlayerEngine(QObject):
     def cleanup(self):
         """清理资源"""
         self.stop()
+        with self.lock:
+            self._close_stream()
+            self._discard_next()
+        self._publisher_running = False
+        self._clock_event.set()
+        self.position_thread.join(timeout=0.5)
         pygame.mixer.quit()
\ No newline at end of file
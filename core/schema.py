@@ -0,0 +1,172 @@
+# 数据库结构迁移
+# 每个迁移是一组按顺序执行的 SQL 语句，已应用的版本号记录在 PRAGMA user_version 中。
+# 新迁移只能追加到 MIGRATIONS 末尾，不能修改已有条目。
+
+MIGRATIONS = [
+    # 1: 音乐表
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS music (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            artist TEXT NOT NULL,
+            album TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            file_path TEXT NOT NULL UNIQUE,
+            duration REAL NOT NULL,
+            duration_str TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            import_time INTEGER NOT NULL,
+            is_favorite INTEGER DEFAULT 0
+        )
+        ''',
+    ],
+    # 2: 排序/分页索引（附带 id 以支持键集分页）
+    [
+        'CREATE INDEX IF NOT EXISTS idx_music_import_time ON music (import_time, id)',
+        'CREATE INDEX IF NOT EXISTS idx_music_title ON music (title, id)',
+        'CREATE INDEX IF NOT EXISTS idx_music_artist ON music (artist, id)',
+        'CREATE INDEX IF NOT EXISTS idx_music_album ON music (album, id)',
+    ],
+    # 3: 全文检索（FTS5 外部内容表，由触发器与 music 表保持同步）
+    [
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS music_fts USING fts5(
+            title, artist, album,
+            content='music', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='1 2 3'
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS music_fts_ai AFTER INSERT ON music BEGIN
+            INSERT INTO music_fts (rowid, title, artist, album)
+            VALUES (new.id, new.title, new.artist, new.album);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS music_fts_ad AFTER DELETE ON music BEGIN
+            INSERT INTO music_fts (music_fts, rowid, title, artist, album)
+            VALUES ('delete', old.id, old.title, old.artist, old.album);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS music_fts_au AFTER UPDATE OF title, artist, album ON music BEGIN
+            INSERT INTO music_fts (music_fts, rowid, title, artist, album)
+            VALUES ('delete', old.id, old.title, old.artist, old.album);
+            INSERT INTO music_fts (rowid, title, artist, album)
+            VALUES (new.id, new.title, new.artist, new.album);
+        END
+        ''',
+        # 标题权重最高，其次艺术家、专辑
+        "INSERT INTO music_fts (music_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 2.0)')",
+        "INSERT INTO music_fts (music_fts) VALUES ('rebuild')",
+    ],
+    # 4: 跳转索引（SeekIndex.to_blob() 打包的二进制，随音乐删除级联删除）
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS music_seek_index (
+            music_id INTEGER PRIMARY KEY REFERENCES music (id) ON DELETE CASCADE,
+            file_size INTEGER NOT NULL,
+            data BLOB NOT NULL
+        )
+        ''',
+    ],
+    # 5: 响度分析结果（NULL 表示尚未分析），部分索引用于快速找出待分析曲目
+    [
+        'ALTER TABLE music ADD COLUMN loudness_lufs REAL',
+        'ALTER TABLE music ADD COLUMN loudness_peak REAL',
+        'ALTER TABLE music ADD COLUMN gain_db REAL',
+        'CREATE INDEX IF NOT EXISTS idx_music_unanalyzed ON music (id) WHERE gain_db IS NULL',
+    ],
+    # 6: 音乐库文件夹（原地索引，不复制文件）
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS library_folders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            path TEXT NOT NULL UNIQUE,
+            added_time INTEGER NOT NULL,
+            last_scan INTEGER
+        )
+        ''',
+        # managed = 1 表示文件在应用存储目录中（删除音乐时删除文件），0 表示原地索引
+        'ALTER TABLE music ADD COLUMN managed INTEGER NOT NULL DEFAULT 1',
+        'ALTER TABLE music ADD COLUMN folder_id INTEGER REFERENCES library_folders (id) ON DELETE CASCADE',
+        'ALTER TABLE music ADD COLUMN mtime_ns INTEGER',
+        'CREATE INDEX IF NOT EXISTS idx_music_folder ON music (folder_id)',
+    ],
+    # 7: 内容哈希去重；尚未计算哈希的记录按文件大小索引，用于按需补算
+    [
+        'ALTER TABLE music ADD COLUMN content_hash TEXT',
+        'CREATE INDEX IF NOT EXISTS idx_music_content_hash ON music (content_hash)',
+        'CREATE INDEX IF NOT EXISTS idx_music_unhashed_size ON music (file_size) WHERE content_hash IS NULL',
+    ],
+    # 8: 封面原图的内容哈希（缩略图缓存的键）；NULL 表示尚未提取，空字符串表示没有封面
+    [
+        'ALTER TABLE music ADD COLUMN cover_hash TEXT',
+    ],
+    # 9: 响度分析失败的原因（非 NULL 时不再重试，文件变化后清除）；待分析索引排除失败的曲目
+    [
+        'ALTER TABLE music ADD COLUMN loudness_error TEXT',
+        'DROP INDEX IF EXISTS idx_music_unanalyzed',
+        'CREATE INDEX idx_music_unanalyzed ON music (id) WHERE gain_db IS NULL AND loudness_error IS NULL',
+    ],
+    # 10: 全文检索改为无内容表，索引 split_cjk() 处理后的文本（中日韩文字拆成相邻两字词，子串可走索引）；
+    #     split_cjk 由 Database 在每个连接上注册，不经 Database 的连接无法写入 music 表
+    [
+        'DROP TRIGGER IF EXISTS music_fts_ai',
+        'DROP TRIGGER IF EXISTS music_fts_ad',
+        'DROP TRIGGER IF EXISTS music_fts_au',
+        'DROP TABLE IF EXISTS music_fts',
+        '''
+        CREATE VIRTUAL TABLE music_fts USING fts5(
+            title, artist, album,
+            content='',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='1 2 3'
+        )
+        ''',
+        '''
+        CREATE TRIGGER music_fts_ai AFTER INSERT ON music BEGIN
+            INSERT INTO music_fts (rowid, title, artist, album)
+            VALUES (new.id, split_cjk(new.title), split_cjk(new.artist), split_cjk(new.album));
+        END
+        ''',
+        '''
+        CREATE TRIGGER music_fts_ad AFTER DELETE ON music BEGIN
+            INSERT INTO music_fts (music_fts, rowid, title, artist, album)
+            VALUES ('delete', old.id, split_cjk(old.title), split_cjk(old.artist), split_cjk(old.album));
+        END
+        ''',
+        '''
+        CREATE TRIGGER music_fts_au AFTER UPDATE OF title, artist, album ON music BEGIN
+            INSERT INTO music_fts (music_fts, rowid, title, artist, album)
+            VALUES ('delete', old.id, split_cjk(old.title), split_cjk(old.artist), split_cjk(old.album));
+            INSERT INTO music_fts (rowid, title, artist, album)
+            VALUES (new.id, split_cjk(new.title), split_cjk(new.artist), split_cjk(new.album));
+        END
+        ''',
+        "INSERT INTO music_fts (music_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 2.0)')",
+        '''
+        INSERT INTO music_fts (rowid, title, artist, album)
+        SELECT id, split_cjk(title), split_cjk(artist), split_cjk(album) FROM music
+        ''',
+    ],
+]
+
+
+def get_schema_version(db):
+    """获取当前数据库结构版本"""
+    return db.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(db):
+    """执行尚未应用的迁移，返回迁移后的版本号"""
+    version = get_schema_version(db)
+    for target in range(version + 1, len(MIGRATIONS) + 1):
+        with db.transaction() as conn:
+            for statement in MIGRATIONS[target - 1]:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {target}')
+        print(f"数据库已迁移到版本 {target}")
+    return max(version, len(MIGRATIONS))
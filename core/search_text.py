@@ -0,0 +1,44 @@
+# 全文检索的文本处理：unicode61 分词器把连续的中日韩文字当作一个词，词中间的子串无法命中。
+# 写入索引前把每段连续的中日韩文字拆成相邻两字组成的词，再加上最后一个字，例如
+# “周杰伦” -> “周杰 杰伦 伦”；查询时同样拆分，任意子串都能按相邻位置走索引匹配：
+# 两个字是一个词，更长的是若干两字词组成的短语，单字则按前缀匹配（前缀索引已覆盖 1 个字符）。
+import re
+
+# 汉字（含扩展 A、兼容汉字）、平假名/片假名、谚文音节
+_CJK_CHARS = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff'
+_CJK_RUN = re.compile(f'[{_CJK_CHARS}]+')
+_CJK_TAIL = re.compile(f'[{_CJK_CHARS}]+$')
+
+
+def _split_run(match):
+    run = match.group()
+    return ' {} {} '.format(' '.join(run[i:i + 2] for i in range(len(run) - 1)), run[-1])
+
+
+def split_cjk(text):
+    """把连续的中日韩文字拆成相邻两字词加最后一个字（写入索引和构造查询时使用）"""
+    if text is None:
+        return None
+    return _CJK_RUN.sub(_split_run, text)
+
+
+def register_functions(conn):
+    """在连接上注册索引触发器使用的 split_cjk() SQL 函数"""
+    conn.create_function('split_cjk', 1, split_cjk, deterministic=True)
+
+
+def match_expression(terms):
+    """把搜索词转为 FTS5 查询：每个词按前缀匹配，多个词之间为 AND 关系
+
+    含中日韩文字的词拆成相邻的两字词短语，例如 “杰伦” 匹配 “周杰伦” 中的子串。
+    以两个及以上中日韩字符结尾时去掉拆分出的最后一个单字（子串可能不在原文的末尾），也不再按前缀匹配。
+    """
+    phrases = []
+    for term in terms:
+        tokens = split_cjk(term).split()
+        tail = _CJK_TAIL.search(term)
+        prefix = '*'
+        if tail and len(tail.group()) >= 2:
+            tokens, prefix = tokens[:-1], ''
+        phrases.append('"{}"{}'.format(' '.join(tokens).replace('"', '""'), prefix))
+    return ' '.join(phrases)
@@ -0,0 +1,251 @@
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+
+# MP3 帧头查表
+_MP3_BITRATES = {
+    # (MPEG1?, 层) -> kbps，下标为 bitrate index
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG1
+    2: [22050, 24000, 16000],  # MPEG2
+    0: [11025, 12000, 8000],  # MPEG2.5
+}
+
+
+class SeekIndex:
+    """单曲的跳转索引：按固定时间间隔记录 (采样位置, 字节偏移) 对
+
+    采样位置以源文件的采样率计，data_offset 为音频数据的起始偏移（其前为文件头）。
+    estimated 为 True 时偏移是按比例估算的，不一定落在帧边界上。
+    """
+
+    _HEADER = struct.Struct('<cIIQ?')
+
+    def __init__(self, sample_rate, samples, offsets, interval_ms=1000, data_offset=0, estimated=False):
+        self.sample_rate = sample_rate
+        self.samples = samples
+        self.offsets = offsets
+        self.interval_ms = interval_ms
+        self.data_offset = data_offset
+        self.estimated = estimated
+
+    def __len__(self):
+        return len(self.samples)
+
+    def lookup(self, seconds):
+        """查找不晚于目标时间的最近索引点，返回 (该点时间/秒, 字节偏移)"""
+        if not self.samples:
+            return 0.0, 0
+        target = int(seconds * self.sample_rate)
+        i = max(0, bisect_right(self.samples, target) - 1)
+        return self.samples[i] / self.sample_rate, self.offsets[i]
+
+    def to_blob(self):
+        """打包为紧凑的二进制：头部 + 采样位置数组 + 偏移数组（能用 32 位就用 32 位）"""
+        wide = max(self.samples[-1] if self.samples else 0,
+                   self.offsets[-1] if self.offsets else 0) >= 2 ** 32
+        typecode = 'Q' if wide else 'I'
+        header = self._HEADER.pack(typecode.encode(), self.sample_rate, self.interval_ms,
+                                   self.data_offset, self.estimated)
+        return header + array(typecode, self.samples).tobytes() + array(typecode, self.offsets).tobytes()
+
+    @classmethod
+    def from_blob(cls, blob):
+        typecode, sample_rate, interval_ms, data_offset, estimated = cls._HEADER.unpack_from(blob)
+        values = array(typecode.decode())
+        values.frombytes(blob[cls._HEADER.size:])
+        half = len(values) // 2
+        return cls(sample_rate, values[:half], values[half:], interval_ms, data_offset, estimated)
+
+
+def build_seek_index(file_path, interval=1.0):
+    """为音频文件建立跳转索引，不支持的格式返回 None"""
+    ext = Path(file_path).suffix.lower()
+    try:
+        if ext == '.mp3':
+            return _build_mp3_index(file_path, interval)
+        if ext == '.flac':
+            return _build_flac_index(file_path, interval)
+        if ext == '.wav':
+            return _build_wav_index(file_path, interval)
+    except (OSError, struct.error, ValueError) as e:
+        print(f"建立跳转索引失败: {e}")
+    return None
+
+
+def _build_wav_index(file_path, interval):
+    """WAV：定位 data 块后按帧长直接计算偏移"""
+    with open(file_path, 'rb') as f:
+        riff = f.read(12)
+        if riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+            return None
+
+        sample_rate = block_align = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack('<4sI', chunk)
+            if chunk_id == b'fmt ':
+                fmt = f.read(chunk_size)
+                _, _, sample_rate, _, block_align = struct.unpack('<HHIIH', fmt[:14])
+                f.seek(chunk_size % 2, os.SEEK_CUR)
+            elif chunk_id == b'data':
+                data_offset = f.tell()
+                break
+            else:
+                f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+    if not sample_rate or not block_align:
+        return None
+    total_frames = min(chunk_size, os.path.getsize(file_path) - data_offset) // block_align
+    step = max(1, int(interval * sample_rate))
+    samples = list(range(0, total_frames, step))
+    offsets = [data_offset + sample * block_align for sample in samples]
+    return SeekIndex(sample_rate, samples, offsets, int(interval * 1000), data_offset)
+
+
+def _build_mp3_index(file_path, interval):
+    """MP3：逐帧解析帧头（不解码），记录每个时间间隔处第一帧的偏移，VBR 也准确
+
+    文件以只读内存映射访问，按需分页读入，不在进程内复制整个文件。
+    """
+    if os.path.getsize(file_path) == 0:
+        return None
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return _scan_mp3(data, interval)
+
+
+def _scan_mp3(data, interval):
+    pos = 0
+    if data[:3] == b'ID3' and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        pos = 10 + size + (10 if data[5] & 0x10 else 0)
+
+    samples, offsets = [], []
+    sample_rate = None
+    total_samples = 0
+    next_point = 0
+    first_frame = True
+    end = len(data) - 4
+
+    while pos < end:
+        if data[pos] != 0xFF:
+            # 跳到下一个可能的同步字节
+            pos = data.find(b'\xFF', pos + 1)
+            if pos < 0:
+                break
+            continue
+        if (data[pos + 1] & 0xE0) != 0xE0:
+            pos += 1
+            continue
+
+        b1, b2 = data[pos + 1], data[pos + 2]
+        version = (b1 >> 3) & 0x03
+        layer = 4 - ((b1 >> 1) & 0x03)
+        bitrate_index = b2 >> 4
+        rate_index = (b2 >> 2) & 0x03
+        if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+            pos += 1
+            continue
+
+        mpeg1 = version == 3
+        frame_rate = _MP3_SAMPLE_RATES[version][rate_index]
+        bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+        padding = (b2 >> 1) & 0x01
+        if layer == 1:
+            frame_length = (12 * bitrate // frame_rate + padding) * 4
+            frame_samples = 384
+        elif layer == 2 or mpeg1:
+            frame_length = 144 * bitrate // frame_rate + padding
+            frame_samples = 1152
+        else:
+            frame_length = 72 * bitrate // frame_rate + padding
+            frame_samples = 576
+
+        if sample_rate is None:
+            sample_rate = frame_rate
+            step = max(1, int(interval * sample_rate))
+        elif frame_rate != sample_rate:
+            pos += 1  # 采样率不一致，多半是误判的同步字
+            continue
+
+        # Xing/Info/VBRI 头帧不含音频
+        if first_frame and any(tag in data[pos + 4:pos + 40] for tag in (b'Xing', b'Info', b'VBRI')):
+            first_frame = False
+            pos += frame_length
+            continue
+        first_frame = False
+
+        if total_samples >= next_point:
+            samples.append(total_samples)
+            offsets.append(pos)
+            next_point += step
+        total_samples += frame_samples
+        pos += frame_length
+
+    if sample_rate is None:
+        return None
+    return SeekIndex(sample_rate, samples, offsets, int(interval * 1000), offsets[0] if offsets else 0)
+
+
+def _build_flac_index(file_path, interval):
+    """FLAC：优先使用文件自带的 SEEKTABLE，没有时按比例估算偏移"""
+    with open(file_path, 'rb') as f:
+        if f.read(4) != b'fLaC':
+            return None
+
+        sample_rate = total_samples = None
+        seek_points = []
+        while True:
+            header = f.read(4)
+            if len(header) < 4:
+                return None
+            last = header[0] & 0x80
+            block_type = header[0] & 0x7F
+            length = int.from_bytes(header[1:4], 'big')
+            body = f.read(length)
+            if block_type == 0:  # STREAMINFO
+                packed = int.from_bytes(body[10:18], 'big')
+                sample_rate = packed >> 44
+                total_samples = packed & 0xFFFFFFFFF
+            elif block_type == 3:  # SEEKTABLE
+                for i in range(0, length - length % 18, 18):
+                    sample, offset, _ = struct.unpack('>QQH', body[i:i + 18])
+                    if sample != 0xFFFFFFFFFFFFFFFF:  # 占位点
+                        seek_points.append((sample, offset))
+            if last:
+                audio_start = f.tell()
+                break
+
+    if not sample_rate:
+        return None
+    step = max(1, int(interval * sample_rate))
+
+    if seek_points:
+        # 每个时间间隔取不晚于它的最近一个 seekpoint
+        samples, offsets = [], []
+        point_samples = [sample for sample, _ in seek_points]
+        for target in range(0, total_samples or seek_points[-1][0] + 1, step):
+            sample, offset = seek_points[max(0, bisect_right(point_samples, target) - 1)]
+            if not samples or samples[-1] != sample:
+                samples.append(sample)
+                offsets.append(audio_start + offset)
+        return SeekIndex(sample_rate, samples, offsets, int(interval * 1000), audio_start)
+
+    if not total_samples:
+        return None
+    audio_bytes = os.path.getsize(file_path) - audio_start
+    samples = list(range(0, total_samples, step))
+    offsets = [audio_start + audio_bytes * sample // total_samples for sample in samples]
+    return SeekIndex(sample_rate, samples, offsets, int(interval * 1000), audio_start, estimated=True)
@@ -0,0 +1,97 @@
+# 频谱分析：从播放路径分接出已送入声道的 PCM 块，取正在发声位置之前的一段做加窗 FFT，
+# 合并为对数间隔的频带，另计各声道的 RMS 电平（VU 表）。
+import threading
+from collections import deque
+import numpy as np
+from core.audio_decoder import SAMPLE_RATE, CHANNELS, FRAME_BYTES
+
+FFT_SIZE = 2048  # 约 46ms
+BANDS = 24
+MIN_FREQ = 40.0
+MAX_FREQ = 16000.0
+FLOOR_DB = -60.0  # 显示范围下限，低于此值显示为 0
+TAP_BLOCKS = 8  # 分接缓冲保留的块数（约 0.75 秒，足以覆盖声道中排队的块）
+
+
+class SpectrumTap:
+    """播放路径上的分接缓冲
+
+    输出线程每送出一块，就把它的副本连同所属的流和起始帧追加到定长 deque（最旧的块自动丢弃），
+    不加锁、不等待，不会拖慢输出；未启用时输出线程只多一次属性判断。
+    """
+
+    def __init__(self, max_blocks=TAP_BLOCKS):
+        self.enabled = False
+        self._blocks = deque(maxlen=max_blocks)  # (所属流, 起始帧, PCM)
+        self._event = threading.Event()
+
+    def push(self, tag, start_frame, data):
+        """追加一块（在输出线程中调用）"""
+        self._blocks.append((tag, start_frame, data))
+        self._event.set()
+
+    def clear(self):
+        self._blocks.clear()
+
+    def wait(self, timeout=None):
+        """等待下一块送达或被唤醒"""
+        self._event.wait(timeout)
+        self._event.clear()
+
+    def wake(self):
+        self._event.set()
+
+    def window(self, tag, frame, size):
+        """流 tag 中以 frame 结束的 size 帧（浮点，形状 (size, CHANNELS)，满幅为 1）
+
+        缓冲中缺少的部分（曲目开头、跳转之后）补 0，完全没有重叠的块时返回 None。
+        """
+        start = frame - size
+        out = None
+        for block_tag, block_start, data in list(self._blocks):
+            if block_tag is not tag:
+                continue
+            block_end = block_start + len(data) // FRAME_BYTES
+            low, high = max(start, block_start), min(frame, block_end)
+            if low >= high:
+                continue
+            if out is None:
+                out = np.zeros((size, CHANNELS))
+            pcm = np.frombuffer(data, dtype='<i2', count=(high - block_start) * CHANNELS)
+            out[low - start:high - start] = pcm.reshape(-1, CHANNELS)[low - block_start:]
+        if out is not None:
+            out /= 32768.0
+        return out
+
+
+class SpectrumAnalyzer:
+    """加窗 FFT + 对数频带合并，窗函数和各频带的频点范围只在创建时计算一次"""
+
+    def __init__(self, sample_rate=SAMPLE_RATE, size=FFT_SIZE, bands=BANDS, min_freq=MIN_FREQ, max_freq=MAX_FREQ):
+        self.size = size
+        self.bands = bands
+        self.window = np.hanning(size)
+        self._scale = 2 / self.window.sum()  # 满幅正弦的幅度为 1
+
+        edges = np.geomspace(min_freq, max_freq, bands + 1) * size / sample_rate
+        bins = np.round(edges).astype(int)
+        # 低频的频带比频点间隔还窄，保证每个频带至少有一个频点
+        for i in range(1, len(bins)):
+            bins[i] = max(bins[i], bins[i - 1] + 1)
+        self._starts = bins[:-1]
+        self._stop = min(bins[-1], size // 2 + 1)
+        self.edges = (bins - 0.5) * sample_rate / size  # 各频带实际覆盖的频率边界（Hz）
+
+    def analyze(self, samples):
+        """分析 (size, 声道数) 的浮点采样，返回 (各频带幅度, 各声道电平)，均已映射到 0~1"""
+        mono = samples.mean(axis=1)
+        spectrum = np.abs(np.fft.rfft(mono * self.window)) * self._scale
+        bands = np.maximum.reduceat(spectrum[:self._stop], self._starts)
+        levels = np.sqrt(np.mean(samples * samples, axis=0))
+        return to_unit(bands), to_unit(levels)
+
+
+def to_unit(amplitude):
+    """线性幅度转 dB，再把 [FLOOR_DB, 0] 映射到 [0, 1]"""
+    db = 20 * np.log10(np.maximum(amplitude, 1e-10))
+    return np.clip(1 - db / FLOOR_DB, 0.0, 1.0).astype(np.float32)
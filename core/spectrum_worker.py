@@ -0,0 +1,90 @@
+import threading
+import time
+import numpy as np
+from PyQt6.QtCore import QThread, pyqtSignal
+from core.audio_decoder import CHANNELS
+from core.spectrum import SpectrumAnalyzer
+from utils import metrics
+
+
+class SpectrumWorker(QThread):
+    """后台频谱分析线程
+
+    以不超过 FPS 的帧率分析正在发声位置之前的一段 PCM，结果只是两个小数组，只保留最新一帧；
+    界面取走上一帧之前不再发信号，来不及处理时自动合并成一帧。
+    未启用（频谱组件隐藏）或停止播放且显示已回落到 0 时，分接缓冲停止接收、线程阻塞等待，不占用时间。
+    """
+    frame_ready = pyqtSignal()  # 有新的一帧，用 take() 取出
+
+    FPS = 30
+    FALL_PER_SECOND = 1.5  # 显示回落速度（满量程/秒），上升则立即跟随
+
+    def __init__(self, output, parent=None):
+        super().__init__(parent)
+        self.output = output
+        self.tap = output.tap
+        self.analyzer = SpectrumAnalyzer()
+        self._lock = threading.Lock()
+        self._latest = None
+        self._posted = False  # 已发出信号、界面尚未取走
+        self._active = False
+        self._running = True
+
+    def set_active(self, active):
+        """启用或停用分析（频谱组件显示/隐藏时调用）"""
+        self._active = bool(active)
+        self.tap.enabled = self._active
+        if not self._active:
+            self.tap.clear()
+        self.tap.wake()
+
+    def take(self):
+        """取出最新一帧 (频带, 电平)，没有新帧时返回 None（在界面线程中调用）"""
+        with self._lock:
+            frame, self._latest = self._latest, None
+            self._posted = False
+        return frame
+
+    def run(self):
+        interval = 1 / self.FPS
+        silence = (np.zeros(self.analyzer.bands, dtype=np.float32), np.zeros(CHANNELS, dtype=np.float32))
+        bands, levels = silence
+        last = time.monotonic()
+        while self._running:
+            if not self._active or (not self.output.is_active and not bands.any() and not levels.any()):
+                self.tap.wait()
+                last = time.monotonic()
+                continue
+
+            start = time.monotonic()
+            samples = None
+            if self.output.is_active:
+                tag, frame = self.output.position()
+                samples = self.tap.window(tag, frame, self.analyzer.size)
+            new_bands, new_levels = self.analyzer.analyze(samples) if samples is not None else silence
+
+            # 上升立即跟随，下降按固定速度回落
+            fall = self.FALL_PER_SECOND * (start - last)
+            last = start
+            bands = np.maximum(new_bands, bands - fall)
+            levels = np.maximum(new_levels, levels - fall)
+            self._publish(bands, levels)
+
+            elapsed = time.monotonic() - start
+            metrics.observe('spectrum.frame', elapsed * 1000)
+            if elapsed < interval:
+                time.sleep(interval - elapsed)
+
+    def _publish(self, bands, levels):
+        with self._lock:
+            self._latest = (bands, levels)
+            if self._posted:
+                return
+            self._posted = True
+        self.frame_ready.emit()
+
+    def stop(self):
+        """停止线程"""
+        self._running = False
+        self.tap.wake()
+        self.wait()
@@ -0,0 +1,200 @@
+import glob
+import os
+import struct
+import numpy as np
+from core.audio_decoder import open_decoder, iter_blocks, SAMPLE_RATE, CHANNELS
+
+# 最细一级每个峰值桶覆盖的帧数，往上每级扩大 LEVEL_FACTOR 倍
+BASE_BUCKET_FRAMES = 256
+LEVEL_FACTOR = 4
+LEVEL_COUNT = 4  # 256 / 1024 / 4096 / 16384 帧（约 5.8ms ~ 372ms）
+
+_MAGIC = b'PEAK'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHHIQ')  # 魔数、版本、级数、采样率、总帧数
+_LEVEL = struct.Struct('<IQQ')  # 每桶帧数、桶数、数据偏移
+
+
+class PeaksCancelled(Exception):
+    """峰值计算被取消"""
+
+
+def compute_peaks(file_path, cancel_check=None, chunk_blocks=64):
+    """解码整首并计算各级最小/最大值包络
+
+    返回 (总帧数, [每级 int16 数组，形状为 (桶数, 2)，列为 min/max])。
+    按 chunk_blocks 个解码块累积后整体向量化归约；cancel_check() 返回 True 时抛出 PeaksCancelled。
+    """
+    decoder = open_decoder(file_path)
+    chunk_samples = BASE_BUCKET_FRAMES * CHANNELS
+    base_parts = []
+    pending = []
+    total_frames = 0
+
+    def reduce(data):
+        samples = np.frombuffer(data, dtype='<i2')
+        usable = len(samples) - len(samples) % chunk_samples
+        buckets = samples[:usable].reshape(-1, chunk_samples)
+        base_parts.append(np.stack([buckets.min(axis=1), buckets.max(axis=1)], axis=1))
+        return data[usable * 2:]
+
+    try:
+        for block in iter_blocks(decoder):
+            if cancel_check and cancel_check():
+                raise PeaksCancelled()
+            pending.append(block)
+            total_frames += len(block) // (CHANNELS * 2)
+            if len(pending) >= chunk_blocks:
+                rest = reduce(b''.join(pending))
+                pending = [rest] if rest else []
+    finally:
+        decoder.close()
+
+    data = b''.join(pending)
+    if len(data) % (chunk_samples * 2):
+        # 最后不足一桶的部分补零（静音不影响包络）
+        data += bytes(chunk_samples * 2 - len(data) % (chunk_samples * 2))
+    if data:
+        reduce(data)
+
+    base = np.concatenate(base_parts) if base_parts else np.zeros((0, 2), dtype=np.int16)
+    levels = [base]
+    for _ in range(LEVEL_COUNT - 1):
+        levels.append(_downsample(levels[-1], LEVEL_FACTOR))
+    return total_frames, levels
+
+
+def _downsample(peaks, factor):
+    """把相邻 factor 个桶合并为一个桶"""
+    count = len(peaks)
+    if count == 0:
+        return peaks
+    padded = count + (-count) % factor
+    if padded != count:
+        # 用最后一个桶填充，不改变包络
+        peaks = np.concatenate([peaks, np.repeat(peaks[-1:], padded - count, axis=0)])
+    groups = peaks.reshape(-1, factor, 2)
+    return np.stack([groups[:, :, 0].min(axis=1), groups[:, :, 1].max(axis=1)], axis=1)
+
+
+class Peaks:
+    """磁盘上的峰值文件，各级数据按需内存映射，只读取绘制需要的片段"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, level_count, self.sample_rate, self.total_frames = _HEADER.unpack(
+                f.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"无效的峰值文件: {path}")
+            self.levels = [_LEVEL.unpack(f.read(_LEVEL.size)) for _ in range(level_count)]
+        self._maps = {}
+
+    @property
+    def duration(self):
+        return self.total_frames / self.sample_rate
+
+    def _level_data(self, level):
+        data = self._maps.get(level)
+        if data is None:
+            _, count, offset = self.levels[level]
+            data = np.memmap(self.path, dtype='<i2', mode='r', offset=offset, shape=(count, 2)) \
+                if count else np.zeros((0, 2), dtype=np.int16)
+            self._maps[level] = data
+        return data
+
+    def envelope(self, width, start=0.0, end=None):
+        """返回 start~end 秒之间 width 个像素列的 (min, max)，取值范围 -1.0 ~ 1.0
+
+        选用每像素至少一个桶的最粗一级，只切出该时间段对应的映射片段再按像素归约。
+        """
+        if width <= 0 or self.total_frames == 0:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+        end = self.duration if end is None else min(end, self.duration)
+        frames_per_pixel = max(1.0, (end - start) * self.sample_rate / width)
+
+        level = 0
+        for i, (bucket_frames, _, _) in enumerate(self.levels):
+            if bucket_frames <= frames_per_pixel:
+                level = i
+        bucket_frames, count, _ = self.levels[level]
+        first = min(count, int(start * self.sample_rate // bucket_frames))
+        last = min(count, max(first + 1, int(np.ceil(end * self.sample_rate / bucket_frames))))
+        data = self._level_data(level)[first:last]
+        if len(data) == 0:
+            return np.zeros(width, dtype=np.float32), np.zeros(width, dtype=np.float32)
+
+        # 每个像素列对应的起始桶（桶数少于像素数时相邻像素共用一个桶）
+        edges = np.minimum((np.arange(width) * len(data)) // width, len(data) - 1)
+        mins = np.minimum.reduceat(data[:, 0], edges)
+        maxs = np.maximum.reduceat(data[:, 1], edges)
+        return mins.astype(np.float32) / 32768, maxs.astype(np.float32) / 32768
+
+    def close(self):
+        self._maps.clear()
+
+
+class PeaksCache:
+    """峰值磁盘缓存：文件名由音乐 id 与文件大小/修改时间组成，文件变化后自动失效"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, music):
+        """峰值文件路径，文件不存在或无法访问时返回 None"""
+        try:
+            stat = os.stat(music['file_path'])
+        except OSError:
+            return None
+        return os.path.join(self.cache_dir, f"{music['id']}_{stat.st_size}_{stat.st_mtime_ns}.peaks")
+
+    def load(self, music):
+        """读取已缓存的峰值（只映射不解码），没有缓存时返回 None"""
+        path = self.path_for(music)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            return Peaks(path)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"读取峰值缓存失败: {e}")
+            return None
+
+    def generate(self, music, cancel_check=None):
+        """解码并写入峰值缓存，返回 Peaks；被取消时返回 None"""
+        path = self.path_for(music)
+        if not path:
+            return None
+        try:
+            total_frames, levels = compute_peaks(music['file_path'], cancel_check)
+        except PeaksCancelled:
+            return None
+
+        self.remove(music['id'])
+        self._write(path, total_frames, levels)
+        return Peaks(path)
+
+    def remove(self, music_id):
+        """删除某首音乐的所有峰值缓存"""
+        for path in glob.glob(os.path.join(self.cache_dir, f'{music_id}_*.peaks')):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _write(path, total_frames, levels):
+        """先写临时文件再原子替换，避免读到写了一半的缓存"""
+        offset = _HEADER.size + _LEVEL.size * len(levels)
+        level_headers = []
+        for i, data in enumerate(levels):
+            level_headers.append(_LEVEL.pack(BASE_BUCKET_FRAMES * LEVEL_FACTOR ** i, len(data), offset))
+            offset += data.nbytes
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(levels), SAMPLE_RATE, total_frames))
+            f.writelines(level_headers)
+            for data in levels:
+                f.write(np.ascontiguousarray(data, dtype='<i2').tobytes())
+        os.replace(tmp_path, path)
@@ -1,12 +1,18 @@
 import sys
-from PyQt6.QtWidgets import QApplication
-from ui.main_window import MainWindow
+from utils import metrics
+
+# 剖析需要尽早开始，才能覆盖界面模块的导入
+metrics.start_profiling()
+
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+from ui.main_window import MainWindow  # noqa: E402
 
 
 def main():
     """程序入口"""
     app = QApplication(sys.argv)
     app.setApplicationName("音乐播放器")
+    metrics.start_dump()
 
     # 创建主窗口
     window = MainWindow()
@@ -0,0 +1,70 @@
+import errno
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from utils import file_utils
+
+
+def _fail(calls, name, code):
+    def fail(*args, **kwargs):
+        calls.append(name)
+        raise OSError(code, os.strerror(code))
+    return fail
+
+
+class LinkOrCopyTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix='music_test_')
+        self.source = os.path.join(self.tmp, 'source.mp3')
+        with open(self.source, 'wb') as f:
+            f.write(os.urandom(300_000))
+        self.target_dir = os.path.join(self.tmp, 'music_files')
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def patch_stages(self, copy_file_range_errno, copyfileobj_errno=None):
+        patches = [
+            mock.patch.object(os, 'link', _fail(self.calls, 'hardlink', errno.EXDEV)),
+            mock.patch.object(os, 'copy_file_range', _fail(self.calls, 'copy_file_range', copy_file_range_errno),
+                              create=True),
+        ]
+        if file_utils.fcntl is not None:
+            patches.append(mock.patch.object(file_utils.fcntl, 'ioctl',
+                                             _fail(self.calls, 'reflink', errno.EOPNOTSUPP)))
+        if copyfileobj_errno is not None:
+            patches.append(mock.patch.object(file_utils.shutil, 'copyfileobj',
+                                             _fail(self.calls, 'copy', copyfileobj_errno)))
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def expected_calls(self, *stages):
+        reflink = ['reflink'] if file_utils.fcntl is not None else []
+        return reflink + ['hardlink', 'copy_file_range', *stages]
+
+    def test_falls_back_to_buffered_copy(self):
+        self.patch_stages(errno.EXDEV)
+        target = file_utils.copy_music_file(self.source, self.target_dir)
+        self.assertEqual(self.calls, self.expected_calls())
+        with open(self.source, 'rb') as a, open(target, 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_copy_file_range_error_leaves_no_file(self):
+        self.patch_stages(errno.ENOSPC)
+        self.assertIsNone(file_utils.copy_music_file(self.source, self.target_dir))
+        self.assertEqual(self.calls, self.expected_calls())
+        self.assertEqual(os.listdir(self.target_dir), [])
+
+    def test_buffered_copy_error_leaves_no_file(self):
+        self.patch_stages(errno.EXDEV, copyfileobj_errno=errno.EIO)
+        self.assertIsNone(file_utils.copy_music_file(self.source, self.target_dir))
+        self.assertEqual(self.calls, self.expected_calls('copy'))
+        self.assertEqual(os.listdir(self.target_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
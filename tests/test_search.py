@@ -0,0 +1,87 @@
+import shutil
+import tempfile
+import time
+import unittest
+from core.music_manager import MusicManager
+from core.schema import MIGRATIONS
+
+
+def _music(i, title, artist='', album=''):
+    return {
+        'title': title, 'artist': artist, 'album': album,
+        'filename': f'{i}.mp3', 'file_path': f'/synthetic/{i}.mp3',
+        'duration': 200.0, 'duration_str': '03:20', 'file_size': 1000 + i,
+        'import_time': int(time.time()) + i, 'mtime_ns': None, 'managed': 1,
+        'folder_id': None, 'content_hash': None,
+    }
+
+
+class SearchTest(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp(prefix='music_test_')
+        self.manager = MusicManager(self.data_dir)
+        self.manager._insert_music_batch([
+            _music(1, '七里香', '周杰伦', '七里香'),
+            _music(2, '晴天', '周杰伦', '叶惠美'),
+            _music(3, 'Summer Night', 'Blue Road', 'City Lights'),
+            _music(4, '夜に駆ける', 'YOASOBI', 'THE BOOK'),
+            _music(5, '100%_纯音乐', 'Piano', 'Live'),
+        ])
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def titles(self, query):
+        return {music['title'] for music in self.manager.search(query)}
+
+    def test_prefix(self):
+        self.assertEqual(self.titles('sum'), {'Summer Night'})
+        self.assertEqual(self.titles('blue ci'), {'Summer Night'})
+
+    def test_cjk_substring(self):
+        self.assertEqual(self.titles('杰伦'), {'七里香', '晴天'})
+        self.assertEqual(self.titles('里'), {'七里香'})
+        self.assertEqual(self.titles('駆け'), {'夜に駆ける'})
+        self.assertEqual(self.titles('に駆け'), {'夜に駆ける'})
+        self.assertEqual(self.titles('伦'), {'七里香', '晴天'})
+
+    def test_cjk_with_prefix_term(self):
+        self.assertEqual(self.titles('杰伦 叶'), {'晴天'})
+        self.assertEqual(self.titles('駆 yoa'), {'夜に駆ける'})
+        self.assertEqual(self.titles('杰伦 yoa'), set())
+
+    def test_cjk_single_character_and_miss(self):
+        self.assertEqual(self.titles('香'), {'七里香'})
+        self.assertEqual(self.titles('周杰'), {'七里香', '晴天'})
+        self.assertEqual(self.titles('杰周'), set())
+        self.assertEqual(self.titles('不存在'), set())
+
+    def test_punctuation_and_quotes(self):
+        self.assertEqual(self.titles('%_纯'), {'100%_纯音乐'})
+        self.assertEqual(self.titles('"杰伦'), {'七里香', '晴天'})
+
+    def test_index_follows_updates_and_deletes(self):
+        self.manager.db.execute("UPDATE music SET artist = '陈奕迅' WHERE id = 1")
+        self.assertEqual(self.titles('杰伦'), {'晴天'})
+        self.assertEqual(self.titles('奕迅'), {'七里香'})
+        self.manager.db.execute('DELETE FROM music WHERE id = 2')
+        self.assertEqual(self.titles('杰伦'), set())
+
+    def test_migration_indexes_existing_rows(self):
+        self.manager.close()
+        self.manager = MusicManager(self.data_dir)
+        conn = self.manager.db.connection()
+        conn.execute('DROP TABLE music_fts')
+        conn.execute(f'PRAGMA user_version = {len(MIGRATIONS) - 1}')
+        for statement in MIGRATIONS[2]:  # 旧版本（3）的 unicode61 外部内容索引
+            conn.execute(statement)
+        self.manager.close()
+
+        self.manager = MusicManager(self.data_dir)
+        self.assertEqual(self.titles('杰伦'), {'七里香', '晴天'})
+        self.assertEqual(self.titles('sum'), {'Summer Night'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QPixmap, QPixmapCache
+
+
+class CoverProvider(QObject):
+    """界面线程的封面入口：QPixmapCache 内存缓存，未命中时交给后台 CoverWorker
+
+    内存缓存以封面哈希为键，同一专辑的曲目共用一个 QPixmap。
+    """
+    cover_changed = pyqtSignal(int)  # 音乐 id
+
+    def __init__(self, cover_worker, parent=None):
+        super().__init__(parent)
+        self.cover_worker = cover_worker
+        self.cover_worker.cover_ready.connect(self.on_cover_ready)
+        self._hashes = {}  # 音乐 id -> 本次运行中加载到的封面哈希（列表行数据里的可能还是旧值）
+
+    @staticmethod
+    def _key(cover_hash, size):
+        return f"cover_{cover_hash}_{size}"
+
+    def pixmap(self, music, size):
+        """返回缩略图；内存缓存未命中时请求后台加载并返回 None（加载完成后发出 cover_changed）"""
+        cover_hash = self._hashes.get(music['id'], music.get('cover_hash'))
+        if cover_hash == '':
+            return None
+        if cover_hash:
+            pixmap = QPixmapCache.find(self._key(cover_hash, size))
+            if pixmap is not None:
+                return pixmap
+        self.cover_worker.request(music, size)
+        return None
+
+    def on_cover_ready(self, music_id, cover_hash, size, image):
+        """后台加载完成：转成 QPixmap（只能在界面线程中创建）放入内存缓存"""
+        if image is None or image.isNull():
+            cover_hash = ''  # 缩略图无法解码时按没有封面处理，避免反复请求
+        self._hashes[music_id] = cover_hash
+        if cover_hash:
+            QPixmapCache.insert(self._key(cover_hash, size), QPixmap.fromImage(image))
+        self.cover_changed.emit(music_id)
@@ -0,0 +1,103 @@
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QSlider, QLabel, QCheckBox, QPushButton
+from PyQt6.QtCore import Qt, QTimer
+from core.equalizer import BANDS_HZ, MAX_GAIN_DB, BUDGET
+
+
+class EqualizerPanel(QDialog):
+    """均衡器面板：开关、前级增益与 10 段增益滑块，并显示处理耗时
+
+    滑块以 0.5 dB 为步长；耗时只在可见时定时刷新。
+    """
+    STEPS_PER_DB = 2
+    REFRESH_MS = 500
+
+    def __init__(self, equalizer, parent=None):
+        super().__init__(parent)
+        self.equalizer = equalizer
+        self.setWindowTitle("均衡器")
+        self.init_ui()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh_load)
+
+    def init_ui(self):
+        """初始化UI"""
+        layout = QVBoxLayout(self)
+
+        toolbar = QHBoxLayout()
+        self.enable_check = QCheckBox("启用")
+        self.enable_check.setChecked(self.equalizer.enabled)
+        self.enable_check.toggled.connect(self.equalizer.set_enabled)
+        toolbar.addWidget(self.enable_check)
+        toolbar.addStretch()
+
+        self.load_label = QLabel()
+        self.load_label.setObjectName("StatusLabel")
+        toolbar.addWidget(self.load_label)
+
+        reset_btn = QPushButton("重置")
+        reset_btn.clicked.connect(self.on_reset_clicked)
+        toolbar.addWidget(reset_btn)
+        layout.addLayout(toolbar)
+
+        grid = QGridLayout()
+        self.preamp_slider = self._add_slider(grid, 0, "前级", self.equalizer.preamp_db)
+        self.preamp_slider.valueChanged.connect(
+            lambda value: self.equalizer.set_preamp(value / self.STEPS_PER_DB))
+
+        self.band_sliders = []
+        for i, freq in enumerate(BANDS_HZ):
+            name = f"{freq // 1000}k" if freq >= 1000 else str(freq)
+            slider = self._add_slider(grid, i + 1, name, self.equalizer.gains[i])
+            slider.valueChanged.connect(
+                lambda value, index=i: self.equalizer.set_band(index, value / self.STEPS_PER_DB))
+            self.band_sliders.append(slider)
+        layout.addLayout(grid)
+
+    def _add_slider(self, grid, column, name, gain_db):
+        """在网格的一列中添加 增益值 / 竖直滑块 / 名称"""
+        steps = int(MAX_GAIN_DB * self.STEPS_PER_DB)
+        slider = QSlider(Qt.Orientation.Vertical)
+        slider.setRange(-steps, steps)
+        slider.setValue(round(gain_db * self.STEPS_PER_DB))
+        slider.setMinimumHeight(160)
+
+        value_label = QLabel()
+        value_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        value_label.setObjectName("StatusLabel")
+
+        def update_label(value):
+            value_label.setText(f"{value / self.STEPS_PER_DB:+.1f}")
+        update_label(slider.value())
+        slider.valueChanged.connect(update_label)
+
+        name_label = QLabel(name)
+        name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        grid.addWidget(value_label, 0, column)
+        grid.addWidget(slider, 1, column, Qt.AlignmentFlag.AlignHCenter)
+        grid.addWidget(name_label, 2, column)
+        return slider
+
+    def on_reset_clicked(self):
+        """所有增益归零"""
+        for slider in [self.preamp_slider] + self.band_sliders:
+            slider.setValue(0)
+
+    def refresh_load(self):
+        """显示最近的处理耗时占实时的比例与超出预算的块数"""
+        equalizer = self.equalizer
+        if not equalizer.blocks:
+            self.load_label.setText("")
+            return
+        self.load_label.setText(f"处理耗时 {equalizer.load:.1%}（预算 {BUDGET:.0%}，超出 {equalizer.over_budget} 块）")
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh_load()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
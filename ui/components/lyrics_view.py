@@ -0,0 +1,70 @@
+import html
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PyQt6.QtCore import Qt
+
+
+class LyricsView(QWidget):
+    """同步歌词显示：当前行居中，上下各显示 CONTEXT_LINES 行
+
+    每次位置更新只做一次二分查找，行号（或逐字歌词中正在唱的字）变化时才更新文字。
+    """
+    CONTEXT_LINES = 2
+    SUNG_COLOR = '#FF3A3A'
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.lyrics = None
+        self._shown = None  # 当前显示的 (行号, 字序号)
+        self.init_ui()
+
+    def init_ui(self):
+        """初始化UI"""
+        self.setObjectName("LyricsView")
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 6, 20, 6)
+        layout.setSpacing(2)
+
+        self.line_labels = []
+        for offset in range(-self.CONTEXT_LINES, self.CONTEXT_LINES + 1):
+            label = QLabel()
+            label.setObjectName("CurrentLyricLine" if offset == 0 else "LyricLine")
+            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            label.setTextFormat(Qt.TextFormat.RichText if offset == 0 else Qt.TextFormat.PlainText)
+            layout.addWidget(label)
+            self.line_labels.append(label)
+
+    def set_lyrics(self, lyrics):
+        """设置当前曲目的歌词（None 表示没有歌词，隐藏组件）"""
+        self.lyrics = lyrics
+        self._shown = None
+        self.setVisible(lyrics is not None)
+        if lyrics is not None:
+            self.update_position_ms(0)
+
+    def update_position_ms(self, position_ms):
+        """播放位置更新（毫秒）"""
+        lyrics = self.lyrics
+        if lyrics is None:
+            return
+        index = lyrics.index_at(position_ms)
+        word = lyrics.word_index_at(index, position_ms)
+        if (index, word) == self._shown:
+            return
+        self._shown = (index, word)
+
+        for offset, label in enumerate(self.line_labels, -self.CONTEXT_LINES):
+            row = index + offset
+            text = lyrics.lines[row] if 0 <= row < len(lyrics) else ''
+            if offset == 0:
+                text = self._current_line_html(index, word) if row >= 0 else ''
+            label.setText(text)
+
+    def _current_line_html(self, index, word):
+        """当前行：逐字歌词中已唱到的部分高亮"""
+        words = self.lyrics.words[index]
+        if not words or word < 0:
+            return html.escape(self.lyrics.lines[index])
+        texts = words[1]
+        sung = html.escape(''.join(texts[:word + 1]))
+        rest = html.escape(''.join(texts[word + 1:]))
+        return f'<span style="color: {self.SUNG_COLOR};">{sung}</span>{rest}'
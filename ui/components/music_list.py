@@ -1,8 +1,9 @@
-from PyQt6.QtWidgets import (QWidget, QTableWidget, QTableWidgetItem,
-                             QVBoxLayout, QPushButton, QHeaderView, QMessageBox)
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QIcon
-import os
+from PyQt6.QtWidgets import (QWidget, QTableView, QVBoxLayout, QHeaderView, QMessageBox,
+                             QLineEdit)
+from PyQt6.QtCore import QPoint, QSize, QTimer, pyqtSignal
+from PyQt6.QtGui import QPixmap, QColor
+from ui.components.music_table_model import MusicTableModel, DeleteButtonDelegate
+from core.cover_art import LIST_SIZE
 
 
 class MusicList(QWidget):
@@ -10,72 +11,153 @@ class MusicList(QWidget):
     music_selected = pyqtSignal(dict)  # 音乐选中信号
     delete_requested = pyqtSignal(int)  # 删除请求信号
 
+    ROW_HEIGHT = 36
+    SEARCH_DELAY_MS = 200  # 输入停顿多久后执行搜索
+    SEARCH_LIMIT = 500
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.music_manager = None
+        self.cover_provider = None
+        self.sort_key = 'import_time'
+        self.descending = True
         self.init_ui()
-        self.music_list = []
 
     def init_ui(self):
         """初始化UI"""
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
 
-        # 音乐表格
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(['标题', '艺术家', '专辑', '时长', '操作'])
-
-        # 表头样式
-        self.table.horizontalHeader().setStretchLastSection(False)
-        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
-        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeMode.Fixed)
-        self.table.setColumnWidth(4, 80)
+        # 搜索框（输入防抖后再查询）
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("搜索标题、艺术家、专辑")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self.on_search_text_changed)
+        layout.addWidget(self.search_edit)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.run_search)
+
+        # 音乐表格（模型/视图，按需加载行）
+        self.model = MusicTableModel(parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+
+        # 表头样式（避免 ResizeToContents，它需要遍历所有行）
+        header = self.table.horizontalHeader()
+        header.setStretchLastSection(False)
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for column, width in ((1, 160), (2, 160), (3, 70)):
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.Interactive)
+            self.table.setColumnWidth(column, width)
+        header.setSectionResizeMode(MusicTableModel.DELETE_COLUMN, QHeaderView.ResizeMode.Fixed)
+        self.table.setColumnWidth(MusicTableModel.DELETE_COLUMN, 80)
+
+        # 封面缩略图（未加载或没有封面时用占位图，保持标题对齐）
+        self.table.setIconSize(QSize(LIST_SIZE, LIST_SIZE))
+        self.cover_placeholder = QPixmap(LIST_SIZE, LIST_SIZE)
+        self.cover_placeholder.fill(QColor('#2A2A2A'))
+
+        # 固定行高，滚动时无需逐行测量
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(self.ROW_HEIGHT)
 
         # 表格设置
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self.table.setShowGrid(False)
+        self.table.setMouseTracking(True)
+        self.table.setVerticalScrollMode(QTableView.ScrollMode.ScrollPerPixel)
+
+        # 删除操作由委托绘制
+        self.delete_delegate = DeleteButtonDelegate(self.table)
+        self.delete_delegate.delete_clicked.connect(self.on_delete_index_clicked)
+        self.table.setItemDelegateForColumn(MusicTableModel.DELETE_COLUMN, self.delete_delegate)
 
         # 点击事件
-        self.table.cellClicked.connect(self.on_cell_clicked)
+        self.table.clicked.connect(self.on_cell_clicked)
 
         layout.addWidget(self.table)
 
+    def set_music_manager(self, music_manager):
+        """设置数据源，列表按页从数据库加载"""
+        self.music_manager = music_manager
+        self.model.set_source(self.fetch_page, self.sort_key, self.descending)
+
+    def set_cover_provider(self, cover_provider):
+        """设置封面来源，标题列显示封面缩略图（只为可见行请求）"""
+        self.cover_provider = cover_provider
+        cover_provider.cover_changed.connect(self.model.cover_changed)
+        self.model.cover_provider = self.cover_for
+
+    def cover_for(self, music):
+        pixmap = self.cover_provider.pixmap(music, LIST_SIZE)
+        return self.cover_placeholder if pixmap is None else pixmap
+
+    def fetch_page(self, after, limit):
+        """从数据库获取一页音乐，返回 (音乐列表, 下一页游标)"""
+        page = self.music_manager.query_music(self.sort_key, self.descending, limit, after)
+        cursor = self.music_manager.page_cursor(page[-1], self.sort_key) if page else after
+        return page, cursor
+
+    def reload(self):
+        """重新加载列表"""
+        if self.search_edit.text().strip():
+            self.run_search()
+        else:
+            self.model.reload()
+
+    def on_search_text_changed(self, text):
+        """搜索框内容变化，重新开始防抖计时"""
+        self.search_timer.start()
+
+    def run_search(self):
+        """执行搜索，清空搜索框时恢复完整列表"""
+        if self.music_manager is None:
+            return
+
+        query = self.search_edit.text().strip()
+        if query:
+            self.model.set_music_list(self.music_manager.search(query, self.SEARCH_LIMIT))
+        else:
+            self.model.set_source(self.fetch_page, self.sort_key, self.descending)
+
+    def apply_changes(self, changes):
+        """应用曲库增量变更，保持选中项和滚动位置"""
+        # 记录视口顶部的行作为滚动锚点
+        anchor = self.model.music_at(self.table.indexAt(QPoint(0, 0)).row())
+        anchor_offset = self.table.rowViewportPosition(self.model.row_of(anchor['id'])) if anchor else 0
+
+        fetch_rows = self.music_manager.get_music_by_ids if self.music_manager else (lambda ids: [])
+        self.model.apply_changes(changes, fetch_rows)
+
+        # 恢复锚点行在视口中的位置
+        if anchor:
+            row = self.model.row_of(anchor['id'])
+            if row >= 0:
+                scroll_bar = self.table.verticalScrollBar()
+                scroll_bar.setValue(scroll_bar.value() + self.table.rowViewportPosition(row) - anchor_offset)
+
     def update_music_list(self, music_list):
         """更新音乐列表"""
-        self.music_list = music_list
-        self.table.setRowCount(0)
-
-        for music in music_list:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
+        self.model.set_music_list(music_list)
 
-            # 设置表格内容
-            self.table.setItem(row, 0, QTableWidgetItem(music['title']))
-            self.table.setItem(row, 1, QTableWidgetItem(music['artist']))
-            self.table.setItem(row, 2, QTableWidgetItem(music['album']))
-            self.table.setItem(row, 3, QTableWidgetItem(music['duration_str']))
-
-            # 删除按钮
-            delete_btn = QPushButton("删除")
-            delete_btn.setStyleSheet("color: #FF3A3A; background-color: transparent; border: none;")
-            delete_btn.clicked.connect(lambda _, m=music: self.on_delete_clicked(m['id']))
-            self.table.setCellWidget(row, 4, delete_btn)
-
-            # 设置行数据
-            self.table.item(row, 0).setData(Qt.ItemDataRole.UserRole, music)
-
-    def on_cell_clicked(self, row, column):
+    def on_cell_clicked(self, index):
         """单元格点击事件"""
-        if column < 4:  # 点击除删除按钮外的单元格
-            music_item = self.table.item(row, 0)
-            if music_item:
-                music = music_item.data(Qt.ItemDataRole.UserRole)
+        if index.column() != MusicTableModel.DELETE_COLUMN:  # 点击除删除按钮外的单元格
+            music = self.model.music_at(index.row())
+            if music:
                 self.music_selected.emit(music)
 
+    def on_delete_index_clicked(self, index):
+        """删除单元格点击事件"""
+        music = self.model.music_at(index.row())
+        if music:
+            self.on_delete_clicked(music['id'])
+
     def on_delete_clicked(self, music_id):
         """删除按钮点击事件"""
         reply = QMessageBox.question(
@@ -87,9 +169,17 @@ class MusicList(QWidget):
         if reply == QMessageBox.StandardButton.Yes:
             self.delete_requested.emit(music_id)
 
+    def select_music(self, music_id):
+        """选中指定音乐所在行（仅当该行已加载）"""
+        row = self.model.row_of(music_id)
+        if row >= 0:
+            self.table.selectRow(row)
+        else:
+            self.table.clearSelection()
+
     def get_selected_music(self):
         """获取选中的音乐"""
-        selected_items = self.table.selectedItems()
-        if selected_items:
-            return selected_items[0].data(Qt.ItemDataRole.UserRole)
-        return None
\ No newline at end of file
+        selected_rows = self.table.selectionModel().selectedRows()
+        if selected_rows:
+            return self.model.music_at(selected_rows[0].row())
+        return None
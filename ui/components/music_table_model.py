@@ -0,0 +1,215 @@
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, pyqtSignal
+from PyQt6.QtGui import QColor
+from utils import metrics
+
+
+class MusicTableModel(QAbstractTableModel):
+    """音乐列表数据模型
+
+    行数据按页从数据源懒加载（canFetchMore/fetchMore），视图只请求可见区域，
+    首屏和滚动开销与曲库大小无关。
+    """
+    MusicRole = Qt.ItemDataRole.UserRole  # 整行音乐数据
+
+    COLUMNS = [
+        ('title', '标题'),
+        ('artist', '艺术家'),
+        ('album', '专辑'),
+        ('duration_str', '时长'),
+        (None, '操作'),
+    ]
+    DELETE_COLUMN = 4
+
+    def __init__(self, page_size=200, parent=None):
+        super().__init__(parent)
+        self.page_size = page_size
+        self.rows = []
+        self.fetch_page = None  # fetch_page(after, limit) -> (rows, next_cursor)
+        self.sort_key = None
+        self.descending = True
+        self._cursor = None
+        self._has_more = False
+        self._row_by_id = None  # id -> 行号，结构变化后按需重建
+        self.cover_provider = None  # cover_provider(music) -> 标题列的封面图标
+
+    def set_source(self, fetch_page, sort_key='import_time', descending=True):
+        """设置分页数据源及其排序方式并重新加载"""
+        self.fetch_page = fetch_page
+        self.sort_key = sort_key
+        self.descending = descending
+        self.reload()
+
+    def reload(self):
+        """清空已加载的行，从第一页重新开始"""
+        self.beginResetModel()
+        self.rows = []
+        self._row_by_id = None
+        self._cursor = None
+        self._has_more = self.fetch_page is not None
+        self.endResetModel()
+
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    @metrics.timed('list.refresh')
+    def set_music_list(self, music_list):
+        """直接使用给定的音乐列表（不再分页加载）"""
+        self.beginResetModel()
+        self.fetch_page = None
+        self.sort_key = None
+        self.rows = list(music_list)
+        self._row_by_id = None
+        self._cursor = None
+        self._has_more = False
+        self.endResetModel()
+
+    def music_at(self, row):
+        """获取指定行的音乐"""
+        if 0 <= row < len(self.rows):
+            return self.rows[row]
+        return None
+
+    def row_of(self, music_id):
+        """获取音乐所在行号，未加载时返回 -1"""
+        if self._row_by_id is None:
+            self._row_by_id = {music['id']: row for row, music in enumerate(self.rows)}
+        return self._row_by_id.get(music_id, -1)
+
+    @metrics.timed('list.apply_changes')
+    def apply_changes(self, changes, fetch_rows):
+        """按增量更新已加载的行
+
+        changes 为 MusicManager 的变更通知，fetch_rows(ids) 返回对应音乐数据。
+        只处理已加载窗口内受影响的行；排在已加载窗口之后的新行留给后续分页加载。
+        排序字段变化的行先移除，再按新位置插入。
+        """
+        self._remove_rows(self.row_of(i) for i in changes.get('deleted', ()))
+
+        moved = []
+        updated_ids = [i for i in changes.get('updated', ()) if self.row_of(i) >= 0]
+        for music in fetch_rows(updated_ids) if updated_ids else ():
+            row = self.row_of(music['id'])
+            if self.sort_key and music[self.sort_key] != self.rows[row][self.sort_key]:
+                moved.append(music)
+                continue
+            self.rows[row] = music
+            self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+        self._remove_rows(self.row_of(music['id']) for music in moved)
+
+        inserted_ids = changes.get('inserted', ())
+        if self.sort_key:
+            self.row_of(None)  # 确保索引已建立
+            loaded = self._row_by_id  # 插入期间只用这份快照判断是否已加载，不逐行重建
+            pending = moved + [music for music in (fetch_rows(inserted_ids) if inserted_ids else ())
+                               if music['id'] not in loaded]
+            for music in pending:
+                row = self._insert_position(music)
+                if row == len(self.rows) and self._has_more:
+                    continue  # 位于已加载窗口之后，等分页时再加载
+                self.beginInsertRows(QModelIndex(), row, row)
+                self.rows.insert(row, music)
+                self._row_by_id = None  # 只作废，下次 row_of 时重建
+                self.endInsertRows()
+
+    def _remove_rows(self, rows):
+        """从后往前移除给定行（-1 忽略），之后重建一次行号索引"""
+        rows = sorted({row for row in rows if row >= 0}, reverse=True)
+        for row in rows:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.rows[row]
+            self.endRemoveRows()
+        if rows:
+            self._row_by_id = None
+
+    def cover_changed(self, music_id):
+        """某首音乐的封面已加载，重绘其标题单元格"""
+        row = self.row_of(music_id)
+        if row >= 0:
+            index = self.index(row, 0)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def _insert_position(self, music):
+        """二分查找新行在当前排序下的位置"""
+        key = (music[self.sort_key], music['id'])
+        low, high = 0, len(self.rows)
+        while low < high:
+            mid = (low + high) // 2
+            mid_music = self.rows[mid]
+            mid_key = (mid_music[self.sort_key], mid_music['id'])
+            if (mid_key > key) if self.descending else (mid_key < key):
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        music = self.rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            key = self.COLUMNS[index.column()][0]
+            return music[key] if key else '删除'
+        if role == self.MusicRole:
+            return music
+        if role == Qt.ItemDataRole.DecorationRole and index.column() == 0 and self.cover_provider:
+            return self.cover_provider(music)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section][1]
+        return super().headerData(section, orientation, role)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._has_more
+
+    @metrics.timed('list.fetch_page')
+    def fetchMore(self, parent=QModelIndex()):
+        """加载下一页"""
+        if parent.isValid() or not self._has_more:
+            return
+
+        page, next_cursor = self.fetch_page(self._cursor, self.page_size)
+        self._has_more = len(page) >= self.page_size
+        self._cursor = next_cursor
+        if not page:
+            return
+
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self.rows.extend(page)
+        if self._row_by_id is not None:
+            self._row_by_id.update({music['id']: start + i for i, music in enumerate(page)})
+        self.endInsertRows()
+
+
+class DeleteButtonDelegate(QStyledItemDelegate):
+    """绘制“删除”操作的委托，替代每行一个真实按钮控件"""
+    delete_clicked = pyqtSignal(QModelIndex)
+
+    def paint(self, painter, option, index):
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(option.rect, QColor('#2D2D2D'))
+        elif option.state & QStyle.StateFlag.State_MouseOver:
+            painter.fillRect(option.rect, QColor('#252525'))
+
+        painter.save()
+        painter.setPen(QColor('#FF3A3A'))
+        painter.drawText(option.rect, Qt.AlignmentFlag.AlignCenter, index.data())
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton
+                and option.rect.contains(event.position().toPoint())):
+            self.delete_clicked.emit(index)
+            return True
+        return super().editorEvent(event, model, option, index)
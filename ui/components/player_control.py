@@ -1,7 +1,10 @@
 from PyQt6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QPushButton,
-                             QSlider, QLabel, QSpacerItem, QSizePolicy)
+                             QLabel, QSpacerItem, QSizePolicy)
 from PyQt6.QtCore import Qt, pyqtSignal, QSize  # 新增QSize导入
 from PyQt6.QtGui import QIcon
+from ui.components.waveform_slider import WaveformSlider
+from ui.components.spectrum_view import SpectrumView
+from core.cover_art import PLAYER_SIZE
 import os
 
 
@@ -11,7 +14,16 @@ class PlayerControl(QWidget):
     pause_clicked = pyqtSignal()
     prev_clicked = pyqtSignal()
     next_clicked = pyqtSignal()
-    seek_requested = pyqtSignal(int)
+    seek_requested = pyqtSignal(float)  # 跳转位置（秒）
+    play_mode_changed = pyqtSignal(str)
+
+    # 播放模式及显示文字（按点击顺序循环切换）
+    PLAY_MODES = [
+        ('sequential', '顺序播放'),
+        ('repeat_all', '列表循环'),
+        ('repeat_one', '单曲循环'),
+        ('shuffle', '随机播放'),
+    ]
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -19,14 +31,25 @@ class PlayerControl(QWidget):
         self.is_playing = False
         self.current_music = None
         self.total_duration = 0
+        self.play_mode_index = 0
 
     def init_ui(self):
         """初始化UI"""
         self.setObjectName("ControlBar")
 
+        # 外层布局：左侧封面，右侧歌曲信息与控制按钮
+        outer_layout = QHBoxLayout(self)
+        outer_layout.setContentsMargins(20, 10, 20, 10)
+
+        self.cover_label = QLabel()
+        self.cover_label.setFixedSize(PLAYER_SIZE, PLAYER_SIZE)
+        self.cover_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.cover_label.setStyleSheet("background-color: #2A2A2A;")
+        outer_layout.addWidget(self.cover_label)
+
         # 主布局
-        main_layout = QVBoxLayout(self)
-        main_layout.setContentsMargins(20, 10, 20, 10)
+        main_layout = QVBoxLayout()
+        outer_layout.addLayout(main_layout, 1)
 
         # 歌曲信息
         info_layout = QHBoxLayout()
@@ -43,6 +66,11 @@ class PlayerControl(QWidget):
         info_layout.addWidget(self.artist_label)
         info_layout.addSpacerItem(QSpacerItem(40, 20, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum))
 
+        # 频谱与电平（由频谱按钮显示/隐藏）
+        self.spectrum_view = SpectrumView()
+        info_layout.addWidget(self.spectrum_view)
+        info_layout.addSpacing(10)
+
         # 时间标签
         self.time_label = QLabel("00:00 / 00:00")
         self.time_label.setObjectName("StatusLabel")
@@ -83,10 +111,27 @@ class PlayerControl(QWidget):
         self.next_btn.clicked.connect(self.next_clicked.emit)
         control_layout.addWidget(self.next_btn)
 
+        control_layout.addSpacing(20)
+
+        # 播放模式按钮
+        self.mode_btn = QPushButton(self.PLAY_MODES[0][1])
+        self.mode_btn.setMinimumWidth(90)
+        self.mode_btn.clicked.connect(self.on_mode_clicked)
+        control_layout.addWidget(self.mode_btn)
+
+        control_layout.addSpacing(10)
+
+        # 频谱显示开关
+        self.spectrum_btn = QPushButton("频谱")
+        self.spectrum_btn.setCheckable(True)
+        self.spectrum_btn.setChecked(True)
+        self.spectrum_btn.toggled.connect(self.spectrum_view.setVisible)
+        control_layout.addWidget(self.spectrum_btn)
+
         control_layout.addSpacing(40)
 
-        # 进度条
-        self.progress_slider = QSlider(Qt.Orientation.Horizontal)
+        # 进度条（有峰值缓存时显示波形）
+        self.progress_slider = WaveformSlider(Qt.Orientation.Horizontal)
         self.progress_slider.setMinimumWidth(400)
         self.progress_slider.setRange(0, 100)
         self.progress_slider.sliderReleased.connect(self.on_seek)
@@ -119,7 +164,8 @@ class PlayerControl(QWidget):
             self.title_label.setText(music['title'])
             self.artist_label.setText(f"- {music['artist']}")
             self.total_duration = int(music['duration'])
-            self.progress_slider.setRange(0, self.total_duration)
+            self.progress_slider.setRange(0, int(music['duration'] * 1000))  # 毫秒
+            self.progress_slider.setValue(0)
             self.time_label.setText(f"00:00 / {music['duration_str']}")
         else:
             self.title_label.setText("未选择音乐")
@@ -127,11 +173,29 @@ class PlayerControl(QWidget):
             self.time_label.setText("00:00 / 00:00")
             self.progress_slider.setRange(0, 100)
             self.progress_slider.setValue(0)
+            self.progress_slider.set_peaks(None)
+            self.set_cover(None)
+
+    def set_cover(self, pixmap):
+        """设置封面缩略图（None 表示没有封面或尚未加载）"""
+        if pixmap is None:
+            self.cover_label.clear()
+        else:
+            self.cover_label.setPixmap(pixmap)
+
+    def set_waveform(self, peaks):
+        """设置进度条的波形峰值（None 表示不显示波形）"""
+        self.progress_slider.set_peaks(peaks)
 
     def update_progress(self, position):
-        """更新播放进度"""
-        if self.total_duration > 0:
-            self.progress_slider.setValue(position)
+        """更新播放进度（秒）"""
+        self.update_progress_ms(position * 1000)
+
+    def update_progress_ms(self, position_ms):
+        """更新播放进度（毫秒）"""
+        if self.total_duration > 0 and not self.progress_slider.isSliderDown():
+            self.progress_slider.setValue(position_ms)
+            position = position_ms // 1000
             current_time = f"{position // 60:02d}:{position % 60:02d}"
             self.time_label.setText(f"{current_time} / {self.current_music['duration_str']}")
 
@@ -142,7 +206,14 @@ class PlayerControl(QWidget):
         else:
             self.play_clicked.emit()
 
+    def on_mode_clicked(self):
+        """切换播放模式"""
+        self.play_mode_index = (self.play_mode_index + 1) % len(self.PLAY_MODES)
+        mode, text = self.PLAY_MODES[self.play_mode_index]
+        self.mode_btn.setText(text)
+        self.play_mode_changed.emit(mode)
+
     def on_seek(self):
         """进度条拖拽跳转"""
-        position = self.progress_slider.value()
+        position = self.progress_slider.value() / 1000
         self.seek_requested.emit(position)
\ No newline at end of file
@@ -0,0 +1,64 @@
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QRectF, pyqtSignal
+from PyQt6.QtGui import QPainter, QColor
+
+
+class SpectrumView(QWidget):
+    """控制栏中的频谱与 VU 表
+
+    只保存分析线程算好的两个小数组，每帧只重绘自身（不透明绘制，不重绘父组件）。
+    显示/隐藏时发出 visibility_changed，隐藏（包括窗口最小化）时分析随之停止。
+    """
+    visibility_changed = pyqtSignal(bool)
+
+    BAR_COLOR = QColor('#FF3A3A')
+    METER_COLOR = QColor('#CCCCCC')
+    BACKGROUND = QColor('#1E1E1E')
+    METER_WIDTH = 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.setFixedSize(160, 28)
+        self.setToolTip("频谱 / 电平")
+        self.bands = None
+        self.levels = None
+
+    def set_frame(self, bands, levels):
+        """设置一帧：各频带幅度与各声道电平（0~1）"""
+        self.bands = bands
+        self.levels = levels
+        self.update()
+
+    def clear(self):
+        self.bands = None
+        self.levels = None
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.BACKGROUND)
+        height = self.height()
+        if self.bands is not None:
+            levels = self.levels
+            meters_width = len(levels) * (self.METER_WIDTH + 1) + 3
+            bar_width = (self.width() - meters_width) / len(self.bands)
+            for i, value in enumerate(self.bands):
+                bar_height = float(value) * height
+                painter.fillRect(QRectF(i * bar_width, height - bar_height, bar_width - 1, bar_height), self.BAR_COLOR)
+
+            x = self.width() - meters_width + 3
+            for value in levels:
+                meter_height = float(value) * height
+                painter.fillRect(QRectF(x, height - meter_height, self.METER_WIDTH, meter_height), self.METER_COLOR)
+                x += self.METER_WIDTH + 1
+        painter.end()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.visibility_changed.emit(True)
+
+    def hideEvent(self, event):
+        self.visibility_changed.emit(False)
+        self.clear()
+        super().hideEvent(event)
@@ -0,0 +1,102 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+                             QHeaderView, QCheckBox, QPushButton, QLabel, QFileDialog)
+from PyQt6.QtCore import Qt, QTimer
+from utils import metrics
+
+
+class StatsPanel(QDialog):
+    """性能统计面板：显示各计时区间的次数与耗时分布、计数器
+
+    只在可见时定时刷新，隐藏后不占用任何开销。
+    """
+    REFRESH_MS = 1000
+    COLUMNS = ('区间', '次数', '平均 ms', 'p50 ms', 'p95 ms', '最大 ms', '总计 ms')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("性能统计")
+        self.resize(720, 480)
+        self.init_ui()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def init_ui(self):
+        """初始化UI"""
+        layout = QVBoxLayout(self)
+
+        toolbar = QHBoxLayout()
+        self.enable_check = QCheckBox("启用采集")
+        self.enable_check.setChecked(metrics.enabled)
+        self.enable_check.toggled.connect(metrics.enable)
+        toolbar.addWidget(self.enable_check)
+        toolbar.addStretch()
+
+        reset_btn = QPushButton("重置")
+        reset_btn.clicked.connect(self.on_reset_clicked)
+        toolbar.addWidget(reset_btn)
+
+        export_btn = QPushButton("导出...")
+        export_btn.clicked.connect(self.on_export_clicked)
+        toolbar.addWidget(export_btn)
+        layout.addLayout(toolbar)
+
+        self.span_table = QTableWidget(0, len(self.COLUMNS))
+        self.span_table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.span_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.span_table.verticalHeader().setVisible(False)
+        self.span_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.span_table, 1)
+
+        self.counter_label = QLabel()
+        self.counter_label.setWordWrap(True)
+        self.counter_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        layout.addWidget(self.counter_label)
+
+    def refresh(self):
+        """刷新显示"""
+        snapshot = metrics.registry.snapshot()
+        spans = sorted(snapshot['spans'].items(), key=lambda item: item[1]['total_ms'], reverse=True)
+
+        self.span_table.setRowCount(len(spans))
+        for row, (name, stats) in enumerate(spans):
+            values = (name, stats['count'], stats['mean_ms'], stats['p50_ms'], stats['p95_ms'],
+                      stats['max_ms'], stats['total_ms'])
+            for column, value in enumerate(values):
+                text = f"{value:.2f}" if isinstance(value, float) else str(value)
+                item = QTableWidgetItem(text)
+                if column:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.span_table.setItem(row, column, item)
+
+        counters = snapshot['counters']
+        if counters:
+            self.counter_label.setText('  '.join(f"{name}: {value}" for name, value in sorted(counters.items())))
+        elif not metrics.enabled:
+            self.counter_label.setText(f"采集未启用（勾选上方选项，或启动前设置 {metrics.METRICS_ENV}=1）")
+        else:
+            self.counter_label.setText("")
+
+    def on_reset_clicked(self):
+        metrics.registry.reset()
+        self.refresh()
+
+    def on_export_clicked(self):
+        """导出为 JSON 或 Prometheus 文本"""
+        path, _ = QFileDialog.getSaveFileName(self, "导出性能统计", "metrics.json",
+                                              "JSON (*.json);;Prometheus (*.prom)")
+        if path:
+            try:
+                metrics.registry.dump(path)
+            except OSError as e:
+                self.counter_label.setText(f"导出失败: {e}")
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
@@ -0,0 +1,90 @@
+from PyQt6.QtWidgets import QSlider
+from PyQt6.QtCore import Qt, QLineF
+from PyQt6.QtGui import QPainter, QColor, QPen
+
+
+class WaveformSlider(QSlider):
+    """带波形概览的进度条
+
+    接口与 QSlider 相同；设置了峰值后把波形画在滑轨位置，已播放部分高亮。
+    只在宽度或峰值变化时从内存映射中取一次包络，播放中重绘不读磁盘。
+    """
+    PLAYED_COLOR = QColor('#FF3A3A')
+    REMAINING_COLOR = QColor('#555555')
+
+    def __init__(self, orientation=Qt.Orientation.Horizontal, parent=None):
+        super().__init__(orientation, parent)
+        self.setMinimumHeight(32)
+        self.peaks = None
+        self._lines = []  # 每个像素列的竖线
+        self._lines_width = 0
+
+    def set_peaks(self, peaks):
+        """设置峰值（None 表示恢复普通进度条）"""
+        if self.peaks is not None and self.peaks is not peaks:
+            self.peaks.close()
+        self.peaks = peaks
+        self._lines = []
+        self._lines_width = 0
+        self.update()
+
+    def _build_lines(self):
+        width = self.width()
+        mins, maxs = self.peaks.envelope(width)
+        middle = self.height() / 2
+        half = middle - 2
+        self._lines = [
+            QLineF(x + 0.5, middle - float(high) * half, x + 0.5, middle - float(low) * half)
+            for x, (low, high) in enumerate(zip(mins, maxs))
+        ]
+        self._lines_width = width
+
+    def resizeEvent(self, event):
+        self._lines = []
+        self._lines_width = 0
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        if self.peaks is None:
+            super().paintEvent(event)
+            return
+
+        if self._lines_width != self.width():
+            self._build_lines()
+
+        span = self.maximum() - self.minimum()
+        played = int((self.value() - self.minimum()) * self.width() / span) if span > 0 else 0
+
+        painter = QPainter(self)
+        painter.setPen(QPen(self.PLAYED_COLOR, 1))
+        painter.drawLines(self._lines[:played])
+        painter.setPen(QPen(self.REMAINING_COLOR, 1))
+        painter.drawLines(self._lines[played:])
+        painter.setPen(QPen(QColor('#FFFFFF'), 1))
+        painter.drawLine(played, 0, played, self.height())
+        painter.end()
+
+    def _value_at(self, x):
+        span = self.maximum() - self.minimum()
+        return self.minimum() + int(min(max(x, 0), self.width()) * span / max(1, self.width()))
+
+    def mousePressEvent(self, event):
+        # 有波形时点击任意位置直接定位
+        if self.peaks is None or event.button() != Qt.MouseButton.LeftButton:
+            super().mousePressEvent(event)
+            return
+        self.setSliderDown(True)
+        self.setValue(self._value_at(event.position().x()))
+
+    def mouseMoveEvent(self, event):
+        if self.peaks is None or not self.isSliderDown():
+            super().mouseMoveEvent(event)
+            return
+        self.setValue(self._value_at(event.position().x()))
+
+    def mouseReleaseEvent(self, event):
+        if self.peaks is None or not self.isSliderDown():
+            super().mouseReleaseEvent(event)
+            return
+        self.setValue(self._value_at(event.position().x()))
+        self.setSliderDown(False)  # 触发 sliderReleased
@@ -1,36 +1,149 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                             QLabel, QSplitter, QStatusBar)
-from PyQt6.QtCore import Qt
+                             QLabel, QSplitter, QStatusBar, QPushButton, QFileDialog)
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from ui.components.drag_area import DragArea
 from ui.components.music_list import MusicList
 from ui.components.player_control import PlayerControl
+from ui.components.stats_panel import StatsPanel
 from core.music_manager import MusicManager
-from core.player_engine import PlayerEngine
+from core.import_worker import ImportWorker
+from core.loudness_worker import LoudnessWorker
+from core.library_worker import LibraryScanWorker
+from core.folder_watcher import FolderWatcher
+from core.play_queue import PlayQueue
+from core.peaks_worker import PeaksWorker
+from core.cover_art import CoverCache, PLAYER_SIZE
+from core.cover_worker import CoverWorker
+from ui.components.cover_provider import CoverProvider
+from ui.components.lyrics_view import LyricsView
+from core.lyrics import LyricsCache
 from utils.file_utils import get_supported_files
+import importlib
 import os
+import threading
 
 
 class MainWindow(QMainWindow):
-    """主窗口"""
+    """主窗口
 
-    def __init__(self):
+    启动分阶段进行：构造函数只创建界面，首帧绘制后再打开曲库（init_library），
+    播放相关的重模块导入和混音器初始化在后台线程中完成后创建播放引擎（init_playback）。
+    """
+    library_changed = pyqtSignal(dict)  # 曲库变更（转发到界面线程）
+    playback_warmed_up = pyqtSignal()  # 后台预热完成（转发到界面线程）
+    startup_finished = pyqtSignal()  # 所有启动阶段完成，可以播放
+
+    def __init__(self, data_dir=None):
         super().__init__()
+        self.data_dir = data_dir  # 数据目录，默认为项目下的 data 目录
         self.init_app()
         self.init_ui()
         self.init_signals()
-        self.load_music_list()
+
+        # 事件循环开始后（首帧已排队绘制）再初始化曲库
+        QTimer.singleShot(0, self.init_library)
 
     def init_app(self):
         """初始化应用"""
         self.setWindowTitle("音乐播放器")
         self.setMinimumSize(800, 600)
 
-        # 初始化核心组件
-        self.music_manager = MusicManager()
+        # 核心组件在启动的后续阶段创建
+        self.music_manager = None
+        self.player_engine = None
+        self.play_queue = None
+        self.import_worker = None
+        self.loudness_worker = None
+        self.scan_worker = None
+        self._queued_scan = None  # 扫描进行中时再次请求的文件夹 id 集合（'all' 表示全部）
+        self._loudness_queued = False  # 分析进行中时又有新曲目，结束后再分析一次
+        self.folder_watcher = None
+        self.peaks_cache = None
+        self.peaks_worker = None
+        self.cover_worker = None
+        self.cover_provider = None
+        self.stats_panel = None
+        self.equalizer_panel = None
+        self.spectrum_worker = None
+        self._library_listener = None
+        self.lyrics_cache = LyricsCache()
+
+        # 加载样式表（文件很小，放在首帧之前以免界面闪烁）
+        self.load_stylesheet()
+
+    def init_library(self):
+        """启动第二阶段：打开数据库、加载第一页音乐列表，并在后台预热播放模块"""
+        self.music_manager = MusicManager(self.data_dir)
+
+        # 播放队列（顺序与列表一致，曲库变化后按需重新加载）
+        self.play_queue = PlayQueue(self.music_manager.get_play_order)
+
+        # 曲库变更信号（导入线程中的通知会排队到界面线程处理）
+        self._library_listener = self.library_changed.emit
+        self.music_manager.add_change_listener(self._library_listener)
+
+        # 音乐库文件夹的实时监视（仅 Linux），启动时的增量扫描完成后开始
+        if FolderWatcher.available():
+            self.folder_watcher = FolderWatcher(self.music_manager.apply_file_events)
+
+        # 封面：磁盘缩略图缓存 + 后台线程池提取，列表首屏之前就绪
+        cover_cache = CoverCache(self.music_manager.data_dirs['covers_dir'])
+        self.cover_worker = CoverWorker(cover_cache, self.music_manager, parent=self)
+        self.cover_worker.start()
+        self.cover_provider = CoverProvider(self.cover_worker, self)
+        self.cover_provider.cover_changed.connect(self.on_cover_changed)
+        self.music_list.set_cover_provider(self.cover_provider)
+
+        self.load_music_list()
+        self.drag_area.setEnabled(True)
+        self.add_folder_btn.setEnabled(True)
+
+        threading.Thread(target=self._warm_up_playback, daemon=True).start()
+
+    def _warm_up_playback(self):
+        """后台线程：导入播放引擎依赖的模块（pygame、NumPy）并初始化混音器"""
+        try:
+            from core.player_engine import PlayerEngine
+            importlib.import_module('core.waveform')
+            PlayerEngine.init_mixer()
+        except Exception as e:
+            print(f"预热播放模块失败: {e}")
+        self.playback_warmed_up.emit()
+
+    def init_playback(self):
+        """启动第三阶段：创建播放引擎和波形组件，然后开始后台扫描与分析"""
+        from core.player_engine import PlayerEngine
+        from core.waveform import PeaksCache
+        from core.spectrum_worker import SpectrumWorker
+
         self.player_engine = PlayerEngine()
+        self.player_engine.seek_index_provider = self.music_manager.get_seek_index
+        self.player_engine.play_status_changed.connect(self.player_control.update_play_status)
+        self.player_engine.position_ms_updated.connect(self.player_control.update_progress_ms)
+        self.player_engine.position_ms_updated.connect(self.lyrics_view.update_position_ms)
+        self.player_engine.music_ended.connect(self.on_music_ended)
+        self.player_engine.track_changed.connect(self.on_track_changed)
 
-        # 加载样式表
-        self.load_stylesheet()
+        # 波形峰值：磁盘缓存 + 后台生成
+        self.peaks_cache = PeaksCache(self.music_manager.data_dirs['peaks_dir'])
+        self.peaks_worker = PeaksWorker(self.peaks_cache, self)
+        self.peaks_worker.peaks_ready.connect(self.on_peaks_ready)
+        self.peaks_worker.start()
+
+        # 频谱：分析线程只在频谱组件可见时工作
+        self.spectrum_worker = SpectrumWorker(self.player_engine.output, self)
+        self.spectrum_worker.frame_ready.connect(self.on_spectrum_frame)
+        spectrum_view = self.player_control.spectrum_view
+        spectrum_view.visibility_changed.connect(self.spectrum_worker.set_active)
+        self.spectrum_worker.set_active(spectrum_view.isVisible())
+        self.spectrum_worker.start()
+
+        self.player_control.setEnabled(True)
+        self.equalizer_btn.setEnabled(True)
+        self.startup_finished.emit()
+
+        self.start_loudness_analysis()
+        self.start_library_scan()
 
     def init_ui(self):
         """初始化UI"""
@@ -53,6 +166,20 @@ class MainWindow(QMainWindow):
 
         title_layout.addStretch()
 
+        self.add_folder_btn = QPushButton("添加文件夹")
+        self.add_folder_btn.clicked.connect(self.on_add_folder_clicked)
+        self.add_folder_btn.setEnabled(False)
+        title_layout.addWidget(self.add_folder_btn)
+
+        self.equalizer_btn = QPushButton("均衡器")
+        self.equalizer_btn.clicked.connect(self.on_equalizer_clicked)
+        self.equalizer_btn.setEnabled(False)  # 播放引擎创建后启用
+        title_layout.addWidget(self.equalizer_btn)
+
+        self.stats_btn = QPushButton("性能统计")
+        self.stats_btn.clicked.connect(self.on_stats_clicked)
+        title_layout.addWidget(self.stats_btn)
+
         self.status_label = QLabel("就绪")
         self.status_label.setObjectName("StatusLabel")
         title_layout.addWidget(self.status_label)
@@ -68,6 +195,7 @@ class MainWindow(QMainWindow):
 
         # 拖拽区域
         self.drag_area = DragArea()
+        self.drag_area.setEnabled(False)  # 曲库加载后启用
         upper_layout.addWidget(self.drag_area)
 
         # 音乐列表
@@ -76,16 +204,28 @@ class MainWindow(QMainWindow):
 
         splitter.addWidget(upper_widget)
 
+        # 同步歌词（当前曲目有 .lrc 时显示）
+        self.lyrics_view = LyricsView()
+        self.lyrics_view.hide()
+        splitter.addWidget(self.lyrics_view)
+
         main_layout.addWidget(splitter, 1)  # 占满剩余空间
 
         # 底部控制栏
         self.player_control = PlayerControl()
+        self.player_control.setEnabled(False)  # 播放引擎创建后启用
         main_layout.addWidget(self.player_control)
 
         # 状态栏
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
-        self.status_bar.showMessage("就绪 - 拖拽音乐文件到窗口导入")
+        self.status_bar.showMessage("正在加载音乐库...")
+
+        # 导入取消按钮（导入时显示）
+        self.cancel_import_btn = QPushButton("取消导入")
+        self.cancel_import_btn.clicked.connect(self.on_cancel_import)
+        self.cancel_import_btn.hide()
+        self.status_bar.addPermanentWidget(self.cancel_import_btn)
 
     def init_signals(self):
         """初始化信号连接"""
@@ -102,11 +242,11 @@ class MainWindow(QMainWindow):
         self.player_control.seek_requested.connect(self.on_seek_requested)
         self.player_control.prev_clicked.connect(self.on_prev_clicked)
         self.player_control.next_clicked.connect(self.on_next_clicked)
+        self.player_control.play_mode_changed.connect(self.on_play_mode_changed)
 
-        # 播放器引擎信号
-        self.player_engine.play_status_changed.connect(self.player_control.update_play_status)
-        self.player_engine.position_updated.connect(self.player_control.update_progress)
-        self.player_engine.music_ended.connect(self.on_music_ended)
+        # 启动阶段与曲库变更信号（播放引擎的信号在其创建后连接）
+        self.library_changed.connect(self.on_library_changed)
+        self.playback_warmed_up.connect(self.init_playback)
 
     def load_stylesheet(self):
         """加载样式表"""
@@ -123,9 +263,87 @@ class MainWindow(QMainWindow):
 
     def load_music_list(self):
         """加载音乐列表"""
-        music_list = self.music_manager.get_all_music()
-        self.music_list.update_music_list(music_list)
-        self.status_bar.showMessage(f"已加载 {len(music_list)} 首音乐")
+        if self.music_list.music_manager is None:
+            self.music_list.set_music_manager(self.music_manager)
+        else:
+            self.music_list.reload()
+        self.status_bar.showMessage(f"已加载 {self.music_manager.count_music()} 首音乐")
+
+    def on_library_changed(self, changes):
+        """曲库变更处理：只更新受影响的行"""
+        self.music_list.apply_changes(changes)
+        self.play_queue.apply_changes(changes['inserted'], changes['deleted'])
+        if changes['deleted']:
+            self.preload_next_track()
+        if changes['inserted'] and not self.is_library_busy():
+            # 文件夹监视发现的新文件
+            self.start_loudness_analysis()
+
+    def is_library_busy(self):
+        """是否正在导入或扫描"""
+        return any(worker and worker.isRunning() for worker in (self.import_worker, self.scan_worker))
+
+    def on_add_folder_clicked(self):
+        """添加音乐库文件夹：原地索引，不复制文件"""
+        folder_path = QFileDialog.getExistingDirectory(self, "选择音乐文件夹")
+        if not folder_path:
+            return
+        folder_id = self.music_manager.add_library_folder(folder_path)
+        if self.folder_watcher:
+            self.folder_watcher.add_folder(folder_path)
+        self.start_library_scan([folder_id])
+
+    def on_stats_clicked(self):
+        """打开性能统计面板"""
+        if self.stats_panel is None:
+            self.stats_panel = StatsPanel(self)
+        self.stats_panel.show()
+        self.stats_panel.raise_()
+
+    def on_equalizer_clicked(self):
+        """打开均衡器面板"""
+        if self.equalizer_panel is None:
+            from ui.components.equalizer_panel import EqualizerPanel
+            self.equalizer_panel = EqualizerPanel(self.player_engine.equalizer, self)
+        self.equalizer_panel.show()
+        self.equalizer_panel.raise_()
+
+    def start_library_scan(self, folder_ids=None):
+        """在后台增量扫描音乐库文件夹；已有扫描在进行时排队，待其结束后再扫描"""
+        if self.scan_worker and self.scan_worker.isRunning():
+            if folder_ids is None or self._queued_scan == 'all':
+                self._queued_scan = 'all'
+            else:
+                self._queued_scan = (self._queued_scan or set()) | set(folder_ids)
+            return
+        self.scan_worker = LibraryScanWorker(self.music_manager, folder_ids, self)
+        self.scan_worker.progress.connect(self.on_scan_progress)
+        self.scan_worker.scan_finished.connect(self.on_scan_finished)
+        self.scan_worker.finished.connect(self._start_queued_scan)
+        self.scan_worker.start()
+
+    def _start_queued_scan(self):
+        """上一次扫描的线程结束后，开始排队中的扫描"""
+        queued, self._queued_scan = self._queued_scan, None
+        if queued is not None:
+            self.scan_worker.wait()  # finished 在线程退出前发出，这里只需等待片刻
+            self.start_library_scan(None if queued == 'all' else sorted(queued))
+
+    def on_scan_progress(self, done, total, files_per_sec):
+        """扫描进度更新"""
+        self.status_bar.showMessage(f"正在扫描音乐库 {done}/{total} ({files_per_sec:.1f} 首/秒)")
+
+    def on_scan_finished(self, stats):
+        """扫描完成：开始监视文件夹，分析新增曲目的响度"""
+        if self.folder_watcher and self.folder_watcher.start():
+            for folder in self.music_manager.get_library_folders():
+                self.folder_watcher.add_folder(folder['path'])
+        if stats.get('added') or stats.get('updated') or stats.get('moved') or stats.get('deleted'):
+            self.status_bar.showMessage(
+                f"音乐库已更新：新增 {stats['added']}，更新 {stats['updated']}，"
+                f"移动 {stats['moved']}，移除 {stats['deleted']}"
+            )
+            self.start_loudness_analysis()
 
     def on_files_dropped(self, file_paths):
         """文件拖拽处理"""
@@ -135,18 +353,81 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage("未找到支持的音乐文件")
             return
 
-        # 添加音乐
-        self.status_bar.showMessage(f"正在导入 {len(supported_files)} 首音乐...")
-        added_music = self.music_manager.add_music(supported_files)
+        if self.import_worker and self.import_worker.isRunning():
+            self.status_bar.showMessage("正在导入中，请稍候...")
+            return
 
-        # 更新列表
-        self.load_music_list()
-        self.status_bar.showMessage(f"成功导入 {len(added_music)} 首音乐")
+        # 在后台线程中添加音乐
+        self.status_bar.showMessage(f"正在导入 {len(supported_files)} 首音乐...")
+        self.import_worker = ImportWorker(self.music_manager, supported_files, self)
+        self.import_worker.progress.connect(self.on_import_progress)
+        self.import_worker.import_finished.connect(self.on_import_finished)
+        self.cancel_import_btn.show()
+        self.import_worker.start()
+
+    def on_import_progress(self, done, total, files_per_sec):
+        """导入进度更新"""
+        self.status_bar.showMessage(f"正在导入 {done}/{total} ({files_per_sec:.1f} 首/秒)")
+
+    def on_import_finished(self, added_music, stats):
+        """导入完成处理"""
+        self.cancel_import_btn.hide()
+
+        if stats.get('cancelled'):
+            self.status_bar.showMessage(f"导入已取消，已导入 {len(added_music)} 首音乐")
+        else:
+            duplicates = f"，跳过重复 {stats['duplicates']} 首" if stats.get('duplicates') else ""
+            self.status_bar.showMessage(
+                f"成功导入 {len(added_music)} 首音乐{duplicates} ({stats.get('files_per_sec', 0):.1f} 首/秒)"
+            )
+            self.start_loudness_analysis()
+
+    def start_loudness_analysis(self):
+        """在后台分析尚未分析过响度的曲目；已有分析在进行时，待其结束后再分析一次"""
+        if self.loudness_worker and self.loudness_worker.isRunning():
+            self._loudness_queued = True
+            return
+        self.loudness_worker = LoudnessWorker(self.music_manager, self)
+        self.loudness_worker.progress.connect(self.on_loudness_progress)
+        self.loudness_worker.analysis_finished.connect(self.on_loudness_finished)
+        self.loudness_worker.finished.connect(self._start_queued_loudness)
+        self.loudness_worker.start()
+
+    def _start_queued_loudness(self):
+        if self._loudness_queued:
+            self._loudness_queued = False
+            self.loudness_worker.wait()
+            self.start_loudness_analysis()
+
+    def on_loudness_progress(self, done, total, tracks_per_sec):
+        """响度分析进度更新"""
+        if not (self.import_worker and self.import_worker.isRunning()):
+            self.status_bar.showMessage(f"正在分析响度 {done}/{total} ({tracks_per_sec:.1f} 首/秒)")
+
+    def on_loudness_finished(self, stats):
+        """响度分析完成"""
+        if stats.get('analyzed') and not stats.get('cancelled'):
+            self.status_bar.showMessage(
+                f"响度分析完成 {stats['analyzed']} 首 ({stats.get('tracks_per_sec', 0):.1f} 首/秒)"
+            )
+
+    def on_cancel_import(self):
+        """取消导入"""
+        if self.import_worker and self.import_worker.isRunning():
+            self.import_worker.cancel()
+            self.status_bar.showMessage("正在取消导入...")
 
     def on_music_selected(self, music):
         """音乐选中处理"""
+        if self.player_engine is None:
+            self.status_bar.showMessage("正在初始化播放器，请稍候...")
+            return
+        self.play_queue.set_current(music['id'])
         if self.player_engine.load_music(music):
             self.player_control.update_music_info(music)
+            self.show_waveform(music)
+            self.show_cover(music)
+            self.lyrics_view.set_lyrics(self.lyrics_cache.get(music))
             self.status_bar.showMessage(f"已选择: {music['title']} - {music['artist']}")
 
     def on_play_clicked(self):
@@ -154,13 +435,14 @@ class MainWindow(QMainWindow):
         selected_music = self.music_list.get_selected_music()
         if not selected_music:
             # 没有选中音乐，尝试播放第一首
-            music_list = self.music_manager.get_all_music()
+            music_list = self.music_manager.query_music(limit=1)
             if music_list:
                 selected_music = music_list[0]
                 self.music_list.music_selected.emit(selected_music)
 
         if selected_music:
             self.player_engine.play()
+            self.preload_next_track()
             self.status_bar.showMessage(f"正在播放: {selected_music['title']}")
 
     def on_pause_clicked(self):
@@ -176,55 +458,128 @@ class MainWindow(QMainWindow):
 
     def on_prev_clicked(self):
         """上一曲处理"""
-        music_list = self.music_manager.get_all_music()
-        if not music_list:
-            return
-
-        selected_music = self.music_list.get_selected_music()
-        if not selected_music:
+        if self.play_queue.current_id is None:
             return
-
-        # 找到当前音乐索引
-        current_index = next((i for i, m in enumerate(music_list) if m['id'] == selected_music['id']), -1)
-        if current_index > 0:
-            prev_music = music_list[current_index - 1]
-            self.music_list.music_selected.emit(prev_music)
-            self.player_engine.play()
+        self.play_music_by_id(self.play_queue.prev_id())
 
     def on_next_clicked(self):
         """下一曲处理"""
-        music_list = self.music_manager.get_all_music()
-        if not music_list:
+        if self.play_queue.current_id is None:
             return
+        self.play_music_by_id(self.play_queue.next_id())
 
-        selected_music = self.music_list.get_selected_music()
-        if not selected_music:
+    def on_music_ended(self):
+        """音乐播放结束，按播放模式自动切歌"""
+        self.play_music_by_id(self.play_queue.next_id(auto=True))
+
+    def play_music_by_id(self, music_id):
+        """加载并播放指定音乐"""
+        if music_id is None:
             return
 
-        # 找到当前音乐索引
-        current_index = next((i for i, m in enumerate(music_list) if m['id'] == selected_music['id']), -1)
-        if current_index < len(music_list) - 1:
-            next_music = music_list[current_index + 1]
-            self.music_list.music_selected.emit(next_music)
+        music = self.music_manager.get_music_by_id(music_id)
+        if music:
+            self.music_list.select_music(music_id)
+            self.music_list.music_selected.emit(music)
             self.player_engine.play()
+            self.preload_next_track()
 
-    def on_music_ended(self):
-        """音乐播放结束"""
-        self.on_next_clicked()
+    def preload_next_track(self):
+        """预加载队列中的下一首，供引擎无缝切换"""
+        if self.player_engine is None or self.player_engine.current_music is None:
+            return
+
+        next_id = self.play_queue.next_id(auto=True)
+        music = self.music_manager.get_music_by_id(next_id) if next_id is not None else None
+        self.player_engine.preload_next(music)
+
+    def on_track_changed(self, music):
+        """引擎已无缝切换到下一首"""
+        self.play_queue.set_current(music['id'])
+        self.music_list.select_music(music['id'])
+        self.player_control.update_music_info(music)
+        self.show_waveform(music)
+        self.show_cover(music)
+        self.lyrics_view.set_lyrics(self.lyrics_cache.get(music))
+        self.status_bar.showMessage(f"正在播放: {music['title']}")
+        self.preload_next_track()
+
+    def show_waveform(self, music):
+        """显示波形：有缓存时直接映射，否则交给后台生成"""
+        peaks = self.peaks_cache.load(music)
+        self.player_control.set_waveform(peaks)
+        if peaks is None:
+            self.peaks_worker.request(music)
+
+    def on_spectrum_frame(self):
+        """取出频谱分析线程的最新一帧（积压的帧已合并）"""
+        frame = self.spectrum_worker.take()
+        if frame is not None:
+            self.player_control.spectrum_view.set_frame(*frame)
+
+    def on_peaks_ready(self, music_id):
+        """后台峰值生成完毕"""
+        current_music = self.player_engine.current_music
+        if current_music and current_music['id'] == music_id:
+            self.player_control.set_waveform(self.peaks_cache.load(current_music))
+
+    def show_cover(self, music):
+        """显示当前曲目的封面，不在内存缓存中时由后台加载后再显示"""
+        self.player_control.set_cover(self.cover_provider.pixmap(music, PLAYER_SIZE))
+
+    def on_cover_changed(self, music_id):
+        """后台封面加载完毕"""
+        current_music = self.player_engine.current_music if self.player_engine else None
+        if current_music and current_music['id'] == music_id:
+            self.show_cover(current_music)
+
+    def on_play_mode_changed(self, mode):
+        """播放模式切换"""
+        self.play_queue.set_mode(mode)
+        self.preload_next_track()
 
     def on_music_delete(self, music_id):
         """删除音乐处理"""
+        if self.player_engine is None:
+            self.status_bar.showMessage("正在初始化播放器，请稍候...")
+            return
         if self.music_manager.delete_music(music_id):
             # 如果删除的是当前播放的音乐
             current_music = self.player_engine.current_music
             if current_music and current_music['id'] == music_id:
                 self.player_engine.stop()
                 self.player_control.update_music_info(None)
+                self.lyrics_view.set_lyrics(None)
+            self.lyrics_cache.invalidate(music_id)
+            self.peaks_cache.remove(music_id)
+            self.player_engine.pcm_cache.invalidate(music_id)
 
-            self.load_music_list()
             self.status_bar.showMessage("音乐已删除")
 
     def closeEvent(self, event):
         """关闭窗口事件"""
-        self.player_engine.cleanup()
+        if self.import_worker and self.import_worker.isRunning():
+            self.import_worker.cancel()
+            self.import_worker.wait()
+        self._loudness_queued = False
+        if self.loudness_worker and self.loudness_worker.isRunning():
+            self.loudness_worker.cancel()
+            self.loudness_worker.wait()
+        self._queued_scan = None
+        if self.scan_worker and self.scan_worker.isRunning():
+            self.scan_worker.cancel()
+            self.scan_worker.wait()
+        if self.folder_watcher:
+            self.folder_watcher.stop()
+        if self.peaks_worker:
+            self.peaks_worker.stop()
+        if self.cover_worker:
+            self.cover_worker.stop()
+        if self.spectrum_worker:
+            self.spectrum_worker.stop()
+        if self.player_engine:
+            self.player_engine.cleanup()
+        if self.music_manager:
+            self.music_manager.remove_change_listener(self._library_listener)
+            self.music_manager.close()
         event.accept()
\ No newline at end of file
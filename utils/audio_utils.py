@@ -1,22 +1,29 @@
-from mutagen import File
-from mutagen.mp3 import MP3
-from mutagen.flac import FLAC
-from mutagen.wavpack import WavPack
-from mutagen.oggvorbis import OggVorbis
-from mutagen.m4a import M4A
+import importlib
 import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from mutagen import File
+from utils import metrics
 
+# 扩展名 -> mutagen 格式类（模块, 类名），用到时才导入对应模块
+FORMAT_CLASSES = {
+    '.mp3': ('mutagen.mp3', 'EasyMP3'),
+    '.flac': ('mutagen.flac', 'FLAC'),
+    '.wav': ('mutagen.wave', 'WAVE'),
+    '.ogg': ('mutagen.oggvorbis', 'OggVorbis'),
+    '.m4a': ('mutagen.easymp4', 'EasyMP4'),
+    '.aac': ('mutagen.aac', 'AAC'),
+    '.wma': ('mutagen.asf', 'ASF'),
+}
 
-def get_audio_duration(file_path):
-    """获取音频时长（秒）"""
-    try:
-        audio = File(file_path)
-        if audio:
-            return audio.info.length
-        return 0
-    except Exception as e:
-        print(f"获取音频时长失败: {e}")
-        return 0
+# 各格式标签的键名：简易接口 / ID3 帧（WAV）/ ASF
+TAG_KEYS = {
+    'title': ('title', 'TIT2', 'Title'),
+    'artist': ('artist', 'TPE1', 'Author'),
+    'album': ('album', 'TALB', 'WM/AlbumTitle'),
+}
 
 
 def format_duration(seconds):
@@ -26,34 +33,90 @@ def format_duration(seconds):
     return f"{minutes:02d}:{secs:02d}"
 
 
+@lru_cache(maxsize=None)
+def _format_class(ext):
+    module, name = FORMAT_CLASSES[ext]
+    return getattr(importlib.import_module(module), name)
+
+
+def _open_audio(file_path):
+    """按扩展名只尝试对应格式；内容与扩展名不符时退回 mutagen 自动识别"""
+    ext = os.path.splitext(file_path)[1].lower()
+    audio = None
+    if ext in FORMAT_CLASSES:
+        try:
+            audio = File(file_path, options=[_format_class(ext)])
+        except Exception:
+            audio = None
+    if audio is None:
+        audio = File(file_path, easy=True)
+    return audio
+
+
+def _first_tag(tags, keys):
+    """取第一个存在的标签的首个值，标签存在但为空时返回空字符串，不存在时返回 None"""
+    if not tags:
+        return None
+    for key in keys:
+        try:
+            value = tags[key]
+        except (KeyError, ValueError):
+            continue
+        value = getattr(value, 'text', value)  # ID3 帧
+        if isinstance(value, (list, tuple)):
+            value = value[0] if value else ''
+        return str(value).strip()
+    return None
+
+
+@metrics.timed('metadata.parse')
 def get_audio_metadata(file_path):
-    """获取音频元数据（标题、艺术家、专辑）"""
+    """一次读取音频元数据：标签（标题、艺术家、专辑）与流信息（时长、码率、采样率、声道数）
+
+    只解析文件头和标签，不解码音频。
+    """
     metadata = {
-        'title': '',
+        'title': Path(file_path).stem,
         'artist': '',
         'album': '',
         'duration': 0,
-        'duration_str': '00:00'
+        'duration_str': '00:00',
+        'bitrate': 0,
+        'sample_rate': 0,
+        'channels': 0
     }
 
     try:
-        audio = File(file_path, easy=True)
-        if audio:
-            # 获取元数据
-            if 'title' in audio:
-                metadata['title'] = audio['title'][0] if audio['title'] else Path(file_path).stem
-            if 'artist' in audio:
-                metadata['artist'] = audio['artist'][0] if audio['artist'] else '未知艺术家'
-            if 'album' in audio:
-                metadata['album'] = audio['album'][0] if audio['album'] else '未知专辑'
-
-            # 获取时长
-            metadata['duration'] = audio.info.length
-            metadata['duration_str'] = format_duration(audio.info.length)
-        else:
-            # 如果没有元数据，使用文件名
-            metadata['title'] = Path(file_path).stem
+        audio = _open_audio(file_path)
+        if audio is None:
+            return metadata
+
+        title = _first_tag(audio.tags, TAG_KEYS['title'])
+        if title:
+            metadata['title'] = title
+        artist = _first_tag(audio.tags, TAG_KEYS['artist'])
+        if artist is not None:
+            metadata['artist'] = artist or '未知艺术家'
+        album = _first_tag(audio.tags, TAG_KEYS['album'])
+        if album is not None:
+            metadata['album'] = album or '未知专辑'
+
+        info = audio.info
+        duration = getattr(info, 'length', 0) or 0
+        metadata['duration'] = duration
+        metadata['duration_str'] = format_duration(duration)
+        metadata['bitrate'] = int(getattr(info, 'bitrate', 0) or 0)
+        metadata['sample_rate'] = int(getattr(info, 'sample_rate', 0) or 0)
+        metadata['channels'] = int(getattr(info, 'channels', 0) or 0)
     except Exception as e:
-        print(f"获取音频元数据失败: {e}")
+        print(f"获取音频元数据失败: {file_path} ({e})")
+
+    return metadata
+
 
-    return metadata
\ No newline at end of file
+def get_audio_metadata_batch(file_paths, max_workers=None):
+    """批量读取元数据，结果与 file_paths 顺序一致（线程池并行，主要重叠磁盘 I/O）"""
+    if len(file_paths) <= 1:
+        return [get_audio_metadata(path) for path in file_paths]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(get_audio_metadata, file_paths))
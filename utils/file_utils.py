@@ -1,11 +1,24 @@
+import errno
+import hashlib
 import os
 import shutil
 import uuid
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 # 支持的音乐格式
 SUPPORTED_FORMATS = ['.mp3', '.flac', '.wav', '.ogg', '.m4a', '.aac', '.wma']
 
+HASH_CHUNK_SIZE = 1 << 20
+FICLONE = 0x40049409  # Linux 反射链接（写时复制）ioctl
+# 这些错误表示当前文件系统/平台不支持该复制方式，换下一种
+_UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL,
+                       errno.ENOSYS, errno.EBADF, errno.EMLINK}
+
 
 def get_supported_files(file_paths):
     """筛选支持的音乐文件"""
@@ -16,8 +29,80 @@ def get_supported_files(file_paths):
     return supported_files
 
 
+def hash_file(file_path, chunk_size=HASH_CHUNK_SIZE):
+    """分块计算文件内容哈希（BLAKE2b-128，十六进制），不整文件读入内存"""
+    digest = hashlib.blake2b(digest_size=16)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(file_path, 'rb', buffering=0) as f:
+        while True:
+            count = f.readinto(buffer)
+            if not count:
+                break
+            digest.update(view[:count])
+    return digest.hexdigest()
+
+
+def link_or_copy(source_path, target_path, allow_hardlink=True):
+    """尽量不搬运数据地复制文件，返回实际使用的方式
+
+    依次尝试：反射链接（btrfs/xfs 等写时复制，独立副本）、硬链接（同一文件系统，与源文件共享数据）、
+    copy_file_range（内核内复制）、带缓冲的普通复制。
+    任何一步失败并抛出异常时删除已写入的目标文件，不留下空文件或半截文件。
+    """
+    try:
+        return _link_or_copy(source_path, target_path, allow_hardlink)
+    except BaseException:
+        try:
+            os.remove(target_path)
+        except OSError:
+            pass
+        raise
+
+
+def _link_or_copy(source_path, target_path, allow_hardlink):
+    if fcntl is not None and hasattr(fcntl, 'ioctl'):
+        try:
+            with open(source_path, 'rb') as src, open(target_path, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(source_path, target_path)
+            return 'reflink'
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+            os.remove(target_path)
+
+    if allow_hardlink:
+        try:
+            os.link(source_path, target_path)
+            return 'hardlink'
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(source_path, 'rb') as src, open(target_path, 'wb') as dst:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            shutil.copystat(source_path, target_path)
+            return 'copy_file_range'
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+
+    with open(source_path, 'rb') as src, open(target_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst, HASH_CHUNK_SIZE)
+    shutil.copystat(source_path, target_path)
+    return 'copy'
+
+
 def copy_music_file(source_path, target_dir):
-    """复制音乐文件到应用存储目录"""
+    """复制音乐文件到应用存储目录（同一文件系统时使用链接，不复制数据）"""
     try:
         # 创建目标目录
         os.makedirs(target_dir, exist_ok=True)
@@ -28,7 +113,7 @@ def copy_music_file(source_path, target_dir):
         target_path = os.path.join(target_dir, unique_name)
 
         # 复制文件
-        shutil.copy2(source_path, target_path)
+        link_or_copy(source_path, target_path)
         return target_path
     except Exception as e:
         print(f"复制文件失败: {e}")
@@ -47,16 +132,23 @@ def get_file_info(file_path):
     }
 
 
-def init_data_dirs():
-    """初始化数据目录"""
-    base_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+def init_data_dirs(base_dir=None):
+    """初始化数据目录（默认为项目下的 data 目录）"""
+    if base_dir is None:
+        base_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
     music_dir = os.path.join(base_dir, 'music_files')
+    peaks_dir = os.path.join(base_dir, 'peaks')
+    covers_dir = os.path.join(base_dir, 'covers')
 
     os.makedirs(base_dir, exist_ok=True)
     os.makedirs(music_dir, exist_ok=True)
+    os.makedirs(peaks_dir, exist_ok=True)
+    os.makedirs(covers_dir, exist_ok=True)
 
     return {
         'base_dir': base_dir,
         'music_dir': music_dir,
+        'peaks_dir': peaks_dir,
+        'covers_dir': covers_dir,
         'db_path': os.path.join(base_dir, 'music_db.sqlite3')
     }
\ No newline at end of file
@@ -0,0 +1,277 @@
+import atexit
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+# 环境变量：
+#   MUSIC_METRICS=1                 启用计时与计数
+#   MUSIC_METRICS_FILE=路径          定期把汇总写入文件（.json 为 JSON，其他为 Prometheus 文本格式）
+#   MUSIC_METRICS_INTERVAL=秒        写入间隔，默认 10
+#   MUSIC_PROFILE=cpu,memory        退出时写出 cProfile / tracemalloc 结果
+#   MUSIC_PROFILE_DIR=目录           剖析结果目录，默认当前目录
+METRICS_ENV = 'MUSIC_METRICS'
+FILE_ENV = 'MUSIC_METRICS_FILE'
+INTERVAL_ENV = 'MUSIC_METRICS_INTERVAL'
+PROFILE_ENV = 'MUSIC_PROFILE'
+PROFILE_DIR_ENV = 'MUSIC_PROFILE_DIR'
+
+# 直方图桶上界（毫秒），覆盖微秒级查询到秒级导入
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, math.inf)
+
+_NULL_SPAN = nullcontext()
+
+
+class Histogram:
+    """固定桶的耗时直方图（毫秒）"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def quantile(self, q):
+        """按桶内线性插值估计分位数"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BUCKETS_MS[i - 1] if i else 0.0
+                upper = BUCKETS_MS[i] if BUCKETS_MS[i] != math.inf else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total,
+            'mean_ms': self.total / self.count if self.count else 0.0,
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'max_ms': self.max,
+        }
+
+
+class Registry:
+    """计数器与耗时直方图的集合（线程安全）"""
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, ms):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(ms)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        """当前汇总：{'counters': {...}, 'spans': {名称: 统计}}"""
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'spans': {name: h.summary() for name, h in self.histograms.items()},
+            }
+
+    def to_json(self):
+        return json.dumps(dict(self.snapshot(), time=time.time()), indent=2)
+
+    def to_prometheus(self, prefix='music_player'):
+        """Prometheus 文本格式（耗时以秒为单位）"""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"{prefix}_{_metric_name(name)}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+            for name, histogram in sorted(self.histograms.items()):
+                metric = f"{prefix}_{_metric_name(name)}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for upper, n in zip(BUCKETS_MS, histogram.counts):
+                    cumulative += n
+                    le = '+Inf' if upper == math.inf else f"{upper / 1000:g}"
+                    lines.append(f'{metric}_bucket{{le="{le}"}} {cumulative}')
+                lines.append(f"{metric}_sum {histogram.total / 1000:.6f}")
+                lines.append(f"{metric}_count {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path):
+        """写入文件（先写临时文件再替换，读取方不会看到半个文件）"""
+        text = self.to_json() if path.endswith('.json') else self.to_prometheus()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+def _metric_name(name):
+    return ''.join(c if c.isalnum() else '_' for c in name)
+
+
+registry = Registry()
+enabled = os.environ.get(METRICS_ENV, '') not in ('', '0')
+
+
+def enable(on=True):
+    """运行时开关采集"""
+    global enabled
+    enabled = on
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        registry.observe(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+def span(name):
+    """计时区间：with metrics.span('db.query'): ...；未启用时返回共享的空上下文"""
+    return _Span(name) if enabled else _NULL_SPAN
+
+
+def timed(name):
+    """函数计时装饰器"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+
+def count(name, value=1):
+    """计数器加一（或加 value）"""
+    if enabled:
+        registry.add(name, value)
+
+
+def observe(name, ms):
+    """记录一次已测得的耗时（毫秒）"""
+    if enabled:
+        registry.observe(name, ms)
+
+
+class _Dumper:
+    """后台定期写出汇总文件"""
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._write()
+
+    def _write(self):
+        try:
+            registry.dump(self.path)
+        except OSError as e:
+            print(f"写入性能统计失败: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join(timeout=1)
+        self._write()
+
+
+_dumper = None
+
+
+def start_dump(path=None, interval=None):
+    """按环境变量（或参数）启动定期写出，退出时再写一次；未配置路径时不做任何事"""
+    global _dumper
+    path = path or os.environ.get(FILE_ENV)
+    if not path or _dumper is not None:
+        return False
+    interval = interval or float(os.environ.get(INTERVAL_ENV, 10))
+    _dumper = _Dumper(path, interval)
+    atexit.register(_dumper.stop)
+    return True
+
+
+def start_profiling(modes=None, output_dir=None):
+    """按 MUSIC_PROFILE 启动 cProfile（仅调用线程，通常是界面线程）和/或 tracemalloc，退出时写出结果"""
+    modes = modes if modes is not None else os.environ.get(PROFILE_ENV, '')
+    modes = {mode.strip() for mode in modes.split(',') if mode.strip()}
+    if not modes:
+        return False
+    output_dir = output_dir or os.environ.get(PROFILE_DIR_ENV, '.')
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+
+    if 'cpu' in modes:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def write_profile():
+            profiler.disable()
+            path = os.path.join(output_dir, f"profile-{stamp}.prof")
+            profiler.dump_stats(path)
+            print(f"CPU 剖析结果已写入 {path}（python -m pstats {path}）")
+        atexit.register(write_profile)
+
+    if 'memory' in modes:
+        import tracemalloc
+        tracemalloc.start(25)
+
+        def write_snapshot():
+            snapshot = tracemalloc.take_snapshot()
+            path = os.path.join(output_dir, f"memory-{stamp}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                current, peak = tracemalloc.get_traced_memory()
+                f.write(f"current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB\n\n")
+                for stat in snapshot.statistics('traceback')[:50]:
+                    f.write(f"{stat}\n")
+                    f.writelines(f"    {line}\n" for line in stat.traceback.format())
+            snapshot.dump(os.path.join(output_dir, f"memory-{stamp}.snapshot"))
+            print(f"内存剖析结果已写入 {path}")
+        atexit.register(write_snapshot)
+    return True